@@ -11,8 +11,17 @@ import os
 import re
 import io
 import base64
+import pickle
+import gzip
+import hashlib
+import time
+from array import array
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from master_snapshot import load_snapshot_dict, text_fingerprint
+from product_catalog import EMPTY_CATALOG, SKU_SIZE_SUFFIX, load_catalog_text
 
 # Untuk fetch dari Google Sheets
 try:
@@ -69,7 +78,11 @@ DOUBLED_STORES = {
 
 # Google Sheets Configuration
 # Base URL untuk spreadsheet
-SPREADSHEET_BASE = 'https://docs.google.com/spreadsheets/d/e/2PACX-1vRMI13PjlcKpGxF2QKXIkn0-QS0bVsqrw2MZVRVcm8l7jt_lT2sKgRcFYnVDDqmT5LUzPm8nFxMTgS9/pub'
+# Bisa di-override lewat env SPREADSHEET_BASE (mis. server HTTP lokal untuk testing offline)
+SPREADSHEET_BASE = os.environ.get(
+    'SPREADSHEET_BASE',
+    'https://docs.google.com/spreadsheets/d/e/2PACX-1vRMI13PjlcKpGxF2QKXIkn0-QS0bVsqrw2MZVRVcm8l7jt_lT2sKgRcFYnVDDqmT5LUzPm8nFxMTgS9/pub'
+)
 
 # GID untuk masing-masing sheet
 SHEET_GID = {
@@ -78,20 +91,33 @@ SHEET_GID = {
     'master_store': 1803569317,  # Sheet Master Store/Warehouse (mapping area)
     'max_stock': 382740121,      # Sheet Max Stock per store/warehouse
     'master_assortment': 1063661008,  # Sheet Master Assortment (Kolom B: Kode Kecil, C: Assorment)
+    'target': 463036025,         # Sheet Target per toko (Jan, Feb, Mar)
 }
 
+# Cache sheet di disk (per gid) - TTL dalam detik, 0 = selalu revalidate ke server
+SHEET_CACHE_DIR = os.environ.get('SHEET_CACHE_DIR', '.sheet_cache')
+SHEET_CACHE_TTL = int(os.environ.get('SHEET_CACHE_TTL', '900'))
+SHEET_FETCH_WORKERS = 6
+SHEET_PREFETCH = {}  # {gid: csv_text} - hasil prefetch paralel untuk run ini
+
+# Build cache: hasil parse/enrich per input disimpan dengan fingerprint input-nya,
+# sehingga run berikutnya hanya memproses ulang input yang berubah
+BUILD_CACHE_DIR = os.environ.get('BUILD_CACHE_DIR', '.build_cache')
+BUILD_CACHE_ENABLED = os.environ.get('BUILD_CACHE', '1') != '0'
+BUILD_FINGERPRINTS = {}  # {nama_input: fingerprint} untuk run ini
+
 # File Master Produk (backup jika online gagal)
 MASTER_PRODUK_FILE = 'Master Produk.csv'
 
 # Global master data
-MASTER_DATA = {}      # {kode_sku: {kode_kecil, nama, gender, series, tier}}
+MASTER_DATA = EMPTY_CATALOG  # ProductCatalog {kode_sku: ProductRecord} - lihat product_catalog.py
 MASTER_PRODUK = {}    # {kode_kecil: {nama, series, gender, tipe, tier}} - dari Master Produk jika ada
 MASTER_PRODUK_BY_ARTICLE = {}  # {article_upper: tier} - untuk lookup tier by nama artikel
 STORE_AREA_MAP = {}   # {store_name_lower: area} - dari Master Store/Warehouse
 MAX_STOCK_MAP = {}    # {store_name_lower: max_stock} - dari sheet Max Stock
 MASTER_ASSORTMENT = {}  # {kode_kecil_upper: assortment} - dari sheet Master Assortment
-SALES_DATA = {}  # {sku_upper: {nov, des, jan}} - sales per SKU per bulan
-SALES_DETAIL = []  # List of sales transactions for Sales Dashboard
+SALES_DATA = {}  # {sku_upper: [qty per bulan SALES_MONTHS]} - sales per SKU per bulan
+SALES_MONTHS = []  # ['YYYY-MM', ...] - bulan rolling untuk SALES_DATA (diturunkan dari data)
 TARGET_DATA = {}  # {store_name_lower: {jan, feb, mar}} - target per store
 
 # Filter: Exclude produk non-sandal
@@ -113,64 +139,192 @@ def is_sandal_product(name, sku):
 
     return True
 
-def extract_kode_kecil(sku):
-    """Extract kode kecil dari SKU dengan menghilangkan Z+size di akhir"""
-    if not sku:
-        return ''
-    # Hilangkan Z + 2-3 digit angka di akhir (contoh: Z24, Z26, Z100)
-    kode_kecil = re.sub(r'Z\d{2,3}$', '', sku.strip(), flags=re.IGNORECASE)
-    return kode_kecil
+def _decode_sheet_content(content):
+    """Decode bytes hasil fetch dengan beberapa encoding"""
+    for encoding in ['utf-8', 'latin-1', 'cp1252']:
+        try:
+            return content.decode(encoding)
+        except:
+            continue
+    return content.decode('utf-8', errors='replace')
+
+def _sheet_cache_paths(gid):
+    """Path file cache (isi CSV + metadata) untuk satu gid"""
+    cache_dir = Path(SHEET_CACHE_DIR)
+    if not cache_dir.is_absolute():
+        cache_dir = Path(__file__).parent / cache_dir
+    return cache_dir / f"{gid}.csv", cache_dir / f"{gid}.json"
+
+def _read_sheet_cache(gid):
+    """Baca cache sheet dari disk - return (text, meta) atau (None, {})"""
+    data_path, meta_path = _sheet_cache_paths(gid)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(data_path, 'r', encoding='utf-8') as f:
+            return f.read(), meta
+    except (OSError, ValueError):
+        return None, {}
+
+def _write_sheet_cache(gid, text, meta):
+    """Simpan isi sheet + metadata (ETag, Last-Modified, hash, waktu fetch) ke disk"""
+    data_path, meta_path = _sheet_cache_paths(gid)
+    try:
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        if text is not None:
+            with open(data_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    except OSError as e:
+        print(f"    ⚠ Gagal menulis cache gid={gid}: {e}")
 
 def fetch_google_sheet(gid):
-    """Fetch data dari Google Sheets berdasarkan gid"""
+    """Fetch data dari Google Sheets berdasarkan gid.
+
+    Urutan: hasil prefetch paralel -> cache disk yang masih dalam TTL ->
+    conditional request (If-None-Match / If-Modified-Since). Jika network
+    gagal, cache lama tetap dipakai.
+    """
+    if gid in SHEET_PREFETCH:
+        return SHEET_PREFETCH[gid]
+
+    cached_text, meta = _read_sheet_cache(gid)
+    if cached_text is not None and time.time() - meta.get('fetched_at', 0) < SHEET_CACHE_TTL:
+        print(f"    Cache: gid={gid}")
+        return cached_text
+
     if not HAS_URLLIB:
         print("    ⚠ urllib tidak tersedia")
-        return None
+        return cached_text
 
     url = f"{SPREADSHEET_BASE}?gid={gid}&single=true&output=csv"
     print(f"    Fetching: gid={gid}")
 
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    if cached_text is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
     try:
         # Create SSL context that doesn't verify (untuk menghindari SSL issues)
         ctx = ssl.create_default_context()
         ctx.check_hostname = False
         ctx.verify_mode = ssl.CERT_NONE
 
-        # Create request dengan User-Agent
-        req = urllib.request.Request(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Create request dengan User-Agent (+ header conditional jika ada cache)
+        req = urllib.request.Request(url, headers=headers)
 
         # Fetch dengan timeout
         with urllib.request.urlopen(req, timeout=30, context=ctx) as response:
-            # Handle redirect
-            final_url = response.geturl()
             content = response.read()
-
-            # Try decode dengan berbagai encoding
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                try:
-                    text = content.decode(encoding)
-                    return text
-                except:
-                    continue
-
-            return content.decode('utf-8', errors='replace')
+            etag = response.headers.get('ETag', '')
+            last_modified = response.headers.get('Last-Modified', '')
+
+        text = _decode_sheet_content(content)
+        content_hash = hashlib.sha256(content).hexdigest()
+        unchanged = cached_text is not None and content_hash == meta.get('sha256')
+        _write_sheet_cache(gid, None if unchanged else text, {
+            'etag': etag,
+            'last_modified': last_modified,
+            'sha256': content_hash,
+            'fetched_at': time.time(),
+        })
+        return text
 
     except urllib.error.HTTPError as e:
+        if e.code == 304 and cached_text is not None:
+            # Not Modified - pakai cache, perpanjang TTL
+            meta['fetched_at'] = time.time()
+            _write_sheet_cache(gid, None, meta)
+            print(f"    Not modified: gid={gid}")
+            return cached_text
         print(f"    ⚠ HTTP Error {e.code}: {e.reason}")
-        return None
     except urllib.error.URLError as e:
         print(f"    ⚠ URL Error: {e.reason}")
-        return None
     except Exception as e:
         print(f"    ⚠ Error fetching: {e}")
-        return None
+
+    if cached_text is not None:
+        print(f"    ⚠ Memakai cache lama untuk gid={gid}")
+    return cached_text
+
+def prefetch_google_sheets(gids):
+    """Fetch beberapa sheet sekaligus secara paralel (thread pool).
+
+    Hasil disimpan di SHEET_PREFETCH sehingga load_*() berikutnya tidak
+    menunggu network satu per satu.
+    """
+    SHEET_PREFETCH.clear()
+    gids = list(dict.fromkeys(gids))
+    if not gids:
+        return SHEET_PREFETCH
+
+    with ThreadPoolExecutor(max_workers=min(SHEET_FETCH_WORKERS, len(gids))) as pool:
+        results = pool.map(fetch_google_sheet, gids)
+        for gid, text in zip(gids, results):
+            SHEET_PREFETCH[gid] = text
+
+    return SHEET_PREFETCH
+
+def file_fingerprint(path):
+    """Fingerprint isi file (sha256); 'missing' jika file tidak ada"""
+    try:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    except OSError:
+        return 'missing'
+
+def data_fingerprint(*objs):
+    """Fingerprint data hasil parse (mis. master dari Google Sheets)"""
+    payload = json.dumps(objs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Perubahan kode generator juga meng-invalidate cache
+SCRIPT_FINGERPRINT = file_fingerprint(__file__)
+
+def cached_build(name, fingerprint, build):
+    """Return (hasil, dari_cache). `build()` hanya dipanggil jika fingerprint berubah."""
+    fingerprint = f"{SCRIPT_FINGERPRINT}:{fingerprint}"
+    cache_dir = Path(BUILD_CACHE_DIR)
+    if not cache_dir.is_absolute():
+        cache_dir = Path(__file__).parent / cache_dir
+    cache_path = cache_dir / f"{name}.pkl"
+
+    if BUILD_CACHE_ENABLED:
+        try:
+            with open(cache_path, 'rb') as f:
+                entry = pickle.load(f)
+            if entry.get('fingerprint') == fingerprint:
+                return entry['data'], True
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+
+    data = build()
+
+    if BUILD_CACHE_ENABLED:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'fingerprint': fingerprint, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"    ⚠ Gagal menulis build cache {name}: {e}")
+
+    return data, False
 
 def load_master_data():
     """Load Master Data dari Google Sheets - mapping SKU ke info produk"""
     global MASTER_DATA
-    MASTER_DATA = {}
+    MASTER_DATA = EMPTY_CATALOG
 
     gid = SHEET_GID.get('master_data', 0)
     print(f"  🌐 Fetching Master Data dari Google Sheets (gid={gid})...")
@@ -182,55 +336,9 @@ def load_master_data():
 
     print(f"    ✓ Berhasil fetch dari Google Sheets")
 
-    # Parse CSV dengan csv module (handle quoted fields dengan benar)
-    reader = csv.reader(io.StringIO(csv_content))
-    rows = list(reader)
-
-    if not rows:
-        return False
-
-    # Find header row - cari baris dengan "Kode Variant" atau "Kode(*)"
-    header_row = 0
-    for i, row in enumerate(rows[:10]):
-        row_str = ''.join(str(x).lower() for x in row)
-        if 'kode variant' in row_str or 'kode(*)' in row_str:
-            header_row = i
-            break
-
-    # Berdasarkan struktur yang terlihat:
-    # Kolom 0: Kode Variant (Kode SKU) - Z2CA01Z21
-    # Kolom 1: Kode (Kode Kecil) - Z2CA01
-    # Kolom 3: Nama Barang
-    # Kolom 5: Size (kolom F)
-    # Kolom 6: Tier
-    # Kolom 7: Gender
-    # Kolom 9: Series
-
-    count = 0
-    for row in rows[header_row + 1:]:
-        if len(row) < 10:
-            continue
-
-        kode_sku = str(row[0]).strip().upper()
-        if not kode_sku or kode_sku in ['', 'KODE VARIANT(*)', 'KODE VARIANT']:
-            continue
-
-        kode_kecil = str(row[1]).strip().upper() if len(row) > 1 else ''
-        nama = str(row[3]).strip() if len(row) > 3 else ''
-        size = str(row[5]).strip() if len(row) > 5 else ''  # Kolom F = index 5
-        tier = str(row[6]).strip() if len(row) > 6 else ''
-        gender = str(row[7]).strip() if len(row) > 7 else ''
-        series = str(row[9]).strip() if len(row) > 9 else ''
-
-        MASTER_DATA[kode_sku] = {
-            'kode_kecil': kode_kecil,
-            'nama': nama,
-            'size': size,
-            'tier': tier,
-            'gender': gender,
-            'series': series
-        }
-        count += 1
+    # Parse (atau buka snapshot jika isi sheet sama dengan run sebelumnya) lewat katalog bersama
+    MASTER_DATA = load_catalog_text(csv_content)
+    count = len(MASTER_DATA)
 
     print(f"    -> {count} SKU loaded dari Master Data")
     return count > 0
@@ -250,51 +358,64 @@ def load_master_produk():
 
     print(f"    ✓ Berhasil fetch dari Google Sheets")
 
-    # Parse CSV dengan csv module (handle quoted fields dengan benar)
-    reader = csv.reader(io.StringIO(csv_content))
-    rows = list(reader)
-
-    if not rows:
-        return False
-
-    # Struktur Master Produk:
-    # Baris 0: Data aneh
-    # Baris 1: Index angka (0,1,2,3...)
-    # Baris 2: Header nama (No, Code, Article, Tipe, Series, Gender, Tier, ...)
-    # Baris 3+: Data
-    # Kolom B (index 1): Code (Kode Kecil)
-    # Kolom C (index 2): Article (Nama Barang)
-    # Kolom D (index 3): Tipe
-    # Kolom E (index 4): Series
-    # Kolom F (index 5): Gender
-    # Kolom G (index 6): Tier
-
-    count = 0
-    for row in rows[3:]:  # Skip 3 header rows (baris 0, 1, 2)
-        if len(row) < 7:
-            continue
-
-        kode_kecil = str(row[1]).strip().upper()  # Kolom B - Code
-        if not kode_kecil or kode_kecil in ['CODE', 'NO', '1', '']:
-            continue
+    parsed = {}
+
+    def parse():
+        if parsed:
+            return parsed
+        produk = parsed['produk'] = {}
+        by_article = parsed['by_article'] = {}
+        parsed['rows'] = 0
+
+        # Parse CSV dengan csv module (handle quoted fields dengan benar)
+        rows = list(csv.reader(io.StringIO(csv_content)))
+
+        # Struktur Master Produk:
+        # Baris 0: Data aneh
+        # Baris 1: Index angka (0,1,2,3...)
+        # Baris 2: Header nama (No, Code, Article, Tipe, Series, Gender, Tier, ...)
+        # Baris 3+: Data
+        # Kolom B (index 1): Code (Kode Kecil)
+        # Kolom C (index 2): Article (Nama Barang)
+        # Kolom D (index 3): Tipe
+        # Kolom E (index 4): Series
+        # Kolom F (index 5): Gender
+        # Kolom G (index 6): Tier
+        for row in rows[3:]:  # Skip 3 header rows (baris 0, 1, 2)
+            if len(row) < 7:
+                continue
 
-        article = str(row[2]).strip() if len(row) > 2 else ''   # Kolom C - Article
-        tipe = str(row[3]).strip() if len(row) > 3 else ''      # Kolom D - Tipe
-        series = str(row[4]).strip() if len(row) > 4 else ''    # Kolom E - Series
-        gender = str(row[5]).strip() if len(row) > 5 else ''    # Kolom F - Gender
-        tier = str(row[6]).strip() if len(row) > 6 else ''      # Kolom G - Tier
+            kode_kecil = str(row[1]).strip().upper()  # Kolom B - Code
+            if not kode_kecil or kode_kecil in ['CODE', 'NO', '1', '']:
+                continue
 
-        MASTER_PRODUK[kode_kecil] = {
-            'article': article,
-            'tipe': tipe,
-            'series': series,
-            'gender': gender,
-            'tier': tier
-        }
-        # Juga simpan by article name untuk lookup
-        if article and tier:
-            MASTER_PRODUK_BY_ARTICLE[article.upper()] = tier
-        count += 1
+            article = str(row[2]).strip() if len(row) > 2 else ''   # Kolom C - Article
+            tipe = str(row[3]).strip() if len(row) > 3 else ''      # Kolom D - Tipe
+            series = str(row[4]).strip() if len(row) > 4 else ''    # Kolom E - Series
+            gender = str(row[5]).strip() if len(row) > 5 else ''    # Kolom F - Gender
+            tier = str(row[6]).strip() if len(row) > 6 else ''      # Kolom G - Tier
+
+            produk[kode_kecil] = {
+                'article': article,
+                'tipe': tipe,
+                'series': series,
+                'gender': gender,
+                'tier': tier
+            }
+            # Juga simpan by article name untuk lookup
+            if article and tier:
+                by_article[article.upper()] = tier
+            parsed['rows'] += 1
+        return parsed
+
+    # Dari snapshot master jika isi sheet sama dengan run sebelumnya
+    fingerprint = text_fingerprint(csv_content)
+    MASTER_PRODUK, count = load_snapshot_dict('master_produk', fingerprint,
+                                              ('article', 'tipe', 'series', 'gender', 'tier'),
+                                              lambda: (parse()['produk'], parse()['rows']))
+    by_article, _ = load_snapshot_dict('master_produk_by_article', fingerprint, ('tier',),
+                                       lambda: (parse()['by_article'], parse()['rows']))
+    MASTER_PRODUK_BY_ARTICLE.update(by_article)
 
     print(f"    -> {count} produk loaded dari Master Produk (dengan Tier)")
     print(f"    -> {len(MASTER_PRODUK_BY_ARTICLE)} artikel dengan tier")
@@ -315,40 +436,41 @@ def load_master_store():
 
     print(f"    ✓ Berhasil fetch dari Google Sheets")
 
-    # Parse CSV
-    reader = csv.reader(io.StringIO(csv_content))
-    rows = list(reader)
+    def parse():
+        area_map = {}
+        count = 0
+        rows = list(csv.reader(io.StringIO(csv_content)))
+
+        # Struktur: Kolom A=Nama Retail, B=Area, C=Entitas, D=kosong, E=Nama Gudang, F=Area Gudang
+        for row in rows[1:]:  # Skip header
+            if len(row) >= 3:
+                # Retail store (kolom A, B)
+                store_name = str(row[0]).strip()
+                area = str(row[1]).strip()
+                if store_name and area:
+                    # Simpan beberapa variasi nama untuk matching
+                    area_map[store_name.lower()] = area
+                    # Simpan juga versi singkat (tanpa prefix ZUMA/Zuma)
+                    short_name = store_name.lower().replace('zuma ', '').replace('zuma', '').strip()
+                    if short_name:
+                        area_map[short_name] = area
+                    count += 1
 
-    if not rows:
-        return False
+            if len(row) >= 6:
+                # Warehouse (kolom E, F)
+                wh_name = str(row[4]).strip()
+                wh_area = str(row[5]).strip()
+                if wh_name and wh_area:
+                    area_map[wh_name.lower()] = wh_area
+                    # Variasi nama warehouse
+                    short_wh = wh_name.lower().replace('warehouse ', '').replace('wh ', '').strip()
+                    if short_wh:
+                        area_map[short_wh] = wh_area
+                    count += 1
+        return area_map, count
 
-    # Struktur: Kolom A=Nama Retail, B=Area, C=Entitas, D=kosong, E=Nama Gudang, F=Area Gudang
-    count = 0
-    for row in rows[1:]:  # Skip header
-        if len(row) >= 3:
-            # Retail store (kolom A, B)
-            store_name = str(row[0]).strip()
-            area = str(row[1]).strip()
-            if store_name and area:
-                # Simpan beberapa variasi nama untuk matching
-                STORE_AREA_MAP[store_name.lower()] = area
-                # Simpan juga versi singkat (tanpa prefix ZUMA/Zuma)
-                short_name = store_name.lower().replace('zuma ', '').replace('zuma', '').strip()
-                if short_name:
-                    STORE_AREA_MAP[short_name] = area
-                count += 1
-
-        if len(row) >= 6:
-            # Warehouse (kolom E, F)
-            wh_name = str(row[4]).strip()
-            wh_area = str(row[5]).strip()
-            if wh_name and wh_area:
-                STORE_AREA_MAP[wh_name.lower()] = wh_area
-                # Variasi nama warehouse
-                short_wh = wh_name.lower().replace('warehouse ', '').replace('wh ', '').strip()
-                if short_wh:
-                    STORE_AREA_MAP[short_wh] = wh_area
-                count += 1
+    # Urutan key dipertahankan snapshot (partial match area memakai key pertama yang cocok)
+    STORE_AREA_MAP, count = load_snapshot_dict('master_store', text_fingerprint(csv_content), ('area',), parse)
 
     print(f"    -> {count} store/warehouse mappings loaded")
     return count > 0
@@ -368,40 +490,41 @@ def load_max_stock():
 
     print(f"    ✓ Berhasil fetch dari Google Sheets")
 
-    # Parse CSV
-    reader = csv.reader(io.StringIO(csv_content))
-    rows = list(reader)
-
-    if not rows:
-        return False
-
-    # Struktur: Kolom A=Store, B=MAX Stock
-    count = 0
-    for row in rows[1:]:  # Skip header
-        if len(row) >= 2:
-            store_name = str(row[0]).strip()
-            max_stock_str = str(row[1]).strip()
-
-            if store_name and max_stock_str:
-                # Parse max stock (handle "tidak diketahui" atau nilai kosong)
-                try:
-                    max_stock = int(max_stock_str.replace(',', '').replace('.', ''))
-                except:
-                    max_stock = 0  # Jika tidak bisa di-parse, set 0
-
-                # Simpan dengan lowercase untuk matching
-                MAX_STOCK_MAP[store_name.lower()] = {
-                    'name': store_name,
-                    'max_stock': max_stock
-                }
-                # Simpan juga variasi nama tanpa prefix
-                short_name = store_name.lower().replace('zuma ', '').replace('zuma', '').replace('warehouse ', '').strip()
-                if short_name and short_name != store_name.lower():
-                    MAX_STOCK_MAP[short_name] = {
+    def parse():
+        max_stock_map = {}
+        count = 0
+        rows = list(csv.reader(io.StringIO(csv_content)))
+
+        # Struktur: Kolom A=Store, B=MAX Stock
+        for row in rows[1:]:  # Skip header
+            if len(row) >= 2:
+                store_name = str(row[0]).strip()
+                max_stock_str = str(row[1]).strip()
+
+                if store_name and max_stock_str:
+                    # Parse max stock (handle "tidak diketahui" atau nilai kosong)
+                    try:
+                        max_stock = int(max_stock_str.replace(',', '').replace('.', ''))
+                    except:
+                        max_stock = 0  # Jika tidak bisa di-parse, set 0
+
+                    # Simpan dengan lowercase untuk matching
+                    max_stock_map[store_name.lower()] = {
                         'name': store_name,
                         'max_stock': max_stock
                     }
-                count += 1
+                    # Simpan juga variasi nama tanpa prefix
+                    short_name = store_name.lower().replace('zuma ', '').replace('zuma', '').replace('warehouse ', '').strip()
+                    if short_name and short_name != store_name.lower():
+                        max_stock_map[short_name] = {
+                            'name': store_name,
+                            'max_stock': max_stock
+                        }
+                    count += 1
+        return max_stock_map, count
+
+    MAX_STOCK_MAP, count = load_snapshot_dict('max_stock', text_fingerprint(csv_content),
+                                              ('name', 'max_stock'), parse)
 
     print(f"    -> {count} max stock entries loaded")
     return count > 0
@@ -421,178 +544,311 @@ def load_master_assortment():
 
     print(f"    ✓ Berhasil fetch dari Google Sheets")
 
-    # Parse CSV
-    reader = csv.reader(io.StringIO(csv_content))
-    rows = list(reader)
-
-    if not rows:
-        return False
+    def parse():
+        assortments = {}
+        rows = list(csv.reader(io.StringIO(csv_content)))
 
-    # Struktur: Kolom A=Kode Sku, B=Kode Kecil, C=Assorment, D=Count
-    count = 0
-    for row in rows[1:]:  # Skip header
-        if len(row) >= 3:
-            kode_kecil = str(row[1]).strip().upper()
-            assortment = str(row[2]).strip()
+        # Struktur: Kolom A=Kode Sku, B=Kode Kecil, C=Assorment, D=Count
+        for row in rows[1:]:  # Skip header
+            if len(row) >= 3:
+                kode_kecil = str(row[1]).strip().upper()
+                assortment = str(row[2]).strip()
 
-            if kode_kecil and assortment:
                 # Simpan assortment per kode kecil (hanya perlu 1 karena sama untuk semua size)
-                if kode_kecil not in MASTER_ASSORTMENT:
-                    MASTER_ASSORTMENT[kode_kecil] = assortment
-                    count += 1
+                if kode_kecil and assortment and kode_kecil not in assortments:
+                    assortments[kode_kecil] = assortment
+        return assortments, len(assortments)
+
+    MASTER_ASSORTMENT, count = load_snapshot_dict('master_assortment', text_fingerprint(csv_content),
+                                                  ('assortment',), parse)
 
     print(f"    -> {count} assortment entries loaded")
     return count > 0
 
-def load_sales_data():
-    """Load sales data dari salesss.csv - aggregate per SKU per bulan"""
-    global SALES_DATA
-    SALES_DATA = {}
-
-    sales_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'salesss.csv')
-    if not os.path.exists(sales_file):
-        print(f"    ⚠ Sales file tidak ditemukan: salesss.csv")
-        return False
-
-    print(f"  📊 Loading sales data dari salesss.csv...")
-
-    try:
-        with open(sales_file, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.reader(f, delimiter=';')
-            rows = list(reader)
-
-        # Parse sales: 0=Tanggal, 1=Toko, 15=Sku, 13=Jumlah
-        for row in rows[1:]:
-            if len(row) < 16:
-                continue
-            try:
-                date_str = row[0].split()[0]  # YYYY-MM-DD
-                month = date_str[5:7]  # MM
-                sku = row[15].strip().upper()
-                qty = int(row[13]) if row[13].strip() else 1
-
-                # Skip empty SKU only (non-sandal items now INCLUDED in sales calculation)
-                # because store targets include non-sandal items too
-                if not sku:
-                    continue
-
-                if sku not in SALES_DATA:
-                    SALES_DATA[sku] = {'nov': 0, 'des': 0, 'jan': 0}
-
-                if month == '11':
-                    SALES_DATA[sku]['nov'] += qty
-                elif month == '12':
-                    SALES_DATA[sku]['des'] += qty
-                elif month == '01':
-                    SALES_DATA[sku]['jan'] += qty
-            except:
-                continue
-
-        print(f"    -> {len(SALES_DATA)} SKU dengan data sales loaded")
-        return len(SALES_DATA) > 0
-    except Exception as e:
-        print(f"    ⚠ Error loading sales: {e}")
-        return False
-
-def load_sales_detail():
-    """Load detailed sales data dari sales_2026.csv untuk Sales Dashboard"""
-    global SALES_DETAIL
-    SALES_DETAIL = []
-
-    sales_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sales_2026.csv')
-    if not os.path.exists(sales_file):
-        print(f"    ⚠ Sales detail file tidak ditemukan: sales_2026.csv")
-        return False
+_SALES_FLOAT_MEMO = {}  # {teks: float} - nilai berulang (harga, 0, ...) cukup di-parse sekali
 
-    print(f"  📊 Loading sales detail dari sales_2026.csv...")
-
-    try:
-        with open(sales_file, 'r', encoding='utf-8', errors='replace') as f:
-            reader = csv.reader(f, delimiter=';')
-            rows = list(reader)
+def parse_sales_float(val):
+    """Angka desimal-koma dari export POS ("63600,00" -> 63600.0), kosong -> 0"""
+    result = _SALES_FLOAT_MEMO.get(val)
+    if result is None:
+        stripped = val.strip()
+        result = float(stripped.replace(',', '.')) if stripped else 0.0
+        if len(_SALES_FLOAT_MEMO) < 65536:
+            _SALES_FLOAT_MEMO[val] = result
+    return result
 
+class SalesDetail:
+    """Transaksi sales detail dalam bentuk kolom.
+
+    - kolom string: kode per baris (array 'I') + dictionary nilai unik (urut kemunculan pertama),
+      jadi store/SPG/SKU/order/tanggal yang berulang hanya disimpan sekali
+    - kolom angka: array 'i' (integer) / 'd' (float)
+
+    Iterasi menghasilkan dict per baris (field sama seperti format lama); consumer yang berat
+    sebaiknya memakai codes()/dictionary()/numbers() langsung.
+    Juga reducer untuk ingest_sales_export(): add() mem-parse kolom detail dari baris export.
+    """
+
+    min_columns = 35
+
+    FIELDS = ('date', 'hour', 'store', 'category', 'collection', 'kasir', 'spg', 'order_no',
+              'sku', 'product_name', 'qty', 'price', 'total_before_tax', 'tax_amount', 'total',
+              'gross', 'hpp', 'disc_pct', 'disc_amt', 'disc_code', 'promo', 'retur_qty')
+    STRING_FIELDS = ('date', 'store', 'category', 'collection', 'kasir', 'spg', 'order_no',
+                     'sku', 'product_name', 'disc_code', 'promo')
+    INT_FIELDS = ('hour', 'qty', 'retur_qty')
+
+    def __init__(self):
+        self.n = 0
+        self.columns = {}
+        self.dictionaries = {}
+        for field in self.FIELDS:
+            if field in self.STRING_FIELDS:
+                self.columns[field] = array('I')
+                self.dictionaries[field] = []
+            else:
+                self.columns[field] = array('i' if field in self.INT_FIELDS else 'd')
+        self._code_of = {field: {} for field in self.STRING_FIELDS}
+        self._bind_writers()
+
+    def _bind_writers(self):
+        # Per field (urut FIELDS): append kolom, index nilai -> kode (None untuk angka), dictionary
+        self._appends = [self.columns[field].append for field in self.FIELDS]
+        self._codes_of = [self._code_of.get(field) for field in self.FIELDS]
+        self._dicts = [self.dictionaries.get(field) for field in self.FIELDS]
+
+    def __getstate__(self):
+        # Index nilai -> kode bisa dibangun ulang dari dictionary, tidak perlu ikut di-pickle
+        return {'n': self.n, 'columns': self.columns, 'dictionaries': self.dictionaries}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._code_of = {field: {v: i for i, v in enumerate(values)}
+                         for field, values in self.dictionaries.items()}
+        self._bind_writers()
+
+    def append(self, row):
+        """Tambah satu transaksi; `row` = tuple nilai sesuai urutan FIELDS"""
+        for value, append, code_of, dictionary in zip(row, self._appends, self._codes_of, self._dicts):
+            if code_of is not None:
+                code = code_of.get(value)
+                if code is None:
+                    code = code_of[value] = len(dictionary)
+                    dictionary.append(value)
+                value = code
+            append(value)
+        self.n += 1
+
+    def add(self, row, date_fields, sku):
+        """Reducer: parse satu baris export POS (tanggal & SKU sudah di-parse pipeline)"""
         # Columns: 0=Tanggal, 1=Toko, 2=TipeProduk, 5=Koleksi, 6=Kasir, 8=PenjualanKotor,
         # 10=HPP, 11=NomorPesanan, 13=Jumlah, 15=Sku, 17=Price, 18=PersenDiskon,
         # 19=JumlahDiskon, 20=KodeDiskon, 22=Total, 24=Promosi, 33=JumlahPengembalian, 34=SPG
-        for row in rows[1:]:
-            if len(row) < 35:
+        num = parse_sales_float
+        try:
+            hour = int(date_fields[1].split(':')[0]) if len(date_fields) > 1 else 0
+            kasir = row[6].strip()
+            qty = int(row[13]) if row[13].strip() else 1
+            # Sales = Total (index 22) + Tax Amount (index 25)
+            total_before_tax = num(row[22])
+            tax_amount = num(row[25])
+            retur_qty = int(row[33]) if row[33].strip() else 0
+
+            self.append((
+                date_fields[0],
+                hour,
+                row[1].strip(),
+                row[2].strip(),
+                row[5].strip(),
+                kasir,
+                row[34].strip() or kasir,
+                row[11].strip(),
+                sku,
+                row[4].strip(),  # Tags field has product name
+                qty,
+                num(row[17]),
+                total_before_tax,
+                tax_amount,
+                total_before_tax + tax_amount,
+                num(row[8]),
+                num(row[10]),
+                num(row[18]),
+                num(row[19]),
+                row[20].strip(),
+                row[24].strip(),
+                retur_qty,
+            ))
+        except (ValueError, IndexError):
+            pass
+
+    def result(self):
+        return self
+
+    def __len__(self):
+        return self.n
+
+    def codes(self, field):
+        return self.columns[field]
+
+    def dictionary(self, field):
+        return self.dictionaries[field]
+
+    def numbers(self, field):
+        return self.columns[field]
+
+    def values(self, field):
+        """Nilai kolom per baris (string sudah di-decode)"""
+        dictionary = self.dictionaries.get(field)
+        if dictionary is None:
+            return self.columns[field]
+        return [dictionary[code] for code in self.columns[field]]
+
+    def __iter__(self):
+        fields = self.FIELDS
+        for values in zip(*(self.values(field) for field in fields)):
+            yield dict(zip(fields, values))
+
+SALES_DETAIL = SalesDetail()  # transaksi untuk Sales Dashboard (kolumnar), diisi load_sales_detail()
+
+# Bulan yang masuk SALES_DATA: SALES_MONTH_WINDOW bulan terakhir (rolling) sampai bulan terbaru di data
+# (minimal 1, AVG Control Stock dibagi jumlah bulan ini)
+SALES_MONTH_WINDOW = max(1, int(os.environ.get('SALES_MONTH_WINDOW', '3')))
+SALES_MONTH_PATTERN = re.compile(r'\d{4}-(0[1-9]|1[0-2])$')
+
+def rolling_months(last_month, count):
+    """'2026-02', 3 -> ['2025-12', '2026-01', '2026-02']"""
+    year, month = int(last_month[:4]), int(last_month[5:7])
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months[::-1]
+
+class SkuMonthlySales:
+    """Reducer: qty per SKU per bulan (YYYY-MM) untuk Control Stock.
+
+    result() -> (SALES_DATA {sku: [qty per bulan]}, SALES_MONTHS ['YYYY-MM', ...]) dengan
+    bulan rolling yang diturunkan dari tanggal terbaru di data, bukan key bulan tetap.
+    """
+
+    min_columns = 16
+
+    def __init__(self):
+        self.by_sku = {}  # {sku: {YYYY-MM: qty}}
+
+    def add(self, row, date_fields, sku):
+        # Non-sandal items tetap dihitung karena target store juga termasuk non-sandal
+        try:
+            qty = int(row[13]) if row[13].strip() else 1
+        except ValueError:
+            return
+        by_month = self.by_sku.get(sku)
+        if by_month is None:
+            by_month = self.by_sku[sku] = {}
+        month = date_fields[0][:7]
+        by_month[month] = by_month.get(month, 0) + qty
+
+    def result(self):
+        months = {month for by_month in self.by_sku.values() for month in by_month}
+        valid = sorted(m for m in months if SALES_MONTH_PATTERN.match(m))
+        window = rolling_months(valid[-1] if valid else time.strftime('%Y-%m'), SALES_MONTH_WINDOW)
+        sales = {sku: [by_month.get(month, 0) for month in window]
+                 for sku, by_month in self.by_sku.items()}
+        return sales, window
+
+def ingest_sales_export(path, reducers):
+    """Baca satu export POS (CSV ;) sekali dan kirim tiap baris ke semua reducer (fan-out).
+
+    Pipeline mem-parse bagian yang sama untuk semua consumer (split tanggal, SKU) satu kali;
+    reducer menerima (row, date_fields, sku) dan hanya mem-parse kolom yang ia pakai.
+    Baris tanpa tanggal/SKU di-skip.
+    """
+    reducers = list(reducers)
+    min_columns = min(r.min_columns for r in reducers)
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        next(reader, None)
+        for row in reader:
+            n = len(row)
+            if n < min_columns:
                 continue
-            try:
-                date_str = row[0].strip()
-                if not date_str:
-                    continue
-
-                # Parse date: "2026-01-18 10:12:51 +07:00"
-                date_parts = date_str.split()[0]  # "2026-01-18"
-                time_parts = date_str.split()[1] if len(date_str.split()) > 1 else "00:00:00"
-                hour = int(time_parts.split(':')[0]) if time_parts else 0
-
-                store = row[1].strip()
-                category = row[2].strip()
-                product_name = row[4].strip() if len(row) > 4 else ''  # Tags field has product name
-                collection = row[5].strip()
-                kasir = row[6].strip()
-                gross = float(row[8].replace(',', '.')) if row[8].strip() else 0
-                hpp = float(row[10].replace(',', '.')) if row[10].strip() else 0
-                order_no = row[11].strip()
-                qty = int(row[13]) if row[13].strip() else 1
-                sku = row[15].strip().upper()
-                price = float(row[17].replace(',', '.')) if row[17].strip() else 0
-                disc_pct = float(row[18].replace(',', '.')) if row[18].strip() else 0
-                disc_amt = float(row[19].replace(',', '.')) if row[19].strip() else 0
-                disc_code = row[20].strip()
-                # Get Total (index 22) and Tax Amount (index 25)
-                total_before_tax = float(row[22].replace(',', '.')) if row[22].strip() else 0
-                tax_amount = float(row[25].replace(',', '.')) if len(row) > 25 and row[25].strip() else 0
-                # Sales = Total + Tax Amount
-                total = total_before_tax + tax_amount
-                promo = row[24].strip()
-                retur_qty = int(row[33]) if row[33].strip() else 0
-                spg = row[34].strip() if len(row) > 34 else kasir
-
-                # Skip empty SKU only (non-sandal items now INCLUDED)
-                if not sku:
-                    continue
-
-                SALES_DETAIL.append({
-                    'date': date_parts,
-                    'hour': hour,
-                    'store': store,
-                    'category': category,
-                    'collection': collection,
-                    'kasir': kasir,
-                    'spg': spg or kasir,
-                    'order_no': order_no,
-                    'sku': sku,
-                    'product_name': product_name,
-                    'qty': qty,
-                    'price': price,
-                    'total_before_tax': total_before_tax,
-                    'tax_amount': tax_amount,
-                    'total': total,
-                    'gross': gross,
-                    'hpp': hpp,
-                    'disc_pct': disc_pct,
-                    'disc_amt': disc_amt,
-                    'disc_code': disc_code,
-                    'promo': promo,
-                    'retur_qty': retur_qty
-                })
-            except Exception as e:
+            date_fields = row[0].split()  # "2026-01-18 10:12:51 +07:00"
+            if not date_fields:
+                continue
+            sku = row[15].strip().upper()
+            if not sku:
                 continue
+            for reducer in reducers:
+                if n >= reducer.min_columns:
+                    reducer.add(row, date_fields, sku)
+
+# Consumer sales: nama -> (file export, reducer). Consumer dengan file sama dibaca dalam satu pass.
+# Total harian per toko tidak punya reducer sendiri: diambil dari sales cube (build_sales_cube)
+# yang di-roll-up dari SALES_DETAIL, per date x store sudah tersedia di sana.
+SALES_SUMMARY_FILE = os.environ.get('SALES_SUMMARY_FILE', 'salesss.csv')
+SALES_DETAIL_FILE = os.environ.get('SALES_DETAIL_FILE', 'sales_2026.csv')
+SALES_CONSUMERS = {
+    'sales_data': (SALES_SUMMARY_FILE, SkuMonthlySales),
+    'sales_detail': (SALES_DETAIL_FILE, SalesDetail),
+}
 
-        print(f"    -> {len(SALES_DETAIL)} transaksi loaded")
-        return len(SALES_DETAIL) > 0
-    except Exception as e:
-        print(f"    ⚠ Error loading sales detail: {e}")
-        return False
+def sales_export_path(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+def read_sales_exports(names, ingested=None):
+    """Result reducer untuk consumer `names` ({nama: result}; None jika file tidak ada/gagal).
+
+    Semua consumer yang memakai file yang sama ikut di-feed dalam pass yang sama; simpan
+    `ingested` ({path: {nama: result}}) untuk memakai ulang pass tsb di panggilan berikutnya.
+    """
+    ingested = {} if ingested is None else ingested
+    results = {}
+    for name in names:
+        filename, _ = SALES_CONSUMERS[name]
+        path = sales_export_path(filename)
+        if path not in ingested:
+            ingested[path] = {}
+            if not os.path.exists(path):
+                print(f"    ⚠ Sales file tidak ditemukan: {filename}")
+            else:
+                reducers = {other: make() for other, (other_file, make) in SALES_CONSUMERS.items()
+                            if sales_export_path(other_file) == path}
+                print(f"  📊 Loading {', '.join(reducers)} dari {filename}...")
+                try:
+                    ingest_sales_export(path, reducers.values())
+                    ingested[path] = {other: r.result() for other, r in reducers.items()}
+                except Exception as e:
+                    print(f"    ⚠ Error loading {filename}: {e}")
+        results[name] = ingested[path].get(name)
+    return results
+
+def load_sales_data(ingested=None):
+    """Load sales data dari salesss.csv - qty per SKU untuk bulan rolling SALES_MONTHS.
+
+    Return (SALES_DATA, SALES_MONTHS).
+    """
+    global SALES_DATA, SALES_MONTHS
+    result = read_sales_exports(['sales_data'], ingested)['sales_data']
+    SALES_DATA, SALES_MONTHS = result or ({}, rolling_months(time.strftime('%Y-%m'), SALES_MONTH_WINDOW))
+    print(f"    -> {len(SALES_DATA)} SKU dengan data sales loaded ({', '.join(SALES_MONTHS)})")
+    return SALES_DATA, SALES_MONTHS
+
+def load_sales_detail(ingested=None):
+    """Load detailed sales data dari sales_2026.csv untuk Sales Dashboard (streaming, kolumnar).
+
+    Return SALES_DETAIL.
+    """
+    global SALES_DETAIL
+    SALES_DETAIL = read_sales_exports(['sales_detail'], ingested)['sales_detail'] or SalesDetail()
+    print(f"    -> {len(SALES_DETAIL)} transaksi loaded")
+    return SALES_DETAIL
 
 def load_target_data():
     """Load target data dari Google Sheets (gid=463036025)"""
     global TARGET_DATA
     TARGET_DATA = {}
 
-    gid = 463036025
+    gid = SHEET_GID.get('target', 463036025)
     print(f"  🎯 Fetching Target Data dari Google Sheets (gid={gid})...")
     csv_content = fetch_google_sheet(gid)
 
@@ -637,55 +893,92 @@ def load_target_data():
         print(f"    ⚠ Error parsing Target: {e}")
         return False
 
-def get_product_info_from_master(sku):
-    """Get product info dari Master Data (by SKU) dan Tier dari Master Produk (by Kode Kecil)"""
-    if not sku:
-        return None
-
-    sku_upper = sku.upper()
-    result = None
-
-    # Coba dari Master Data dulu (by full SKU)
-    if sku_upper in MASTER_DATA:
-        result = MASTER_DATA[sku_upper].copy()
-
-    if not result:
-        return None
-
-    # Prioritas tier: Master Produk by kode_kecil > Master Data
-    kode_kecil = result.get('kode_kecil', '') or extract_kode_kecil(sku)
-
-    # 1. Coba lookup dari MASTER_PRODUK by kode_kecil (paling akurat)
-    if kode_kecil and kode_kecil.upper() in MASTER_PRODUK:
-        produk_info = MASTER_PRODUK[kode_kecil.upper()]
-        if produk_info.get('tier'):
-            result['tier'] = produk_info.get('tier', '')
-    # 2. Kalau tidak ada di MASTER_PRODUK, gunakan tier dari Master Data (sudah ada di result)
-    # Tidak perlu action karena result['tier'] sudah ada dari Master Data
-
-    return result
-
 # Fallback Area Mapping (digunakan jika tidak ada di Master Store/Warehouse)
 AREA_MAPPING_FALLBACK = {
     'Warehouse': 'Warehouse', 'Pusat': 'Jawa Timur', 'WH': 'Warehouse',
     'Gudang': 'Warehouse', 'Box': 'Bali', 'Protol': 'Bali', 'Reject': 'Bali'
 }
 
+class StoreAreaResolver:
+    """Resolver nama store -> area dari STORE_AREA_MAP dengan index + memo.
+
+    Aturan sama dengan scan linear lama (exact match dulu, lalu key pertama
+    sesuai urutan map yang merupakan substring nama lokasi atau sebaliknya),
+    tapi tanpa iterasi semua key:
+    - key yang terkandung di nama: cek semua substring nama ke set key
+    - key yang mengandung nama: index substring -> urutan key terkecil
+    """
+
+    def __init__(self, area_map):
+        self.source = area_map
+        self.size = len(area_map)
+        self.keys = list(area_map.keys())
+        self.areas = list(area_map.values())
+        self.key_order = {key: i for i, key in enumerate(self.keys)}
+        self.max_key_len = max((len(k) for k in self.keys), default=0)
+        # {substring: index key terkecil yang mengandung substring tsb}
+        self.substring_index = {}
+        for i, key in enumerate(self.keys):
+            n = len(key)
+            for a in range(n):
+                for b in range(a + 1, n + 1):
+                    self.substring_index.setdefault(key[a:b], i)
+        self.memo = {}
+
+    def is_stale(self, area_map):
+        return area_map is not self.source or len(area_map) != self.size
+
+    def exact(self, name_lower):
+        i = self.key_order.get(name_lower)
+        return self.areas[i] if i is not None else None
+
+    def partial(self, name_lower, needle=None):
+        """Area dari key pertama yang ada di `name_lower` atau mengandung `needle`"""
+        needle = name_lower if needle is None else needle
+        memo_key = (name_lower, needle)
+        if memo_key in self.memo:
+            return self.memo[memo_key]
+
+        best = self.substring_index.get(needle, len(self.keys)) if needle else len(self.keys)
+        if needle == '' and self.keys:
+            best = 0  # string kosong terkandung di semua key
+        n = len(name_lower)
+        for a in range(n):
+            for b in range(a + 1, min(n, a + self.max_key_len) + 1):
+                i = self.key_order.get(name_lower[a:b])
+                if i is not None and i < best:
+                    best = i
+
+        area = self.areas[best] if best < len(self.keys) else None
+        self.memo[memo_key] = area
+        return area
+
+_AREA_RESOLVER = None
+
+def get_area_resolver():
+    """Resolver untuk STORE_AREA_MAP saat ini (dibangun ulang jika map berubah)"""
+    global _AREA_RESOLVER
+    if _AREA_RESOLVER is None or _AREA_RESOLVER.is_stale(STORE_AREA_MAP):
+        _AREA_RESOLVER = StoreAreaResolver(STORE_AREA_MAP)
+    return _AREA_RESOLVER
+
 def get_area(location_name):
     """Tentukan area dari nama lokasi - prioritas dari Master Store/Warehouse"""
     if not location_name:
         return 'Warehouse'
 
     loc_lower = location_name.lower().strip()
+    resolver = get_area_resolver()
 
     # 1. Cek exact match di STORE_AREA_MAP (dari Master Store/Warehouse)
-    if loc_lower in STORE_AREA_MAP:
-        return STORE_AREA_MAP[loc_lower]
+    area = resolver.exact(loc_lower)
+    if area is not None:
+        return area
 
     # 2. Cek partial match di STORE_AREA_MAP
-    for store_key, area in STORE_AREA_MAP.items():
-        if store_key in loc_lower or loc_lower in store_key:
-            return area
+    area = resolver.partial(loc_lower)
+    if area is not None:
+        return area
 
     # 3. Cek keyword matching untuk warehouse
     loc_upper = location_name.upper()
@@ -700,6 +993,231 @@ def get_area(location_name):
     # 5. Default ke Bali
     return 'Bali'
 
+# Keyword fallback area untuk dashboard (sama dengan aturan getAreaFromStore di JS)
+DASHBOARD_AREA_KEYWORDS = [
+    ('Lombok', ['lombok', 'mataram']),
+    ('Batam', ['batam', 'nagoya']),
+    ('Sulawesi', ['manado']),
+    ('Sumatera', ['pekanbaru', 'ska mall']),
+    ('Bali', ['bali', 'galeria', 'level 21', 'lippo bali', 'icon', 'dalung', 'kedonganan',
+              'kesiman', 'panjer', 'peguyangan', 'peliatan', 'penatih', 'singaraja', 'tabanan',
+              'tanah lot', 'bajra', 'bangli', 'batubulan', 'jembrana', 'kapal', 'karangasem',
+              'klungkung', 'lebah', 'monang', 'monkey', 'ubud', 'pemogan', 'seririt', 'uluwatu',
+              'gianyar', 'sawangan', 'pameran']),
+    ('Jakarta', ['jakarta', 'moi', 'pluit', 'bintaro', 'puri', 'living world', 'epicentrum']),
+    ('Jawa Timur', ['surabaya', 'galaxy', 'tunjungan', 'royal plaza', 'ptc', 'cito',
+                    'city of tomorrow', 'sidoarjo', 'gresik', 'mog', 'olympic', 'mojokerto',
+                    'sunrise', 'matos', 'malang', 'batu']),
+]
+
+def get_dashboard_area(store_name):
+    """Area store sesuai aturan dashboard (dipakai untuk precompute storeAreaLookup)"""
+    if not store_name:
+        return 'Unknown'
+    s = store_name.lower().strip()
+    resolver = get_area_resolver()
+
+    # 1. Exact match
+    area = resolver.exact(s)
+    if area is not None:
+        return area
+
+    # 2. Tanpa prefix "zuma " (replace pertama saja, sama seperti JS)
+    no_prefix = s.replace('zuma ', '', 1).replace('zuma', '', 1)
+    area = resolver.exact(no_prefix)
+    if area is not None:
+        return area
+
+    # 3. Partial match
+    area = resolver.partial(s, no_prefix)
+    if area is not None:
+        return area
+
+    # 4. Keyword fallback
+    for area, keywords in DASHBOARD_AREA_KEYWORDS:
+        if any(k in s for k in keywords):
+            return area
+
+    return 'Bali'
+
+def build_store_area_lookup(all_stores):
+    """Resolve area untuk semua nama store/warehouse yang dipakai dashboard"""
+    names = []
+    for entity_stores in all_stores.values():
+        for stores in entity_stores.values():
+            names.extend(s['name'] for s in stores)
+    names.extend(SALES_DETAIL.dictionary('store'))
+    names.extend(t['store'] for t in TARGET_DATA.values())
+    names.extend(m['name'] for m in MAX_STOCK_MAP.values())
+
+    return {name: get_dashboard_area(name) for name in dict.fromkeys(names) if name}
+
+# Tier yang dihitung di Max Stock Analysis
+MAX_STOCK_TIERS = ('0', '1', '2', '3', '4', '5', '8')
+STOCK_ROLLUP_ENTITIES = ('DDD', 'LJBB', 'MBB', 'UBB')
+
+def get_max_stock_for_store(store_name):
+    """Max stock untuk store (port getMaxStockForStore di dashboard)"""
+    if not store_name:
+        return 0
+    s = store_name.lower().strip()
+    if s in MAX_STOCK_MAP:
+        return MAX_STOCK_MAP[s]['max_stock']
+    no_prefix = s.replace('zuma ', '', 1).replace('zuma', '', 1)
+    if no_prefix in MAX_STOCK_MAP:
+        return MAX_STOCK_MAP[no_prefix]['max_stock']
+    for key, entry in MAX_STOCK_MAP.items():
+        if key in s or s in key:
+            return entry['max_stock']
+    return 0
+
+def get_warehouse_area(wh_name):
+    """Area warehouse (port getWarehouseArea di updateMaxStockAnalysis)"""
+    if not wh_name:
+        return 'Jawa Timur'
+    wh_lower = wh_name.lower()
+    if STORE_AREA_MAP.get(wh_lower):
+        return STORE_AREA_MAP[wh_lower]
+    if 'bali' in wh_lower or 'gatsu' in wh_lower:
+        return 'Bali'
+    if 'jakarta' in wh_lower or 'pluit' in wh_lower:
+        return 'Jakarta'
+    return 'Jawa Timur'
+
+def _iter_store_stock(items):
+    """(item, store, stock) dengan urutan store sama seperti store_stock hasil hydrate di JS"""
+    stores = list(dict.fromkeys(store for item in items for store in item['store_stock']))
+    for item in items:
+        row = item['store_stock']
+        for store in stores:
+            if store in row:
+                yield item, store, row[store]
+
+def build_stock_chart_rollup(items):
+    """Ringkasan chart Retail/Warehouse untuk tampilan tanpa filter.
+
+    Sama dengan hitungan updateRetailCharts/updateWarehouseCharts: item
+    digroup per kode kecil lalu diurutkan total desc (sort default tabel).
+    """
+    # Group dibuat dulu (urutan kemunculan kode kecil), baru stock per store
+    groups = {}
+    for item in items:
+        kk = (item.get('kode_kecil') or '').upper()
+        if not kk:
+            continue
+        if kk not in groups:
+            groups[kk] = {'gender': item.get('gender'), 'series': item.get('series'), 'total': 0, 'store_stock': {}}
+        groups[kk]['total'] += item.get('total') or 0
+    for item, store, stock in _iter_store_stock(items):
+        kk = (item.get('kode_kecil') or '').upper()
+        if kk:
+            group_stock = groups[kk]['store_stock']
+            group_stock[store] = group_stock.get(store, 0) + stock
+
+    cat, series_data, area_data = {}, {}, {}
+    total_stock = 0
+    minus_articles = 0
+    minus_pairs = 0
+    minus_locations = set()
+    for group in sorted(groups.values(), key=lambda g: -g['total']):
+        gender = group['gender'] or 'BABY'
+        series = group['series'] or '-'
+        stock_value = group['total']
+        cat[gender] = cat.get(gender, 0) + max(0, stock_value)
+        if series not in ('-', ''):
+            key = series + ' - ' + gender
+            series_data[key] = series_data.get(key, 0) + max(0, stock_value)
+        total_stock += stock_value
+
+        for store, stock in group['store_stock'].items():
+            area = get_dashboard_area(store)
+            area_data[area] = area_data.get(area, 0) + max(0, stock)
+            if stock < 0:
+                minus_articles += 1
+                minus_pairs += abs(stock)
+                minus_locations.add(store)
+
+    return {
+        'sku': len(groups),
+        'stock': total_stock,
+        'cat': cat,
+        'series': series_data,
+        'area': area_data,
+        'minus': [minus_articles, minus_pairs, len(minus_locations)],
+    }
+
+def _new_max_stock_row(name, area):
+    return {'name': name, 'area': area, 'actual': 0, 'tiers': {}, 'articles': {}}
+
+def build_max_stock_rollup(all_data):
+    """Stock per store retail (per entity) dan per warehouse untuk Max Stock Analysis.
+
+    Hanya item dengan tier valid. `articles` = jumlah artikel dengan stock != 0
+    per tier; daftar artikelnya baru dibangun di browser saat tier diklik.
+    Urutan iterasi dan reset saat total lokasi masih 0 sama dengan loop lama di
+    updateMaxStockAnalysis, jadi angkanya identik.
+    """
+    retail = {}
+    for entity, types in all_data.items():
+        rows = {}
+        for item, store, stock in _iter_store_stock(types.get('retail') or []):
+            tier = str(item.get('tier') or '')
+            if tier not in MAX_STOCK_TIERS or not store or 'warehouse' in store.lower():
+                continue
+            row = rows.get(store)
+            if row is None:
+                row = rows[store] = _new_max_stock_row(store, get_dashboard_area(store))
+            if not row['actual']:
+                row['tiers'], row['articles'] = {}, {}
+            row['actual'] += stock
+            if not row['tiers'].get(tier):
+                row['tiers'][tier] = 0
+                row['articles'][tier] = 0
+            row['tiers'][tier] += stock
+            if stock != 0:
+                row['articles'][tier] += 1
+        for row in rows.values():
+            row['max'] = get_max_stock_for_store(row['name'])
+            row['fill'] = row['actual'] / row['max'] * 100 if row['max'] > 0 else 0
+        retail[entity] = list(rows.values())
+
+    warehouses = {}
+    areas = {}
+    for entity in STOCK_ROLLUP_ENTITIES:
+        items = (all_data.get(entity) or {}).get('warehouse') or []
+        for item, wh_name, stock in _iter_store_stock(items):
+            tier = str(item.get('tier') or '')
+            if tier not in MAX_STOCK_TIERS:
+                continue
+            row = warehouses.get(wh_name)
+            if row is None:
+                row = warehouses[wh_name] = _new_max_stock_row(wh_name, get_warehouse_area(wh_name))
+            if not row['actual']:
+                row['tiers'], row['articles'], row['entities'] = {}, {}, {}
+            row['actual'] += stock
+            row['entities'][entity] = row['entities'].get(entity, 0) + stock
+            row['tiers'][tier] = row['tiers'].get(tier, 0) + stock
+            if stock != 0:
+                row['articles'][tier] = row['articles'].get(tier, 0) + 1
+
+            # Total area tidak pernah di-reset
+            area = areas.setdefault(row['area'], {'actual': 0, 'tiers': {}, 'entities': {}})
+            area['actual'] += stock
+            area['tiers'][tier] = area['tiers'].get(tier, 0) + stock
+            area['entities'][entity] = area['entities'].get(entity, 0) + stock
+
+    return {'retail': retail, 'warehouse': list(warehouses.values()), 'warehouse_area': areas}
+
+def build_stock_rollups(all_data):
+    """Rollup stock yang di-embed ke dashboard (chart tanpa filter + Max Stock Analysis)"""
+    return {
+        'charts': {
+            entity: {data_type: build_stock_chart_rollup(items) for data_type, items in types.items()}
+            for entity, types in all_data.items()
+        },
+        'maxstock': build_max_stock_rollup(all_data),
+    }
+
 def parse_number(val):
     """Parse number dari format Indonesia (comma decimal, dot thousand)"""
     if not val:
@@ -712,98 +1230,253 @@ def parse_number(val):
     except:
         return 0
 
-def extract_product_info(name, sku):
-    """Extract kategori, gender, series dari Master Data atau SKU"""
-    info = {
-        'size': '',
-        'category': '',
-        'gender': '',
-        'series': '',
-        'tipe': '',
-        'color': '',
-        'kode_kecil': '',
-        'nama_master': '',
-        'tier': ''
-    }
+GENDER_CATEGORIES = {'BABY', 'BOYS', 'GIRLS', 'JUNIOR', 'LADIES', 'MEN'}
+# Fallback kategori dari prefix SKU (dicek berurutan), default BABY
+SKU_PREFIX_CATEGORIES = (('Z', 'BABY'), ('BB', 'BABY'), ('B2', 'BOYS'), ('B1', 'BOYS'),
+                         ('G2', 'GIRLS'), ('G1', 'GIRLS'), ('J', 'JUNIOR'), ('L', 'LADIES'),
+                         ('M', 'MEN'))
+
+class ProductEnricher:
+    """Hash join SKU ke MASTER_DATA (by SKU) dan MASTER_PRODUK (by kode kecil).
+
+    Hasil per SKU (tuple sesuai FIELDS) di-memo, jadi SKU yang muncul di beberapa file
+    (retail & warehouse DDD, LJBB, ...) hanya di-join dan di-parse sekali.
+    Prioritas tier: Master Produk by kode kecil > Master Data.
+    """
+
+    FIELDS = ('kode_kecil', 'nama_master', 'size', 'category', 'gender', 'series', 'tipe', 'tier')
+
+    def __init__(self, master_data, master_produk):
+        self.master_data = master_data
+        self.master_produk = master_produk
+        self.sizes = (len(master_data), len(master_produk))
+        self.memo = {}
+
+    def is_stale(self, master_data, master_produk):
+        return (master_data is not self.master_data or master_produk is not self.master_produk
+                or (len(master_data), len(master_produk)) != self.sizes)
+
+    def lookup(self, sku):
+        row = self.memo.get(sku)
+        if row is not None:
+            return row
+
+        sku_clean = (sku or '').strip()
+        sku_upper = sku_clean.upper()
+        # Satu regex untuk kode kecil (SKU tanpa Z+size) dan size fallback
+        match = SKU_SIZE_SUFFIX.search(sku_upper)
+        derived_kk = sku_clean[:match.start()] if match else sku_clean
+        suffix_size = match.group(1) if match else ''
+
+        master = self.master_data.get(sku_upper)
+        if master:
+            kode_kecil = master.kode_kecil
+            nama = master.name
+            gender = master.gender
+            series = master.series
+            tier = master.tier
+            produk = self.master_produk.get((kode_kecil or derived_kk).upper())
+            if produk and produk.get('tier'):
+                tier = produk['tier']
+            size = master.size or suffix_size
+        else:
+            kode_kecil, nama, gender, series, tier = derived_kk, '', '', '', ''
+            size = suffix_size
+
+        # Tipe (dan tier fallback) dari MASTER_PRODUK by kode kecil
+        tipe = ''
+        produk = self.master_produk.get(kode_kecil.upper()) if kode_kecil else None
+        if produk:
+            tipe = produk.get('tipe', '')
+            if not tier and produk.get('tier'):
+                tier = produk['tier']
+
+        # Category dari Gender di Master Data, fallback dari prefix SKU
+        category = (gender or '').upper()
+        if category not in GENDER_CATEGORIES:
+            category = next((cat for prefix, cat in SKU_PREFIX_CATEGORIES
+                             if sku_upper.startswith(prefix)), 'BABY')
+
+        # Series - jika kosong tampilkan "-"
+        if not series or not series.strip():
+            series = '-'
+
+        row = (kode_kecil, nama, size, category, gender, series, tipe, tier)
+        self.memo[sku] = row
+        return row
+
+_PRODUCT_ENRICHER = None
+
+def get_product_enricher():
+    """Enricher untuk MASTER_DATA/MASTER_PRODUK saat ini (dibangun ulang jika master berubah)"""
+    global _PRODUCT_ENRICHER
+    if _PRODUCT_ENRICHER is None or _PRODUCT_ENRICHER.is_stale(MASTER_DATA, MASTER_PRODUK):
+        _PRODUCT_ENRICHER = ProductEnricher(MASTER_DATA, MASTER_PRODUK)
+    return _PRODUCT_ENRICHER
+
+def enrich_products(skus, names):
+    """Enrichment batch satu file: list SKU & nama -> dict kolom (FIELDS + color)"""
+    lookup = get_product_enricher().lookup
+    rows = [lookup(sku) for sku in skus]
+    columns = {field: list(col) for field, col in zip(ProductEnricher.FIELDS, zip(*rows))}
+    if not rows:
+        columns = {field: [] for field in ProductEnricher.FIELDS}
+    # Color - dari nama setelah koma terakhir
+    columns['color'] = [name.rsplit(',', 1)[1].strip() if name and ',' in name else ''
+                        for name in names]
+    return columns
+
+# Pola SKU: alfanumerik/dash minimal 5 karakter, tanpa spasi
+SKU_PATTERN = re.compile(r'^[A-Z0-9\-]{5,}$', re.IGNORECASE)
+
+def parse_stock_header(headers):
+    """Tentukan index kolom SKU, nama, total dan kolom store dari baris header"""
+    sku_col = -1
+    name_col = -1
+    total_col = -1
+    store_cols = {}  # {col_index: store_name}
+
+    for idx, h in enumerate(headers):
+        h_str = str(h).strip()
+        h_lower = h_str.lower()
+
+        if 'kode barang' in h_lower or h_lower == 'kode':
+            sku_col = idx
+        elif 'nama barang' in h_lower:
+            name_col = idx
+        elif 'total' in h_lower:
+            total_col = idx
+        elif h_str and len(h_str) > 2:
+            # Check if it's a store/warehouse column
+            if any(x in h_str.upper() for x in ['ZUMA', 'WAREHOUSE', 'WH']):
+                store_cols[idx] = h_str
+            elif any(x in h_str for x in ['Mall', 'Store', 'Toko']):
+                store_cols[idx] = h_str
+
+    return sku_col, name_col, total_col, store_cols
+
+def find_sku_in_row(row, sku_col):
+    """Ambil SKU dari kolom SKU; scan semua cell hanya jika kolom tidak ada/kosong"""
+    if 0 <= sku_col < len(row):
+        cell_str = row[sku_col].strip()
+        if cell_str and SKU_PATTERN.match(cell_str) and 'total' not in cell_str.lower():
+            return cell_str
+
+    for cell in row:
+        cell_str = str(cell).strip()
+        if cell_str and SKU_PATTERN.match(cell_str):
+            if ' ' not in cell_str and 'total' not in cell_str.lower():
+                return cell_str
+    return ''
+
+# Jumlah SKU per batch enrich_products() saat membaca file stock
+STOCK_ENRICH_CHUNK = max(1, int(os.environ.get('STOCK_ENRICH_CHUNK', '2000')))
+
+def iter_stock_items(rows, entity, data_type, sku_col, name_col, total_col, store_cols):
+    """Generator: baca baris data stock, enrich per batch STOCK_ENRICH_CHUNK SKU, lalu yield item dict.
+
+    `rows` boleh berupa csv.reader (streaming); yang ditahan hanya SKU, nama, total dan stok
+    per store dari batch yang sedang dibaca, jadi memori tidak ikut besar dengan ukuran file.
+    Info produk diambil per kolom lewat enrich_products() sekali per batch.
+    """
+    # Koreksi doubled store dihitung sekali per kolom, bukan per baris
+    store_col_list = [
+        (col_idx, store_name, DOUBLED_STORES.get(store_name.lower(), 1.0))
+        for col_idx, store_name in store_cols.items()
+    ]
+    seen_skus = set()
+    skus, names, totals, store_stocks = [], [], [], []
+
+    def enriched_batch():
+        # Extract product info untuk semua SKU di batch ini
+        info = enrich_products(skus, names)
+
+        for i, sku in enumerate(skus):
+            # Gunakan nama dari master jika ada, jika tidak gunakan dari CSV
+            display_name = info['nama_master'][i] or names[i] or sku
 
-    upper_name = (name or '').upper()
-    upper_sku = (sku or '').upper()
+            # Filter: hanya produk sandal (exclude hanger, aksesoris, dll)
+            if not is_sandal_product(display_name, sku):
+                continue
 
-    # Coba ambil dari Master Data (by full SKU)
-    master_info = get_product_info_from_master(sku)
-    if master_info:
-        info['kode_kecil'] = master_info.get('kode_kecil', '')
-        info['nama_master'] = master_info.get('nama', '')
-        info['series'] = master_info.get('series', '')
-        info['gender'] = master_info.get('gender', '')
-        info['tier'] = master_info.get('tier', '')
-        # Size dari Master Data (kolom F) - prioritas utama
-        if master_info.get('size'):
-            info['size'] = master_info.get('size', '')
-    else:
-        # Fallback: extract kode kecil dari SKU
-        info['kode_kecil'] = extract_kode_kecil(sku)
-
-    # Get tipe and tier from MASTER_PRODUK by kode_kecil (as fallback)
-    kode_kecil_upper = (info['kode_kecil'] or '').upper()
-    if kode_kecil_upper and kode_kecil_upper in MASTER_PRODUK:
-        produk_info = MASTER_PRODUK[kode_kecil_upper]
-        info['tipe'] = produk_info.get('tipe', '')
-        # Tier fallback: jika tier belum ada dari Master Data, ambil dari Master Produk
-        if not info['tier'] and produk_info.get('tier'):
-            info['tier'] = produk_info.get('tier', '')
-
-    # Fallback size dari SKU jika Master Data tidak punya
-    if not info['size']:
-        size_match = re.search(r'Z(\d{2,3})$', upper_sku)
-        if size_match:
-            info['size'] = size_match.group(1)
-
-    # Category dari Gender di Master Data
-    gender_upper = (info['gender'] or '').upper()
-    if gender_upper == 'BABY':
-        info['category'] = 'BABY'
-    elif gender_upper == 'BOYS':
-        info['category'] = 'BOYS'
-    elif gender_upper == 'GIRLS':
-        info['category'] = 'GIRLS'
-    elif gender_upper == 'JUNIOR':
-        info['category'] = 'JUNIOR'
-    elif gender_upper == 'LADIES':
-        info['category'] = 'LADIES'
-    elif gender_upper == 'MEN':
-        info['category'] = 'MEN'
-    else:
-        # Fallback dari SKU prefix
-        if upper_sku.startswith('Z') or upper_sku.startswith('BB'):
-            info['category'] = 'BABY'
-        elif upper_sku.startswith('B2') or upper_sku.startswith('B1'):
-            info['category'] = 'BOYS'
-        elif upper_sku.startswith('G2') or upper_sku.startswith('G1'):
-            info['category'] = 'GIRLS'
-        elif upper_sku.startswith('J'):
-            info['category'] = 'JUNIOR'
-        elif upper_sku.startswith('L'):
-            info['category'] = 'LADIES'
-        elif upper_sku.startswith('M'):
-            info['category'] = 'MEN'
+            yield {
+                'sku': sku,
+                'kode_kecil': info['kode_kecil'][i],
+                'name': display_name,
+                'size': info['size'][i],
+                'category': info['category'][i],
+                'gender': info['gender'][i],
+                'series': info['series'][i],
+                'tipe': info['tipe'][i],
+                'tier': info['tier'][i],
+                'color': info['color'][i],
+                'total': totals[i],
+                'store_stock': store_stocks[i],
+                'entity': entity,
+                'type': data_type
+            }
+
+    for row in rows:
+        if len(row) < 3:
+            continue
+
+        sku = find_sku_in_row(row, sku_col)
+        if not sku or 'total' in sku.lower():
+            continue
+
+        # Get unique key
+        if sku in seen_skus:
+            continue
+        seen_skus.add(sku)
+
+        # Get name
+        name = ''
+        if 0 <= name_col < len(row):
+            name = str(row[name_col]).strip()
+        if not name:
+            for cell in row:
+                cell_str = str(cell).strip()
+                if cell_str and len(cell_str) > 10 and ',' in cell_str:
+                    name = cell_str
+                    break
+
+        # Get total stock
+        total = 0
+        if 0 <= total_col < len(row):
+            total = parse_number(row[total_col])
         else:
-            info['category'] = 'BABY'
+            for j in range(len(row) - 1, -1, -1):
+                cell_str = str(row[j]).strip()
+                if cell_str and cell_str not in ['', '-']:
+                    val = parse_number(row[j])
+                    if val != 0 or '0' in cell_str:
+                        total = val
+                        break
 
-    # Series - gunakan dari master, jika kosong tampilkan "-"
-    if not info['series'] or info['series'].strip() == '':
-        info['series'] = '-'
+        # Get per-store stock (termasuk stok 0 agar bisa filter Out of Stock per store)
+        store_stock = {}
+        row_len = len(row)
+        for col_idx, store_name, correction in store_col_list:
+            if col_idx < row_len:
+                stock_val = parse_number(row[col_idx])
+                # Apply correction for doubled stores
+                if correction != 1.0:
+                    stock_val = int(stock_val * correction)
+                store_stock[store_name] = stock_val  # Include semua, termasuk 0
 
-    # Color - extract from name after last comma
-    if ',' in (name or ''):
-        parts = name.split(',')
-        if len(parts) >= 2:
-            info['color'] = parts[-1].strip()
+        skus.append(sku)
+        names.append(name)
+        totals.append(total)
+        store_stocks.append(store_stock)
 
-    return info
+        if len(skus) >= STOCK_ENRICH_CHUNK:
+            yield from enriched_batch()
+            skus, names, totals, store_stocks = [], [], [], []
+
+    yield from enriched_batch()
 
 def read_csv_detailed(filepath, entity, data_type):
-    """Baca CSV dengan detail per store/warehouse"""
+    """Baca CSV dengan detail per store/warehouse (streaming, satu pass)"""
     items = []
     stores_list = []
 
@@ -814,155 +1487,39 @@ def read_csv_detailed(filepath, entity, data_type):
     print(f"  Membaca: {filepath}")
 
     try:
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        rows = []
-
-        for encoding in encodings:
-            try:
-                with open(filepath, 'r', encoding=encoding, errors='replace') as f:
-                    sample = f.read(2000)
-                    f.seek(0)
-                    delimiter = ';' if sample.count(';') > sample.count(',') else ','
-                    reader = csv.reader(f, delimiter=delimiter)
-                    rows = list(reader)
+        with open(filepath, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            sample = f.read(2000)
+            f.seek(0)
+            delimiter = ';' if sample.count(';') > sample.count(',') else ','
+            reader = csv.reader(f, delimiter=delimiter)
+
+            # Find header row (maks 15 baris pertama)
+            headers = []
+            for i, row in enumerate(reader):
+                if i >= 15:
+                    break
+                row_str = ''.join(str(x).lower() for x in row)
+                if 'kode barang' in row_str or ('nama barang' in row_str and len(row) > 5):
+                    headers = row
                     break
-            except:
-                continue
-
-        if not rows:
-            return items, stores_list
-
-        # Find header row
-        header_row = 0
-        headers = []
-        for i, row in enumerate(rows[:15]):
-            row_str = ''.join(str(x).lower() for x in row)
-            if 'kode barang' in row_str or ('nama barang' in row_str and len(row) > 5):
-                headers = row
-                header_row = i
-                break
-
-        if not headers:
-            return items, stores_list
-
-        # Find column indices
-        sku_col = -1
-        name_col = -1
-        total_col = -1
-        store_cols = {}  # {col_index: store_name}
-
-        for idx, h in enumerate(headers):
-            h_str = str(h).strip()
-            h_lower = h_str.lower()
-
-            if 'kode barang' in h_lower or h_lower == 'kode':
-                sku_col = idx
-            elif 'nama barang' in h_lower:
-                name_col = idx
-            elif 'total' in h_lower:
-                total_col = idx
-            elif h_str and len(h_str) > 2:
-                # Check if it's a store/warehouse column
-                if any(x in h_str.upper() for x in ['ZUMA', 'WAREHOUSE', 'WH']):
-                    store_cols[idx] = h_str
-                elif any(x in h_str for x in ['Mall', 'Store', 'Toko']):
-                    store_cols[idx] = h_str
-
-        # Build stores list with areas
-        for col_idx, store_name in store_cols.items():
-            area = get_area(store_name)
-            stores_list.append({
-                'name': store_name,
-                'area': area,
-                'col_index': col_idx
-            })
-
-        # Process data rows
-        seen_skus = set()
-
-        for i, row in enumerate(rows[header_row + 1:], start=header_row + 1):
-            if len(row) < 3:
-                continue
 
-            # Find SKU
-            sku = ''
-            for j, cell in enumerate(row):
-                cell_str = str(cell).strip()
-                if cell_str and re.match(r'^[A-Z0-9\-]{5,}$', cell_str, re.IGNORECASE):
-                    if ' ' not in cell_str and 'total' not in cell_str.lower():
-                        sku = cell_str
-                        break
+            if not headers:
+                return items, stores_list
 
-            if not sku or 'total' in sku.lower():
-                continue
+            sku_col, name_col, total_col, store_cols = parse_stock_header(headers)
 
-            # Get unique key
-            row_key = sku
-            if row_key in seen_skus:
-                continue
-            seen_skus.add(row_key)
-
-            # Get name
-            name = ''
-            if name_col >= 0 and name_col < len(row):
-                name = str(row[name_col]).strip()
-            if not name:
-                for cell in row:
-                    cell_str = str(cell).strip()
-                    if cell_str and len(cell_str) > 10 and ',' in cell_str:
-                        name = cell_str
-                        break
-
-            # Get total stock
-            total = 0
-            if total_col >= 0 and total_col < len(row):
-                total = parse_number(row[total_col])
-            else:
-                for j in range(len(row) - 1, -1, -1):
-                    cell_str = str(row[j]).strip()
-                    if cell_str and cell_str not in ['', '-']:
-                        val = parse_number(row[j])
-                        if val != 0 or '0' in cell_str:
-                            total = val
-                            break
-
-            # Get per-store stock (termasuk stok 0 agar bisa filter Out of Stock per store)
-            store_stock = {}
+            # Build stores list with areas
             for col_idx, store_name in store_cols.items():
-                if col_idx < len(row):
-                    stock_val = parse_number(row[col_idx])
-                    # Apply correction for doubled stores
-                    correction = DOUBLED_STORES.get(store_name.lower(), 1.0)
-                    if correction != 1.0:
-                        stock_val = int(stock_val * correction)
-                    store_stock[store_name] = stock_val  # Include semua, termasuk 0
-
-            # Extract product info
-            info = extract_product_info(name, sku)
-
-            # Gunakan nama dari master jika ada, jika tidak gunakan dari CSV
-            display_name = info['nama_master'] if info['nama_master'] else (name or sku)
-
-            # Filter: hanya produk sandal (exclude hanger, aksesoris, dll)
-            if not is_sandal_product(display_name, sku):
-                continue
+                area = get_area(store_name)
+                stores_list.append({
+                    'name': store_name,
+                    'area': area,
+                    'col_index': col_idx
+                })
 
-            items.append({
-                'sku': sku,
-                'kode_kecil': info['kode_kecil'],
-                'name': display_name,
-                'size': info['size'],
-                'category': info['category'],
-                'gender': info['gender'],
-                'series': info['series'],
-                'tipe': info['tipe'],
-                'tier': info['tier'],
-                'color': info['color'],
-                'total': total,
-                'store_stock': store_stock,
-                'entity': entity,
-                'type': data_type
-            })
+            # Sisa baris dibaca langsung dari reader (tidak di-load ke list)
+            items.extend(iter_stock_items(reader, entity, data_type,
+                                          sku_col, name_col, total_col, store_cols))
 
         print(f"    -> {len(items)} items, {len(stores_list)} locations")
 
@@ -973,17 +1530,299 @@ def read_csv_detailed(filepath, entity, data_type):
 
     return items, stores_list
 
-def generate_html(all_data, all_stores):
-    """Generate HTML dashboard dengan data embedded"""
+# Sales detail ditulis sebagai shard bulanan (gzip) di samping HTML dan di-load saat tab Sales
+# dibuka, jadi ukuran HTML tidak ikut membesar dengan histori transaksi. 0 = inline di HTML
+SALES_DETAIL_SHARDS = os.environ.get('SALES_DETAIL_SHARDS', '1') == '1'
+SALES_SHARD_DIR = 'sales_detail'
+# 1 = tulis juga shard .json tanpa gzip, hanya untuk browser tanpa DecompressionStream
+SALES_SHARD_PLAIN = os.environ.get('SALES_SHARD_PLAIN', '0') == '1'
+
+def build_sales_article_names():
+    """Nama produk per artikel (SKU tanpa size) dari sales detail - kemunculan pertama"""
+    names = {}
+    skus = SALES_DETAIL.dictionary('sku')
+    product_names = SALES_DETAIL.dictionary('product_name')
+    seen = set()
+    for sku_code, name_code in zip(SALES_DETAIL.codes('sku'), SALES_DETAIL.codes('product_name')):
+        if (sku_code, name_code) in seen:
+            continue
+        seen.add((sku_code, name_code))
+        sku, product_name = skus[sku_code], product_names[name_code]
+        if sku and product_name and product_name != '-':
+            article = re.sub(r'Z\d{2,3}$', '', sku)
+            if article and article not in names:
+                names[article] = product_name
+    return names
+
+def _cube_num(val):
+    """Angka ringkas untuk JSON: int jika bulat, selain itu 2 desimal"""
+    val = round(val, 2)
+    return int(val) if val == int(val) else val
+
+def build_sales_cube():
+    """Agregasi SALES_DETAIL per date x store x SKU x SPG (x kategori) untuk panel Sales.
+
+    Tiap cell menyimpan qty, total, gross, HPP, retur, diskon, daftar order (id integer,
+    supaya jumlah transaksi unik tetap benar saat di-roll-up) dan breakdown per jam
+    (flat: [jam, total, qty, ...]). Cell disusun sesuai urutan kemunculan pertama.
+
+    Kode dimensi & id order langsung memakai kode kolom SALES_DETAIL (dictionary-nya juga
+    urut kemunculan pertama).
+    """
+    sales = SALES_DETAIL
+    dim_names = ('date', 'store', 'sku', 'spg', 'category')
+    cells = {}
+
+    for d, s, k, p, c, oid, hour_of_day, qty, total, gross, hpp, retur, disc in zip(
+            *(sales.codes(name) for name in dim_names), sales.codes('order_no'),
+            *(sales.numbers(name) for name in ('hour', 'qty', 'total', 'gross', 'hpp', 'retur_qty', 'disc_amt'))):
+        key = (d, s, k, p, c)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = {'qty': 0, 'total': 0.0, 'gross': 0.0, 'hpp': 0.0,
+                                 'retur': 0, 'disc': 0.0, 'orders': {}, 'hours': {}}
+        cell['qty'] += qty
+        cell['total'] += total
+        cell['gross'] += gross
+        cell['hpp'] += hpp
+        cell['retur'] += retur
+        cell['disc'] += disc
+        cell['orders'][oid] = True
+        hour = cell['hours'].setdefault(hour_of_day, [0.0, 0])
+        hour[0] += total
+        hour[1] += qty
+
+    columns = {name: [] for name in ('d', 's', 'k', 'p', 'c', 'qty', 'total', 'gross',
+                                     'hpp', 'retur', 'disc', 'orders', 'hours')}
+    for (d, s, k, p, c), cell in cells.items():
+        columns['d'].append(d)
+        columns['s'].append(s)
+        columns['k'].append(k)
+        columns['p'].append(p)
+        columns['c'].append(c)
+        columns['qty'].append(cell['qty'])
+        columns['retur'].append(cell['retur'])
+        for measure in ('total', 'gross', 'hpp', 'disc'):
+            columns[measure].append(_cube_num(cell[measure]))
+        columns['orders'].append(list(cell['orders']))
+        flat_hours = []
+        for hour, (total, qty) in cell['hours'].items():
+            flat_hours.extend([hour, _cube_num(total), qty])
+        columns['hours'].append(flat_hours)
+
+    return {
+        'n': len(cells),
+        'dims': {name: list(sales.dictionary(name)) for name in dim_names},
+        'cells': columns,
+    }
+
+def write_sales_detail_shards(output_dir):
+    """Tulis SALES_DETAIL per bulan ke sales_detail/YYYY-MM.json.gz dan manifest.json.
+
+    Tiap shard juga ditulis sebagai YYYY-MM.js (isi gzip yang sama dalam base64) yang di-load lewat
+    <script> jika fetch gagal, mis. dashboard dibuka langsung dari file://.
+    Shard .json tanpa gzip hanya ditulis jika SALES_SHARD_PLAIN aktif.
 
-    data_json = json.dumps(all_data, ensure_ascii=False)
+    Return manifest (dict) yang juga di-embed ke HTML supaya dashboard tahu
+    shard mana yang perlu di-fetch untuk rentang tanggal yang dipilih.
+    """
+    shard_dir = Path(output_dir) / SALES_SHARD_DIR
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    by_month = defaultdict(list)
+    for row in SALES_DETAIL:
+        by_month[row['date'][:7]].append(row)
+
+    # Hash shard dari run sebelumnya - shard yang isinya sama tidak ditulis ulang
+    previous_hashes = {}
+    try:
+        with open(shard_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            previous_hashes = {s['month']: s.get('hash') for s in json.load(f).get('shards', [])}
+    except (OSError, ValueError):
+        pass
+
+    shards = []
+    written = set()
+    rewritten = 0
+    for month in sorted(by_month):
+        rows = by_month[month]
+        payload = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        content_hash = hashlib.sha256(payload).hexdigest()[:12]
+        names = [f"{month}.json.gz", f"{month}.js"] + ([f"{month}.json"] if SALES_SHARD_PLAIN else [])
+        unchanged = (previous_hashes.get(month) == content_hash
+                     and all((shard_dir / name).exists() for name in names))
+        if not unchanged:
+            compressed = gzip.compress(payload, compresslevel=9, mtime=0)
+            with open(shard_dir / names[0], 'wb') as f:
+                f.write(compressed)
+            with open(shard_dir / names[1], 'w', encoding='ascii') as f:
+                f.write(f"salesShardLoaded({json.dumps(month)}, \"{base64.b64encode(compressed).decode('ascii')}\");\n")
+            if SALES_SHARD_PLAIN:
+                with open(shard_dir / names[2], 'wb') as f:
+                    f.write(payload)
+            rewritten += 1
+        written.update(names)
+
+        dates = [r['date'] for r in rows]
+        shard = {
+            'month': month,
+            'file': f"{SALES_SHARD_DIR}/{names[0]}",
+            'script': f"{SALES_SHARD_DIR}/{names[1]}",
+            'rows': len(rows),
+            'min_date': min(dates),
+            'max_date': max(dates),
+            'hash': content_hash,
+        }
+        if SALES_SHARD_PLAIN:
+            shard['plain'] = f"{SALES_SHARD_DIR}/{names[2]}"
+        shards.append(shard)
+
+    # Hapus shard lama yang sudah tidak ada datanya
+    for old in shard_dir.glob('*.js*'):
+        if old.name not in written and old.name != 'manifest.json':
+            old.unlink()
+
+    manifest = {
+        'shards': shards,
+        'stores': sorted(store for store in SALES_DETAIL.dictionary('store') if store),
+        'min_date': shards[0]['min_date'] if shards else '',
+        'max_date': shards[-1]['max_date'] if shards else '',
+        'rows': len(SALES_DETAIL),
+    }
+    with open(shard_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    print(f"  -> {len(shards)} shard sales detail ({len(SALES_DETAIL)} transaksi, {rewritten} ditulis ulang) di {shard_dir}")
+    return manifest
+
+# Format payload allData di HTML: 'columnar' (dictionary-encoded, default) atau 'rows' (list of dict)
+PAYLOAD_FORMAT = os.environ.get('DASHBOARD_PAYLOAD', 'columnar')
+
+def encode_columnar_items(items):
+    """Encode list item (satu entity x type) menjadi kolom.
+
+    - field string dengan 1 nilai      -> ['c', nilai]
+    - field string berulang            -> ['d', dictionary, codes]
+    - field lain / string unik (SKU)   -> ['v', values]
+    - store_stock                      -> ['s', stores, matrix flat (row-major), absent]
+      `absent` berisi index flat untuk store yang tidak ada di item tsb. Di browser matrix ini
+      tetap satu Int32Array (createStockMatrix), tidak di-expand jadi object per item.
+    """
+    if not items:
+        return {'n': 0, 'fields': []}
+
+    n = len(items)
+    fields = []
+    for field in items[0].keys():
+        if field == 'store_stock':
+            stores = list(dict.fromkeys(s for item in items for s in item['store_stock']))
+            n_stores = len(stores)
+            stock = [0] * (n * n_stores)
+            absent = []
+            for i, item in enumerate(items):
+                row_stock = item['store_stock']
+                base = i * n_stores
+                for j, store in enumerate(stores):
+                    val = row_stock.get(store)
+                    if val is None:
+                        absent.append(base + j)
+                    else:
+                        stock[base + j] = val
+            fields.append([field, 's', stores, stock, absent])
+            continue
+
+        values = [item.get(field) for item in items]
+        if not all(isinstance(v, str) for v in values):
+            fields.append([field, 'v', values])
+            continue
+
+        dictionary = list(dict.fromkeys(values))
+        if len(dictionary) == 1:
+            fields.append([field, 'c', dictionary[0]])
+        elif len(dictionary) * 2 <= n:
+            code_of = {v: i for i, v in enumerate(dictionary)}
+            fields.append([field, 'd', dictionary, [code_of[v] for v in values]])
+        else:
+            fields.append([field, 'v', values])
+
+    return {'n': n, 'fields': fields}
+
+def encode_columnar_data(all_data):
+    """Encode all_data {entity: {type: [items]}} ke format columnar"""
+    return {
+        'columnar': 1,
+        'entities': {
+            entity: {data_type: encode_columnar_items(items) for data_type, items in types.items()}
+            for entity, types in all_data.items()
+        }
+    }
+
+def load_sales_exports_cached():
+    """load_sales_data() + load_sales_detail() lewat build cache.
+
+    Tiap consumer di-skip jika file export-nya tidak berubah; consumer yang perlu build ulang
+    dan memakai file yang sama di-feed dari satu pass baca.
+    """
+    global SALES_DATA, SALES_MONTHS, SALES_DETAIL
+    ingested = {}
+
+    BUILD_FINGERPRINTS['sales_data'] = file_fingerprint(sales_export_path(SALES_SUMMARY_FILE))
+    (SALES_DATA, SALES_MONTHS), hit = cached_build(
+        'sales_data', BUILD_FINGERPRINTS['sales_data'],
+        lambda: load_sales_data(ingested))
+    if hit:
+        print(f"  📊 Sales data dari cache: {len(SALES_DATA)} SKU ({', '.join(SALES_MONTHS)})")
+
+    BUILD_FINGERPRINTS['sales_detail'] = file_fingerprint(sales_export_path(SALES_DETAIL_FILE))
+    SALES_DETAIL, hit = cached_build(
+        'sales_detail', BUILD_FINGERPRINTS['sales_detail'],
+        lambda: load_sales_detail(ingested))
+    if hit:
+        print(f"  📊 Sales detail dari cache: {len(SALES_DETAIL)} transaksi")
+
+def read_csv_detailed_cached(filepath, entity, data_type):
+    """read_csv_detailed() lewat build cache.
+
+    Fingerprint = isi file + master yang dipakai saat enrich (Master Data, Master Produk,
+    mapping area store), jadi file hanya di-parse ulang jika salah satunya berubah.
+    """
+    fingerprint = f"{file_fingerprint(filepath)}:{BUILD_FINGERPRINTS.get('master', '')}"
+    BUILD_FINGERPRINTS[f"stock_{entity}_{data_type}"] = fingerprint
+    (items, stores), hit = cached_build(f"stock_{entity}_{data_type}", fingerprint,
+                                        lambda: read_csv_detailed(filepath, entity, data_type))
+    if hit:
+        print(f"  Cache: {filepath}")
+        print(f"    -> {len(items)} items, {len(stores)} locations")
+    return items, stores
+
+def generate_html(all_data, all_stores, sales_manifest=None):
+    """Generate HTML dashboard dengan data embedded.
+
+    Jika `sales_manifest` diberikan, sales detail tidak di-inline tapi di-load
+    per shard bulanan dari manifest tsb.
+    """
+
+    if PAYLOAD_FORMAT == 'columnar':
+        data_json = json.dumps(encode_columnar_data(all_data), ensure_ascii=False, separators=(',', ':'))
+    else:
+        data_json = json.dumps(all_data, ensure_ascii=False)
     stores_json = json.dumps(all_stores, ensure_ascii=False)
     store_area_json = json.dumps(STORE_AREA_MAP, ensure_ascii=False)
     max_stock_json = json.dumps(MAX_STOCK_MAP, ensure_ascii=False)
     assortment_json = json.dumps(MASTER_ASSORTMENT, ensure_ascii=False)
     sales_json = json.dumps(SALES_DATA, ensure_ascii=False)
-    sales_detail_json = json.dumps(SALES_DETAIL, ensure_ascii=False)
+    sales_months_json = json.dumps(SALES_MONTHS)
+    sales_window = str(len(SALES_MONTHS))
+    sales_detail_json = '[]' if sales_manifest is not None else json.dumps(list(SALES_DETAIL), ensure_ascii=False)
+    sales_manifest_json = json.dumps(sales_manifest, ensure_ascii=False)
+    sales_article_names = build_sales_article_names()
+    sales_article_names_json = json.dumps(sales_article_names, ensure_ascii=False)
+    sales_fingerprint = BUILD_FINGERPRINTS.get('sales_detail') or data_fingerprint(list(SALES_DETAIL))
+    sales_cube, _ = cached_build('sales_cube', sales_fingerprint, build_sales_cube)
+    sales_cube_json = json.dumps(sales_cube, ensure_ascii=False, separators=(',', ':'))
     target_json = json.dumps(TARGET_DATA, ensure_ascii=False)
+    store_area_lookup_json = json.dumps(build_store_area_lookup(all_stores), ensure_ascii=False)
+    stock_rollups_json = json.dumps(build_stock_rollups(all_data), ensure_ascii=False, separators=(',', ':'))
 
     html = '''<!DOCTYPE html>
 <html lang="id">
@@ -1177,6 +2016,13 @@ def generate_html(all_data, all_stores):
         tr:hover { background: #f8fafc; }
         tr:nth-child(even) { background: #fafbfc; }
         tr:nth-child(even):hover { background: #f0f4f8; }
+        /* Tabel virtual: tinggi baris tetap, zebra dari index data */
+        .vt-row td { white-space: nowrap; }
+        tr.vt-row:nth-child(even) { background: transparent; }
+        tr.vt-row.vt-alt { background: #fafbfc; }
+        tr.vt-row:hover { background: #f0f4f8; }
+        .vt-spacer, .vt-spacer:hover { background: transparent; }
+        .vt-spacer td { padding: 0; border: 0; }
 
         .stock-badge {
             display: inline-block; padding: 3px 10px; border-radius: 15px;
@@ -1194,6 +2040,9 @@ def generate_html(all_data, all_stores):
         }
         .page-info { font-size: 0.8rem; color: #6b7280; }
         .page-buttons { display: flex; gap: 4px; }
+        .page-size { font-size: 0.8rem; color: #6b7280; }
+        #scTableHead th { background: #1f2937; }
+        .page-size select { padding: 4px 8px; border: 1px solid #e5e7eb; border-radius: 6px; font-size: 0.8rem; }
         .page-btn {
             padding: 6px 12px; border: 1px solid #e5e7eb; background: white;
             border-radius: 6px; cursor: pointer; font-size: 0.8rem; transition: all 0.2s ease;
@@ -1555,19 +2404,19 @@ def generate_html(all_data, all_stores):
                 <div style="display: flex; flex-wrap: wrap; gap: 10px; align-items: end; padding: 15px; background: #f8fafc; border-radius: 8px; border: 1px solid #e2e8f0;">
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Area</label>
-                        <select id="tableFilterArea" onchange="updateTableStoreDropdown(); applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="tableFilterArea" onchange="updateTableStoreDropdown(); scheduleRender('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua Area</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Store</label>
-                        <select id="tableFilterStore" onchange="applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 180px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="tableFilterStore" onchange="scheduleRender('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 180px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua Store</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Tier</label>
-                        <select id="tableFilterTier" onchange="applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 90px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="tableFilterTier" onchange="scheduleRender('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 90px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                             <option value="0">Tier 0</option>
                             <option value="1">Tier 1</option>
@@ -1580,7 +2429,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Gender</label>
-                        <select id="rtFilterGender" onchange="applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 100px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="rtFilterGender" onchange="scheduleRender('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 100px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                             <option value="BABY">Baby</option>
                             <option value="BOYS">Boys</option>
@@ -1592,13 +2441,13 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Series</label>
-                        <select id="rtFilterSeries" onchange="applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="rtFilterSeries" onchange="scheduleRender('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Cari</label>
-                        <input type="text" id="rtSearchInput" placeholder="Cari..." oninput="applyRetailFilters()" style="font-size: 0.85rem; padding: 8px 12px; width: 140px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <input type="text" id="rtSearchInput" placeholder="Cari..." oninput="debounceInput('retail', applyRetailFilters)" style="font-size: 0.85rem; padding: 8px 12px; width: 140px; border-radius: 6px; border: 1px solid #cbd5e1;">
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: transparent; margin-bottom: 4px; display: block;">.</label>
@@ -1624,6 +2473,15 @@ def generate_html(all_data, all_stores):
             </div>
             <div class="pagination">
                 <div class="page-info" id="rtPageInfo">Showing 0 items</div>
+                <div class="page-size">
+                    Tampilkan
+                    <select id="rtPageSize" onchange="rtGoToPage(1)">
+                        <option value="50">50</option>
+                        <option value="100">100</option>
+                        <option value="500">500</option>
+                        <option value="all">Semua</option>
+                    </select>
+                </div>
                 <div class="page-buttons" id="rtPageButtons"></div>
             </div>
             <!-- Retail Charts -->
@@ -1691,19 +2549,19 @@ def generate_html(all_data, all_stores):
                 <div style="display: flex; flex-wrap: wrap; gap: 10px; align-items: end; padding: 15px; background: #f8fafc; border-radius: 8px; border: 1px solid #e2e8f0;">
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Area</label>
-                        <select id="whFilterArea" onchange="updateWhWarehouseDropdown(); applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="whFilterArea" onchange="updateWhWarehouseDropdown(); scheduleRender('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua Area</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Warehouse</label>
-                        <select id="whFilterWarehouse" onchange="applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 180px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="whFilterWarehouse" onchange="scheduleRender('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 180px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua Warehouse</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Tier</label>
-                        <select id="whFilterTier" onchange="applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 90px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="whFilterTier" onchange="scheduleRender('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 90px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                             <option value="0">Tier 0</option>
                             <option value="1">Tier 1</option>
@@ -1716,7 +2574,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Gender</label>
-                        <select id="whFilterGender" onchange="applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 100px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="whFilterGender" onchange="scheduleRender('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 100px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                             <option value="BABY">Baby</option>
                             <option value="BOYS">Boys</option>
@@ -1728,13 +2586,13 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Series</label>
-                        <select id="whFilterSeries" onchange="applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <select id="whFilterSeries" onchange="scheduleRender('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; min-width: 120px; border-radius: 6px; border: 1px solid #cbd5e1;">
                             <option value="">Semua</option>
                         </select>
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: #64748b; margin-bottom: 4px; display: block;">Cari</label>
-                        <input type="text" id="whSearchInput" placeholder="Cari..." oninput="applyWarehouseFilters()" style="font-size: 0.85rem; padding: 8px 12px; width: 140px; border-radius: 6px; border: 1px solid #cbd5e1;">
+                        <input type="text" id="whSearchInput" placeholder="Cari..." oninput="debounceInput('warehouse', applyWarehouseFilters)" style="font-size: 0.85rem; padding: 8px 12px; width: 140px; border-radius: 6px; border: 1px solid #cbd5e1;">
                     </div>
                     <div class="filter-group" style="flex: 0 0 auto;">
                         <label style="font-size: 0.75rem; color: transparent; margin-bottom: 4px; display: block;">.</label>
@@ -1760,6 +2618,15 @@ def generate_html(all_data, all_stores):
             </div>
             <div class="pagination">
                 <div class="page-info" id="whPageInfo">Showing 0 items</div>
+                <div class="page-size">
+                    Tampilkan
+                    <select id="whPageSize" onchange="whGoToPage(1)">
+                        <option value="50">50</option>
+                        <option value="100">100</option>
+                        <option value="500">500</option>
+                        <option value="all">Semua</option>
+                    </select>
+                </div>
                 <div class="page-buttons" id="whPageButtons"></div>
             </div>
             <!-- Warehouse Charts -->
@@ -1796,7 +2663,7 @@ def generate_html(all_data, all_stores):
             <div class="filters" id="msWHFilters" style="display: flex;">
                 <div class="filter-group">
                     <label>Area</label>
-                    <select id="msWHFilterArea" onchange="updateMaxStockAnalysis()">
+                    <select id="msWHFilterArea" onchange="scheduleRender('maxStock', updateMaxStockAnalysis)">
                         <option value="">Semua Area</option>
                         <option value="Bali">Bali</option>
                         <option value="Jakarta">Jakarta</option>
@@ -1805,7 +2672,7 @@ def generate_html(all_data, all_stores):
                 </div>
                 <div class="filter-group">
                     <label>Fill Rate</label>
-                    <select id="msWHFilterFillRate" onchange="updateMaxStockAnalysis()">
+                    <select id="msWHFilterFillRate" onchange="scheduleRender('maxStock', updateMaxStockAnalysis)">
                         <option value="">Semua</option>
                         <option value="over">Overflow (>100%)</option>
                         <option value="high">High (80-100%)</option>
@@ -1823,19 +2690,19 @@ def generate_html(all_data, all_stores):
             <div class="filters" id="msFilters" style="display: none;">
                 <div class="filter-group">
                     <label>Area</label>
-                    <select id="msFilterArea" onchange="updateStoreDropdown(); updateMaxStockAnalysis()">
+                    <select id="msFilterArea" onchange="updateStoreDropdown(); scheduleRender('maxStock', updateMaxStockAnalysis)">
                         <option value="">Semua Area</option>
                     </select>
                 </div>
                 <div class="filter-group">
                     <label>Store</label>
-                    <select id="msFilterStore" onchange="updateMaxStockAnalysis()">
+                    <select id="msFilterStore" onchange="scheduleRender('maxStock', updateMaxStockAnalysis)">
                         <option value="">Semua Store</option>
                     </select>
                 </div>
                 <div class="filter-group">
                     <label>Fill Rate</label>
-                    <select id="msFilterFillRate" onchange="updateMaxStockAnalysis()">
+                    <select id="msFilterFillRate" onchange="scheduleRender('maxStock', updateMaxStockAnalysis)">
                         <option value="">Semua</option>
                         <option value="over">Overflow (>100%)</option>
                         <option value="high">High (80-100%)</option>
@@ -1953,7 +2820,7 @@ def generate_html(all_data, all_stores):
                 <div style="display:flex;gap:12px;flex-wrap:wrap;align-items:flex-end;">
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Area:</label>
-                        <select id="scFilterArea" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterArea" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua Area</option>
                             <option value="Bali">Bali</option>
                             <option value="Jakarta">Jakarta</option>
@@ -1966,7 +2833,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Gender:</label>
-                        <select id="scFilterGender" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterGender" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                             <option value="BABY">Baby</option>
                             <option value="BOYS">Boys</option>
@@ -1978,7 +2845,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:80px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Tier:</label>
-                        <select id="scFilterTier" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterTier" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                             <option value="1">Tier 1</option>
                             <option value="2">Tier 2</option>
@@ -1989,13 +2856,13 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Series:</label>
-                        <select id="scFilterSeries" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterSeries" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                         </select>
                     </div>
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">TW Status:</label>
-                        <select id="scFilterTW" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterTW" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                             <option value="critical">&lt;2 (Critical)</option>
                             <option value="low">2-4 (Low)</option>
@@ -2005,7 +2872,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">TO Status:</label>
-                        <select id="scFilterTO" onchange="renderStockControlTable()" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <select id="scFilterTO" onchange="scheduleRender('stockControl', renderStockControlTable)" style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                             <option value="negative">Negatif</option>
                             <option value="zero">Zero</option>
@@ -2014,14 +2881,14 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:120px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Search:</label>
-                        <input type="text" id="scSearch" onkeyup="renderStockControlTable()" placeholder="Cari..." style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
+                        <input type="text" id="scSearch" onkeyup="debounceInput('stockControl', renderStockControlTable)" placeholder="Cari..." style="width:100%;padding:6px 10px;border:1px solid #d1d5db;border-radius:6px;font-size:0.85rem;">
                     </div>
                 </div>
             </div>
 
             <!-- Control Stock Table -->
             <div style="background:white;border-radius:12px;box-shadow:0 2px 8px rgba(0,0,0,0.08);overflow:hidden;">
-                <div style="overflow-x:auto;">
+                <div id="scTableWrapper" style="overflow-x:auto;max-height:600px;overflow-y:auto;">
                     <table style="width:100%;border-collapse:collapse;font-size:0.8rem;">
                         <thead id="scTableHead">
                             <!-- Header will be rendered dynamically by JavaScript -->
@@ -2033,6 +2900,15 @@ def generate_html(all_data, all_stores):
                 <!-- Pagination -->
                 <div style="padding:12px 15px;border-top:1px solid #e5e7eb;display:flex;justify-content:space-between;align-items:center;">
                     <div id="scPageInfo" style="color:#6b7280;font-size:0.8rem;"></div>
+                    <div class="page-size">
+                        Tampilkan
+                        <select id="scPageSize" onchange="scGoToPage(1)">
+                            <option value="50">50</option>
+                            <option value="100">100</option>
+                            <option value="500">500</option>
+                            <option value="all">Semua</option>
+                        </select>
+                    </div>
                     <div id="scPagination" style="display:flex;gap:5px;"></div>
                 </div>
             </div>
@@ -2044,9 +2920,9 @@ def generate_html(all_data, all_stores):
                     <div>
                         <div style="font-weight:600;color:#1f2937;font-size:0.85rem;margin-bottom:5px;">Rumus Perhitungan:</div>
                         <ul style="margin:0;padding-left:18px;color:#4b5563;font-size:0.8rem;line-height:1.6;">
-                            <li><b>TW (Turnover Weeks)</b> = Stock WH / Avg Sales 3 Bulan</li>
-                            <li><b>TO (Turnover)</b> = Stock Toko / Avg Sales 3 Bulan</li>
-                            <li><b>TW+TO</b> = Total Stock / Avg Sales 3 Bulan</li>
+                            <li><b>TW (Turnover Weeks)</b> = Stock WH / Avg Sales ''' + sales_window + ''' Bulan</li>
+                            <li><b>TO (Turnover)</b> = Stock Toko / Avg Sales ''' + sales_window + ''' Bulan</li>
+                            <li><b>TW+TO</b> = Total Stock / Avg Sales ''' + sales_window + ''' Bulan</li>
                         </ul>
                     </div>
                     <div>
@@ -2084,27 +2960,27 @@ def generate_html(all_data, all_stores):
                 <div style="display:flex;flex-wrap:wrap;gap:12px;align-items:flex-end;">
                     <div style="min-width:140px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Periode Mulai:</label>
-                        <input type="date" id="salesFilterStartDate" onchange="renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <input type="date" id="salesFilterStartDate" onchange="scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                     </div>
                     <div style="min-width:140px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Periode Akhir:</label>
-                        <input type="date" id="salesFilterEndDate" onchange="renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <input type="date" id="salesFilterEndDate" onchange="scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                     </div>
                     <div style="min-width:150px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Area:</label>
-                        <select id="salesFilterArea" onchange="updateStoresByArea(); renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <select id="salesFilterArea" onchange="updateStoresByArea(); scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua Area</option>
                         </select>
                     </div>
                     <div style="min-width:180px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Toko:</label>
-                        <select id="salesFilterStore" onchange="renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <select id="salesFilterStore" onchange="scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua Toko</option>
                         </select>
                     </div>
                     <div style="min-width:100px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Gender:</label>
-                        <select id="salesFilterGender" onchange="renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <select id="salesFilterGender" onchange="scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                             <option value="Men">Men</option>
                             <option value="Ladies">Ladies</option>
@@ -2117,7 +2993,7 @@ def generate_html(all_data, all_stores):
                     </div>
                     <div style="min-width:120px;">
                         <label style="display:block;font-size:0.75rem;color:#6b7280;margin-bottom:4px;">Series:</label>
-                        <select id="salesFilterSeries" onchange="renderSalesDashboard()" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
+                        <select id="salesFilterSeries" onchange="scheduleRender('sales', renderSalesDashboard)" style="width:100%;padding:6px 10px;border:1px solid #e2e8f0;border-radius:6px;font-size:0.85rem;">
                             <option value="">Semua</option>
                         </select>
                     </div>
@@ -2180,7 +3056,7 @@ def generate_html(all_data, all_stores):
                     <div style="margin-top:20px;">
                         <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;">
                             <h4 style="margin:0;color:#1f2937;font-size:0.95rem;">📊 Sales by Day</h4>
-                            <select id="salesByDayWeekFilter" onchange="renderSalesTrend()" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
+                            <select id="salesByDayWeekFilter" onchange="scheduleRender('salesTrend', renderSalesTrend)" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
                                 <option value="all">All Weeks</option>
                                 <option value="W1">W1 (1-7)</option>
                                 <option value="W2">W2 (8-14)</option>
@@ -2200,7 +3076,7 @@ def generate_html(all_data, all_stores):
                     <div style="margin-top:20px;">
                         <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;">
                             <h4 style="margin:0;color:#1f2937;font-size:0.95rem;">🗺️ Sales by Area</h4>
-                            <select id="salesAreaWeekFilter" onchange="renderSalesAreaTrend()" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
+                            <select id="salesAreaWeekFilter" onchange="scheduleRender('salesAreaTrend', renderSalesAreaTrend)" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
                                 <option value="all">All Weeks</option>
                                 <option value="W1">W1 (1-7)</option>
                                 <option value="W2">W2 (8-14)</option>
@@ -2215,7 +3091,7 @@ def generate_html(all_data, all_stores):
                     <div style="margin-top:20px;">
                         <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px;">
                             <h4 style="margin:0;color:#1f2937;font-size:0.95rem;">👥 Sales by Gender</h4>
-                            <select id="salesGenderWeekFilter" onchange="renderSalesGenderTrend()" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
+                            <select id="salesGenderWeekFilter" onchange="scheduleRender('salesGenderTrend', renderSalesGenderTrend)" style="padding:6px 12px;border:1px solid #d1d5db;border-radius:6px;font-size:0.8rem;">
                                 <option value="all">All Weeks</option>
                                 <option value="W1">W1 (1-7)</option>
                                 <option value="W2">W2 (8-14)</option>
@@ -2291,7 +3167,7 @@ def generate_html(all_data, all_stores):
                 <div class="sales-tab-content" id="salesTabTransaction" style="padding:20px;display:none;">
                     <!-- Transaction Detail -->
                     <div>
-                        <h4 style="margin:0 0 12px 0;color:#1f2937;font-size:0.95rem;">📋 Recent Transactions</h4>
+                        <h4 style="margin:0 0 12px 0;color:#1f2937;font-size:0.95rem;">📋 Recent Transactions <span id="salesRecentCount" style="font-weight:400;color:#6b7280;font-size:0.8rem;"></span></h4>
                         <div id="salesRecentTransactions" style="max-height:600px;overflow-y:auto;"></div>
                     </div>
                 </div>
@@ -2362,15 +3238,184 @@ def generate_html(all_data, all_stores):
 
     <script>
         // Embedded data
-        const allData = ''' + data_json + ''';
+        const allData = hydrateAllData(''' + data_json + ''');
         const allStores = ''' + stores_json + ''';
         const storeAreaMap = ''' + store_area_json + ''';  // Mapping dari Master Store/Warehouse
+        const storeAreaLookup = ''' + store_area_lookup_json + ''';  // Area per nama store (resolved di Python)
         const maxStockMap = ''' + max_stock_json + ''';    // Max Stock per store/WH
+        const stockRollups = ''' + stock_rollups_json + ''';  // Ringkasan stock per entity/lokasi (dihitung di Python)
         const assortmentMap = ''' + assortment_json + ''';  // Assortment per kode kecil
-        const salesMap = ''' + sales_json + ''';  // Sales per SKU per bulan (nov, des, jan)
-        const salesDetailData = ''' + sales_detail_json + ''';  // Sales detail transactions
+        const salesMap = ''' + sales_json + ''';  // Sales per SKU: [qty per bulan salesMonths]
+        const salesMonths = ''' + sales_months_json + ''';  // Bulan rolling 'YYYY-MM' (terlama -> terbaru)
+        const SALES_MONTH_LABELS = ['JAN', 'FEB', 'MAR', 'APR', 'MEI', 'JUN', 'JUL', 'AGU', 'SEP', 'OKT', 'NOV', 'DES'];
+        let salesDetailData = ''' + sales_detail_json + ''';  // Sales detail transactions (diisi dari shard jika pakai manifest)
+        const salesDetailManifest = ''' + sales_manifest_json + ''';  // Manifest shard bulanan sales detail (null = inline)
+        const salesArticleNames = ''' + sales_article_names_json + ''';  // Nama produk per artikel dari sales detail
+        const salesCube = ''' + sales_cube_json + ''';  // Agregat sales date x store x SKU x SPG (untuk panel Sales)
         const targetData = ''' + target_json + ''';  // Target per toko
 
+        // Decode payload columnar -> list item per entity/type, lazy saat pertama diakses
+        function hydrateAllData(payload) {
+            if (!payload || !payload.columnar) return payload;
+            const out = {};
+            Object.keys(payload.entities).forEach(entity => {
+                out[entity] = {};
+                Object.keys(payload.entities[entity]).forEach(type => {
+                    Object.defineProperty(out[entity], type, {
+                        configurable: true,
+                        enumerable: true,
+                        get() {
+                            const items = decodeColumnarItems(payload.entities[entity][type]);
+                            payload.entities[entity][type] = null;  // lepas payload mentah
+                            Object.defineProperty(out[entity], type, { value: items, writable: true, enumerable: true, configurable: true });
+                            return items;
+                        }
+                    });
+                });
+            });
+            return out;
+        }
+
+        function decodeColumnarItems(slot) {
+            const n = slot.n;
+            const items = new Array(n);
+            // store_stock tidak di-expand jadi object per item: tetap satu matrix Int32Array (lihat STORE STOCK MATRIX)
+            const stockCol = slot.fields.find(col => col[1] === 's');
+            let matrix = null;
+            if (stockCol) {
+                const present = new Uint8Array(stockCol[3].length).fill(1);
+                stockCol[4].forEach(k => { present[k] = 0; });
+                matrix = createStockMatrix(stockCol[2], n, Int32Array.from(stockCol[3]), present);
+                const proto = createStockItemProto(matrix);
+                for (let i = 0; i < n; i++) {
+                    items[i] = Object.create(proto);
+                    items[i]._r = i;
+                }
+                bindStockMatrix(items, matrix);
+            } else {
+                for (let i = 0; i < n; i++) items[i] = {};
+            }
+
+            slot.fields.forEach(col => {
+                const field = col[0], kind = col[1];
+                if (kind === 'c') {
+                    for (let i = 0; i < n; i++) items[i][field] = col[2];
+                } else if (kind === 'd') {
+                    const dict = col[2], codes = col[3];
+                    for (let i = 0; i < n; i++) items[i][field] = dict[codes[i]];
+                } else if (kind === 'v') {
+                    const values = col[2];
+                    for (let i = 0; i < n; i++) items[i][field] = values[i];
+                }
+            });
+            return items;
+        }
+
+        // ==================== STORE STOCK MATRIX ====================
+        // Stock per lokasi satu entity/type = satu Int32Array row-major (baris = index item, kolom = lokasi)
+        // + tabel index lokasi. Loop berat (stock query, chart, minus, Control Stock) jalan di atas matrix
+        // tanpa hashing nama store; item.store_stock masih bisa dibaca (di-materialize sekali per item).
+        function createStockMatrix(stores, n, values, present) {
+            const index = {};
+            stores.forEach((store, j) => { index[store] = j; });
+            return { stores: stores, index: index, width: stores.length, n: n, values: values, present: present, areas: null, totals: null };
+        }
+
+        function createStockItemProto(m) {
+            const proto = {};
+            Object.defineProperty(proto, 'store_stock', {
+                configurable: true,
+                get() {
+                    const base = this._r * m.width, row = {};
+                    for (let j = 0; j < m.width; j++) {
+                        if (m.present[base + j]) row[m.stores[j]] = m.values[base + j];
+                    }
+                    Object.defineProperty(this, 'store_stock', { value: row, writable: true, configurable: true });
+                    return row;
+                }
+            });
+            return proto;
+        }
+
+        function bindStockMatrix(items, m) {
+            Object.defineProperty(items, 'stockMatrix', { value: m, configurable: true });
+            return items;
+        }
+
+        // Matrix milik list item; list tanpa matrix (payload 'rows', gabungan list) dibangun dari store_stock
+        function stockMatrixOf(items) {
+            if (items.stockMatrix) return items.stockMatrix;
+            const stores = [], index = {};
+            items.forEach(item => {
+                for (const store in item.store_stock || {}) {
+                    if (index[store] === undefined) {
+                        index[store] = stores.length;
+                        stores.push(store);
+                    }
+                }
+            });
+            const width = stores.length;
+            const values = new Int32Array(items.length * width);
+            const present = new Uint8Array(items.length * width);
+            items.forEach((item, i) => {
+                const row = item.store_stock;
+                if (!row) return;
+                for (const store in row) {
+                    values[i * width + index[store]] = row[store];
+                    present[i * width + index[store]] = 1;
+                }
+            });
+            const m = createStockMatrix(stores, items.length, values, present);
+            bindStockMatrix(items, m);
+            return m;
+        }
+
+        // Area tiap kolom, dihitung sekali per matrix
+        function stockColumnAreas(m) {
+            if (!m.areas) m.areas = m.stores.map(store => getAreaFromStore(store));
+            return m.areas;
+        }
+
+        // Uint8Array per kolom: 1 jika predicate(store, j) true
+        function stockColumnMask(m, predicate) {
+            const mask = new Uint8Array(m.width);
+            for (let j = 0; j < m.width; j++) mask[j] = predicate(m.stores[j], j) ? 1 : 0;
+            return mask;
+        }
+
+        // Jumlah satu baris (opsional hanya kolom di mask)
+        function sumStockRow(m, row, mask) {
+            const values = m.values, base = row * m.width;
+            let sum = 0;
+            for (let j = 0; j < m.width; j++) {
+                if (!mask || mask[j]) sum += values[base + j];
+            }
+            return sum;
+        }
+
+        // Total stock per kolom (lokasi) atas semua baris, dihitung sekali per matrix
+        function stockColumnTotals(m) {
+            if (!m.totals) {
+                const width = m.width, values = m.values;
+                const totals = new Float64Array(width);
+                for (let base = 0; base < values.length; base += width) {
+                    for (let j = 0; j < width; j++) totals[j] += values[base + j];
+                }
+                m.totals = totals;
+            }
+            return m.totals;
+        }
+
+        // Jumlah per kolom atas baris-baris `rows`, ditambahkan ke out[outBase .. outBase + width)
+        function sumStockColumns(m, rows, out, outBase) {
+            const width = m.width, values = m.values;
+            for (let r = 0; r < rows.length; r++) {
+                const base = rows[r] * width;
+                for (let j = 0; j < width; j++) out[outBase + j] += values[base + j];
+            }
+            return out;
+        }
+
         // Global format functions
         function formatNum(val, decimals = 0) {
             return Number(val || 0).toLocaleString('id-ID', { minimumFractionDigits: decimals, maximumFractionDigits: decimals });
@@ -2410,13 +3455,8 @@ def generate_html(all_data, all_stores):
             });
         });
         // Also build from sales data (product_name field from Tags column)
-        salesDetailData.forEach(item => {
-            if (item.sku && item.product_name && item.product_name !== '-') {
-                const article = item.sku.replace(/Z\\d{2,3}$/, '');
-                if (article && !articleNameMap[article]) {
-                    articleNameMap[article] = item.product_name;
-                }
-            }
+        Object.entries(salesArticleNames).forEach(([article, name]) => {
+            if (!articleNameMap[article]) articleNameMap[article] = name;
         });
 
         // Helper function to check if SKU is valid (include all items including non-sandal)
@@ -2437,14 +3477,20 @@ def generate_html(all_data, all_stores):
         let whCategoryChart, whAreaChart, whSeriesChart;
 
         // Retail table state
-        let rtFilteredData = [];
+        let rtPageData = [];       // Baris halaman aktif (hasil stock query)
+        let rtFilteredCount = 0;
+        let rtChartSignature = null;  // Filter terakhir yang sudah dirender di chart
         let rtCurrentPage = 1;
+        let rtRowsPerPage = 50;    // 0 = semua baris
         let rtSortField = 'total';
         let rtSortDir = 'desc';
 
         // Warehouse table state
-        let whFilteredData = [];
+        let whPageData = [];
+        let whFilteredCount = 0;
+        let whChartSignature = null;  // Filter terakhir yang sudah dirender di chart
         let whCurrentPage = 1;
+        let whRowsPerPage = 50;
         let whSortField = 'total';
         let whSortDir = 'desc';
 
@@ -2454,7 +3500,7 @@ def generate_html(all_data, all_stores):
         let currentView = 'inventory';
         let currentMSType = 'warehouse';
         let fillRateChart, tierDistChart;
-        let filteredTierArticles = {};  // Store articles by tier for modal
+        let tierArticleScope = null;  // Lokasi yang sedang tampil di Max Stock Analysis (untuk modal tier)
 
         // Initialize
         document.addEventListener('DOMContentLoaded', function() {
@@ -2622,38 +3668,39 @@ def generate_html(all_data, all_stores):
             }
         }
 
-        // Update Retail charts
-        function updateRetailCharts(data, locationFilter, areaFilter) {
+        // Ringkasan chart Retail/Warehouse (kategori, area, series, stock minus) dari data yang sudah difilter
+        function computeStockChartSummary(data, locationFilter, areaFilter) {
             const catData = {}, areaData = {}, seriesData = {};
             // Total SKU = jumlah item dalam data (data sudah difilter sebelum masuk fungsi ini)
             let totalSku = data.length;
             let totalStock = 0;
             let minusArticles = 0;
             let minusPairs = 0;
-            let minusLocations = new Set();
 
-            data.forEach(item => {
+            const m = stockMatrixOf(data);
+            const width = m.width, values = m.values, present = m.present;
+            const areas = stockColumnAreas(m);
+            const locationCol = locationFilter ? m.index[locationFilter] : undefined;
+            const locationArea = locationFilter ? getAreaFromStore(locationFilter) : '';
+            const areaMask = areaFilter ? stockColumnMask(m, (store, j) => areas[j] === areaFilter) : null;
+            const minusLocations = new Uint8Array(width);
+
+            for (let i = 0; i < data.length; i++) {
+                const item = data[i];
+                const base = i * width;
                 const gender = item.gender || 'BABY';
                 const series = item.series || '-';
                 const seriesGender = (series && series !== '-' && series !== '') ? series + ' - ' + gender : '';
+                const hasLocation = locationCol !== undefined && present[base + locationCol] === 1;
 
                 // Calculate stock value based on filter
                 let stockValue = 0;
-
                 if (locationFilter) {
-                    // Store filter - get stock for this store
-                    if (item.store_stock && item.store_stock[locationFilter] !== undefined) {
-                        stockValue = item.store_stock[locationFilter];
-                    }
+                    // Store/warehouse filter - get stock for this location
+                    if (hasLocation) stockValue = values[base + locationCol];
                 } else if (areaFilter) {
-                    // Area filter - sum stock for all stores in this area
-                    if (item.store_stock) {
-                        Object.entries(item.store_stock).forEach(([loc, stock]) => {
-                            if (getAreaFromStore(loc) === areaFilter) {
-                                stockValue += stock;
-                            }
-                        });
-                    }
+                    // Area filter - sum stock for all locations in this area
+                    stockValue = sumStockRow(m, i, areaMask);
                 } else {
                     // No filter - use total
                     stockValue = item.total || 0;
@@ -2668,43 +3715,630 @@ def generate_html(all_data, all_stores):
 
                 // Area calculation
                 if (locationFilter) {
-                    if (item.store_stock && item.store_stock[locationFilter] !== undefined) {
-                        const area = getAreaFromStore(locationFilter);
-                        areaData[area] = (areaData[area] || 0) + Math.max(0, item.store_stock[locationFilter]);
+                    if (hasLocation) {
+                        areaData[locationArea] = (areaData[locationArea] || 0) + Math.max(0, values[base + locationCol]);
                     }
-                } else if (areaFilter) {
-                    if (item.store_stock) {
-                        Object.entries(item.store_stock).forEach(([loc, stock]) => {
-                            if (getAreaFromStore(loc) === areaFilter) {
-                                areaData[areaFilter] = (areaData[areaFilter] || 0) + Math.max(0, stock);
-                            }
-                        });
+                } else {
+                    for (let j = 0; j < width; j++) {
+                        if (!present[base + j] || (areaMask && !areaMask[j])) continue;
+                        const area = areas[j];
+                        areaData[area] = (areaData[area] || 0) + Math.max(0, values[base + j]);
                     }
-                } else if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, stock]) => {
-                        const area = getAreaFromStore(store);
-                        areaData[area] = (areaData[area] || 0) + Math.max(0, stock);
-                    });
                 }
 
                 // Minus calculation
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([storeName, stock]) => {
-                        if (locationFilter && storeName !== locationFilter) return;
-                        if (areaFilter && getAreaFromStore(storeName) !== areaFilter) return;
-                        if (stock < 0) {
-                            minusArticles++;
-                            minusPairs += Math.abs(stock);
-                            minusLocations.add(storeName);
+                for (let j = 0; j < width; j++) {
+                    const stock = values[base + j];
+                    if (stock >= 0 || !present[base + j]) continue;
+                    if (locationFilter && j !== locationCol) continue;
+                    if (areaMask && !areaMask[j]) continue;
+                    minusArticles++;
+                    minusPairs += Math.abs(stock);
+                    minusLocations[j] = 1;
+                }
+            }
+
+            return {
+                sku: totalSku,
+                stock: totalStock,
+                cat: catData,
+                series: seriesData,
+                area: areaData,
+                minus: [minusArticles, minusPairs, minusLocations.reduce((count, flag) => count + flag, 0)]
+            };
+        }
+
+        // Ringkasan tanpa filter sudah dihitung di Python (stockRollups.charts)
+        function getStockChartRollup(dataType) {
+            const entityRollup = stockRollups.charts[currentEntity] || {};
+            return entityRollup[dataType] || null;
+        }
+
+        // ==================== INPUT SCHEDULER ====================
+        // Event filter beruntun (ketik / ganti dropdown) digabung per nama task: hanya task terakhir
+        // yang jalan, di requestAnimationFrame berikutnya (input teks: setelah jeda mengetik).
+        // Task yang belum jalan dibatalkan saat ada event baru atau saat fungsinya dipanggil langsung.
+        const INPUT_DEBOUNCE_MS = 150;
+        const scheduledTasks = {};  // {name: {timer, frame}}
+
+        function cancelScheduled(name) {
+            const task = scheduledTasks[name];
+            if (!task) return;
+            if (task.timer) clearTimeout(task.timer);
+            if (task.frame) cancelAnimationFrame(task.frame);
+            delete scheduledTasks[name];
+        }
+
+        function scheduleRender(name, fn, delay) {
+            cancelScheduled(name);
+            const task = scheduledTasks[name] = { timer: null, frame: null };
+            const queueFrame = () => {
+                task.timer = null;
+                task.frame = requestAnimationFrame(() => {
+                    delete scheduledTasks[name];
+                    fn();
+                });
+            };
+            if (delay > 0) task.timer = setTimeout(queueFrame, delay);
+            else queueFrame();
+        }
+
+        function debounceInput(name, fn) {
+            scheduleRender(name, fn, INPUT_DEBOUNCE_MS);
+        }
+
+        // ==================== VIRTUAL TABLE ====================
+        // Tabel virtual: hanya baris yang terlihat (+ overscan) yang ada di DOM. Tinggi baris tetap,
+        // sisa tinggi diganti dua baris spacer, dan node <tr> dipakai ulang saat scroll.
+        const VIRTUAL_OVERSCAN = 8;
+
+        function createVirtualSpacer() {
+            const tr = document.createElement('tr');
+            tr.className = 'vt-spacer';
+            tr.appendChild(document.createElement('td'));
+            return tr;
+        }
+
+        function createVirtualTable(options) {
+            const vt = {
+                scroller: options.scroller,    // Elemen yang di-scroll (max-height + overflow-y)
+                tbody: options.tbody,
+                rowHeight: options.rowHeight,
+                renderRow: options.renderRow,  // (cells, row, index) -> isi ulang sel <td> yang sudah ada
+                columns: options.columns,
+                rows: [],
+                pool: [],                      // <tr> untuk rows[start..end)
+                spare: [],                     // <tr> lepas yang siap dipakai lagi
+                start: 0,
+                end: 0,
+                mounted: false,
+                frame: 0
+            };
+            vt.topSpacer = createVirtualSpacer();
+            vt.bottomSpacer = createVirtualSpacer();
+            vt.scroller.addEventListener('scroll', () => {
+                if (vt.frame) return;
+                vt.frame = requestAnimationFrame(() => {
+                    vt.frame = 0;
+                    updateVirtualTable(vt, false);
+                });
+            }, { passive: true });
+            return vt;
+        }
+
+        // Ganti isi tabel; columns boleh berubah (mis. ganti view mode), node lama lalu dibuang
+        function setVirtualTableRows(vt, rows, emptyHtml, columns) {
+            if (columns && columns !== vt.columns) {
+                vt.columns = columns;
+                vt.pool = [];
+                vt.spare = [];
+                vt.mounted = false;
+            }
+            vt.rows = rows;
+            vt.scroller.scrollTop = 0;
+            if (!rows.length) {
+                vt.tbody.innerHTML = emptyHtml;
+                vt.pool = [];
+                vt.mounted = false;
+                return;
+            }
+            if (!vt.mounted) {
+                vt.tbody.innerHTML = '';
+                vt.topSpacer.firstChild.colSpan = vt.columns;
+                vt.bottomSpacer.firstChild.colSpan = vt.columns;
+                vt.tbody.appendChild(vt.topSpacer);
+                vt.tbody.appendChild(vt.bottomSpacer);
+                vt.mounted = true;
+            }
+            updateVirtualTable(vt, true);
+
+            // Tinggi baris harus tetap: kalau isi ternyata lebih tinggi dari perkiraan, pakai tinggi asli
+            const measured = vt.pool.length ? vt.pool[0].offsetHeight : 0;
+            if (measured > vt.rowHeight) {
+                vt.rowHeight = measured;
+                vt.pool.concat(vt.spare).forEach(tr => { tr.style.height = measured + 'px'; });
+                updateVirtualTable(vt, true);
+            }
+        }
+
+        function takeVirtualRow(vt) {
+            let tr = vt.spare.pop();
+            if (!tr) {
+                tr = document.createElement('tr');
+                tr.className = 'vt-row';
+                tr.style.height = vt.rowHeight + 'px';
+                for (let c = 0; c < vt.columns; c++) tr.appendChild(document.createElement('td'));
+            }
+            return tr;
+        }
+
+        function paintVirtualRow(vt, tr, index) {
+            // Zebra dari index data, bukan posisi DOM (posisi bergeser karena spacer & recycle)
+            tr.className = index % 2 ? 'vt-row vt-alt' : 'vt-row';
+            vt.renderRow(tr.cells, vt.rows[index], index);
+        }
+
+        function updateVirtualTable(vt, force) {
+            const rows = vt.rows;
+            if (!vt.mounted || !rows.length) return;
+            const rowHeight = vt.rowHeight;
+            const head = vt.tbody.previousElementSibling;  // <thead> sticky ikut tinggi scroll
+            const offset = Math.max(0, vt.scroller.scrollTop - (head ? head.offsetHeight : 0));
+            const first = Math.floor(offset / rowHeight);
+            const visible = Math.ceil((vt.scroller.clientHeight || 600) / rowHeight) + 1;
+            const start = Math.min(rows.length, Math.max(0, first - VIRTUAL_OVERSCAN));
+            const end = Math.min(rows.length, first + visible + VIRTUAL_OVERSCAN);
+            if (!force && start === vt.start && end === vt.end) return;
+
+            const count = end - start;
+            const shift = start - vt.start;
+            let pool = vt.pool;
+            if (!force && pool.length === count && shift !== 0 && Math.abs(shift) < count) {
+                // Scroll kecil: pindahkan node yang keluar layar ke sisi lain, render hanya baris baru
+                if (shift > 0) {
+                    const moved = pool.slice(0, shift);
+                    moved.forEach(tr => vt.tbody.insertBefore(tr, vt.bottomSpacer));
+                    pool = pool.slice(shift).concat(moved);
+                    for (let i = count - shift; i < count; i++) paintVirtualRow(vt, pool[i], start + i);
+                } else {
+                    const moved = pool.slice(count + shift);
+                    const anchor = pool[0];
+                    moved.forEach(tr => vt.tbody.insertBefore(tr, anchor));
+                    pool = moved.concat(pool.slice(0, count + shift));
+                    for (let i = 0; i < -shift; i++) paintVirtualRow(vt, pool[i], start + i);
+                }
+            } else {
+                while (pool.length > count) {
+                    const tr = pool.pop();
+                    vt.tbody.removeChild(tr);
+                    vt.spare.push(tr);
+                }
+                while (pool.length < count) {
+                    const tr = takeVirtualRow(vt);
+                    vt.tbody.insertBefore(tr, vt.bottomSpacer);
+                    pool.push(tr);
+                }
+                for (let i = 0; i < count; i++) paintVirtualRow(vt, pool[i], start + i);
+            }
+            vt.pool = pool;
+            vt.start = start;
+            vt.end = end;
+            vt.topSpacer.style.height = (start * rowHeight) + 'px';
+            vt.bottomSpacer.style.height = ((rows.length - end) * rowHeight) + 'px';
+        }
+
+        // Ukuran halaman dari dropdown "Tampilkan"; 0 = semua baris (di-scroll lewat tabel virtual)
+        function getTablePageSize(selectId) {
+            const select = document.getElementById(selectId);
+            const value = select ? select.value : '';
+            if (value === 'all') return 0;
+            return parseInt(value) || itemsPerPage;
+        }
+
+        // ==================== SEARCH INDEX ====================
+        // Jawab search box & saran SKU dari index trigram -> term tanpa scan includes() per item.
+        // Index dibangun di browser saat pertama dipakai: term (SKU/nama/kode kecil lowercase) didaftarkan
+        // ketika item / nilai sales pertama kali dicari, trigram-nya langsung masuk posting list.
+        function createSearchEngine() {
+            const terms = [];
+            const termIds = new Map();
+            const postings = new Map();  // trigram -> [id term] (urut naik)
+            const itemTerms = {};        // entity/type -> Int32Array [sku, name, kode_kecil] per item
+            let lastQuery = null, lastFlags = null;
+
+            // Id term untuk value lowercase (didaftarkan jika belum ada)
+            function termId(lower) {
+                let id = termIds.get(lower);
+                if (id === undefined) {
+                    id = terms.length;
+                    terms.push(lower);
+                    termIds.set(lower, id);
+                    const grams = new Set();
+                    for (let i = 0; i + 3 <= lower.length; i++) grams.add(lower.substr(i, 3));
+                    grams.forEach(gram => {
+                        const list = postings.get(gram);
+                        if (list) list.push(id);
+                        else postings.set(gram, [id]);
+                    });
+                }
+                return id;
+            }
+
+            // Flag per id term: 1 jika term mengandung query (query sudah lowercase).
+            // Term yang didaftarkan setelah flags dihitung (id >= flags.length) dicek langsung.
+            function match(query) {
+                if (query === lastQuery) return lastFlags;
+                const flags = new Uint8Array(terms.length);
+                if (query.length < 3) {
+                    for (let i = 0; i < terms.length; i++) {
+                        if (terms[i].includes(query)) flags[i] = 1;
+                    }
+                } else {
+                    // Kandidat = posting list terpendek dari semua trigram query
+                    let shortest = null;
+                    for (let i = 0; i + 3 <= query.length; i++) {
+                        const list = postings.get(query.substr(i, 3));
+                        if (!list) {
+                            shortest = null;
+                            break;
                         }
+                        if (!shortest || list.length < shortest.length) shortest = list;
+                    }
+                    if (shortest) {
+                        for (let i = 0; i < shortest.length; i++) {
+                            if (terms[shortest[i]].includes(query)) flags[shortest[i]] = 1;
+                        }
+                    }
+                }
+                lastQuery = query;
+                lastFlags = flags;
+                return flags;
+            }
+
+            // true jika value (case-insensitive) mengandung query
+            function contains(value, query) {
+                const lower = (value || '').toLowerCase();
+                if (!lower) return false;
+                const known = termIds.get(lower);
+                if (known === undefined) {
+                    termId(lower);  // Query berikutnya lewat index
+                    return lower.includes(query);
+                }
+                const flags = match(query);
+                return known < flags.length ? flags[known] === 1 : lower.includes(query);
+            }
+
+            // Fungsi (index item) -> cocok dengan search, untuk sku / name / kode_kecil
+            function itemMatcher(key, items, query) {
+                let ids = itemTerms[key];
+                if (!ids || ids.length !== items.length * 3) {
+                    ids = itemTerms[key] = new Int32Array(items.length * 3);
+                    items.forEach((item, i) => {
+                        [item.sku, item.name, item.kode_kecil].forEach((value, f) => {
+                            const lower = (value || '').toLowerCase();
+                            ids[i * 3 + f] = lower ? termId(lower) : -1;
+                        });
                     });
+                    lastQuery = null;  // Term baru: hitung ulang flags query
                 }
-            });
+                const flags = match(query);
+                return i => {
+                    for (let f = 0; f < 3; f++) {
+                        if (ids[i * 3 + f] >= 0 && flags[ids[i * 3 + f]] === 1) return true;
+                    }
+                    return false;
+                };
+            }
+
+            return { match: match, contains: contains, itemMatcher: itemMatcher };
+        }
+
+        const searchEngine = createSearchEngine();
+
+        // ==================== STOCK QUERY ENGINE ====================
+        // Filter -> group per kode kecil -> sort -> potong halaman dalam satu pass.
+        // Dijalankan di Web Worker (lihat runStockQueryAsync); fungsi yang sama dipakai sinkron sebagai fallback.
+        function runStockQuery(items, query, cache) {
+            const signature = JSON.stringify([query.key, query.search, query.gender, query.series, query.tier,
+                query.store, query.area, query.excludeWarehouse, query.sortField, query.sortDir]);
+            let data, summary = null;
+            if (cache && cache.signature === signature) {
+                data = cache.data;  // Ganti halaman: pakai hasil sort sebelumnya
+                summary = cache.summary;
+            } else {
+                const search = query.search;
+                const searchMatch = search ? searchEngine.itemMatcher(query.key, items, search) : null;
+                const gender = (query.gender || '').toUpperCase();
+                const series = query.series;
+                const store = query.store;
+                const area = query.area;
+                const m = stockMatrixOf(items);
+                const width = m.width, values = m.values, present = m.present;
+                const storeCol = store ? m.index[store] : undefined;
+                const areas = stockColumnAreas(m);
+                const areaMask = !store && area ? stockColumnMask(m, (loc, j) =>
+                    !(query.excludeWarehouse && isWarehouseLocation(loc)) && areas[j] === area) : null;
+                const groupIndex = {};   // kode kecil -> index group
+                const members = [];      // index baris item per group
+
+                for (let i = 0; i < items.length; i++) {
+                    const item = items[i];
+                    if (searchMatch && !searchMatch(i)) continue;
+                    if (gender && !(item.gender || '').toUpperCase().includes(gender)) continue;
+                    if (query.tier && (item.tier || '') !== query.tier) continue;
+                    if (series && !((item.series || '').includes(series) || (item.name || '').toUpperCase().includes(series))) continue;
+                    const base = i * width;
+                    if (store) {
+                        // Hanya item yang punya stock di lokasi ini (stock !== 0)
+                        if (storeCol === undefined || !present[base + storeCol] || values[base + storeCol] === 0) continue;
+                    } else if (areaMask) {
+                        // Hanya item yang punya stock di area ini (stock !== 0)
+                        let inArea = false;
+                        for (let j = 0; j < width; j++) {
+                            if (areaMask[j] && present[base + j] && values[base + j] !== 0) { inArea = true; break; }
+                        }
+                        if (!inArea) continue;
+                    }
+
+                    const kk = (item.kode_kecil || '').toUpperCase();
+                    if (!kk) continue;
+                    let g = groupIndex[kk];
+                    if (g === undefined) {
+                        g = groupIndex[kk] = members.length;
+                        members.push([]);
+                    }
+                    members[g].push(i);
+                }
+
+                // Group: field dari item pertama, total dijumlah; _r sementara = index group
+                const groupCount = members.length;
+                const groupValues = new Int32Array(groupCount * width);
+                const groupPresent = new Uint8Array(groupCount * width);
+                const groupMatrix = createStockMatrix(m.stores, groupCount, groupValues, groupPresent);
+                groupMatrix.areas = areas;
+                const groupProto = createStockItemProto(groupMatrix);
+                const groups = new Array(groupCount);
+                const storeTotals = new Float64Array(groupCount);
+                for (let g = 0; g < groupCount; g++) {
+                    const rows = members[g];
+                    const first = items[rows[0]];
+                    const group = Object.create(groupProto);
+                    const keys = Object.keys(first);
+                    for (let k = 0; k < keys.length; k++) {
+                        if (keys[k] !== 'store_stock') group[keys[k]] = first[keys[k]];
+                    }
+                    let total = 0;
+                    for (let r = 0; r < rows.length; r++) {
+                        total += items[rows[r]].total || 0;
+                        if (storeCol !== undefined) storeTotals[g] += values[rows[r] * width + storeCol];
+                    }
+                    group.total = total;
+                    group._r = g;
+                    groups[g] = group;
+                }
+                // Urutan awal sama seperti Object.values(map per kode kecil) sebelum di-sort
+                data = Object.keys(groupIndex).map(kk => groups[groupIndex[kk]]);
+
+                const sortField = query.sortField, asc = query.sortDir === 'asc';
+                data.sort((a, b) => {
+                    let aVal, bVal;
+                    if (sortField === 'total' && store) {
+                        aVal = storeTotals[a._r];
+                        bVal = storeTotals[b._r];
+                    } else {
+                        aVal = a[sortField];
+                        bVal = b[sortField];
+                    }
+                    if (typeof aVal === 'string') aVal = (aVal || '').toLowerCase();
+                    if (typeof bVal === 'string') bVal = (bVal || '').toLowerCase();
+                    if (aVal < bVal) return asc ? -1 : 1;
+                    if (aVal > bVal) return asc ? 1 : -1;
+                    return 0;
+                });
+
+                // Matrix group mengikuti urutan hasil sort: baris i = data[i] (jumlah per lokasi member-nya)
+                for (let i = 0; i < groupCount; i++) {
+                    const rows = members[data[i]._r];
+                    sumStockColumns(m, rows, groupValues, i * width);
+                    for (let r = 0; r < rows.length; r++) {
+                        const base = rows[r] * width;
+                        for (let j = 0; j < width; j++) {
+                            if (present[base + j]) groupPresent[i * width + j] = 1;
+                        }
+                    }
+                    data[i]._r = i;
+                }
+                bindStockMatrix(data, groupMatrix);
+
+                if (cache) {
+                    cache.signature = signature;
+                    cache.data = data;
+                    cache.summary = null;
+                }
+            }
+            if (query.summary && !summary) {
+                summary = computeStockChartSummary(data, query.store, query.area);
+                if (cache) cache.summary = summary;
+            }
+
+            const page = Math.max(1, query.page || 1);
+            let rows = query.pageSize ? data.slice((page - 1) * query.pageSize, page * query.pageSize) : data;
+            if (query.tableRows) {
+                // Kolom tabel saja: "semua baris" tidak perlu mengirim store_stock tiap artikel dari worker
+                const gm = stockMatrixOf(data);
+                const col = query.store ? gm.index[query.store] : undefined;
+                rows = rows.map(item => ({
+                    kode_kecil: item.kode_kecil, gender: item.gender, series: item.series, tipe: item.tipe,
+                    name: item.name, tier: item.tier,
+                    stock: !query.store ? item.total : col === undefined ? 0 : gm.values[item._r * gm.width + col]
+                }));
+            }
+            return {
+                signature: signature,
+                total: data.length,
+                page: page,
+                rows: rows,
+                summary: query.summary ? summary : null
+            };
+        }
+
+        // Isi Web Worker: simpan array data per entity/type, hanya query terbaru per tabel yang dijalankan
+        function stockQueryWorkerMain() {
+            const datasets = {};
+            const caches = {};
+            const pending = {};
+            let scheduled = false;
+
+            function drain() {
+                scheduled = false;
+                Object.keys(pending).forEach(channel => {
+                    const msg = pending[channel];
+                    delete pending[channel];
+                    if (!caches[channel]) caches[channel] = {};
+                    const result = runStockQuery(datasets[msg.query.key] || [], msg.query, caches[channel]);
+                    result.channel = channel;
+                    result.id = msg.id;
+                    self.postMessage(result);
+                });
+            }
+
+            self.onmessage = e => {
+                const msg = e.data;
+                if (msg.type === 'load') {
+                    datasets[msg.key] = bindStockMatrix(msg.items, msg.matrix);
+                    return;
+                }
+                pending[msg.channel] = msg;  // Query lama yang belum jalan di tabel yang sama dibuang
+                if (!scheduled) {
+                    scheduled = true;
+                    setTimeout(drain, 0);
+                }
+            };
+        }
+
+        let stockQueryWorker;              // undefined = belum dibuat, null = tidak tersedia
+        const stockQueryLoaded = {};       // {entity/type: true} data yang sudah dikirim ke worker
+        const stockQueryPending = {};      // {channel: {id, query, callback}} query terakhir per tabel
+        const stockQueryCaches = {};       // cache hasil sort untuk jalur sinkron
+        let stockQuerySeq = 0;
+
+        function getStockQueryItems(key) {
+            const [entity, dataType] = key.split('/');
+            return (allData[entity] || {})[dataType] || [];
+        }
+
+        function runStockQuerySync(channel, query) {
+            if (!stockQueryCaches[channel]) stockQueryCaches[channel] = {};
+            return runStockQuery(getStockQueryItems(query.key), query, stockQueryCaches[channel]);
+        }
+
+        function createStockQueryWorker() {
+            if (typeof Worker === 'undefined' || typeof Blob === 'undefined' || typeof URL === 'undefined' || !URL.createObjectURL) return null;
+            const source = [
+                'const storeAreaLookup = ' + JSON.stringify(storeAreaLookup) + ';',
+                'const storeAreaMap = ' + JSON.stringify(storeAreaMap) + ';',
+                'const storeAreaMemo = {};',
+                createSearchEngine,
+                'const searchEngine = createSearchEngine();',
+                getAreaFromStore, matchAreaFromStore, isWarehouseLocation,
+                createStockMatrix, createStockItemProto, bindStockMatrix, stockMatrixOf,
+                stockColumnAreas, stockColumnMask, sumStockRow, sumStockColumns,
+                computeStockChartSummary, runStockQuery, stockQueryWorkerMain,
+                'stockQueryWorkerMain();'
+            ].map(String).join('\\n');
+            try {
+                const worker = new Worker(URL.createObjectURL(new Blob([source], { type: 'application/javascript' })));
+                worker.onmessage = e => {
+                    const pending = stockQueryPending[e.data.channel];
+                    if (!pending || pending.id !== e.data.id) return;  // Hasil query lama, abaikan
+                    delete stockQueryPending[e.data.channel];
+                    pending.callback(e.data);
+                };
+                worker.onerror = e => {
+                    console.error('Stock query worker error, fallback ke main thread:', e.message);
+                    stockQueryWorker = null;
+                    Object.keys(stockQueryPending).forEach(channel => {
+                        const pending = stockQueryPending[channel];
+                        delete stockQueryPending[channel];
+                        pending.callback(runStockQuerySync(channel, pending.query));
+                    });
+                };
+                return worker;
+            } catch (e) {
+                console.warn('Web Worker tidak tersedia, query stock di main thread:', e);
+                return null;
+            }
+        }
+
+        // Jalankan query di worker; callback hanya dipanggil untuk query terbaru di channel tsb
+        function runStockQueryAsync(channel, query, callback) {
+            if (stockQueryWorker === undefined) stockQueryWorker = createStockQueryWorker();
+            if (!stockQueryWorker) {
+                callback(runStockQuerySync(channel, query));
+                return;
+            }
+            if (!stockQueryLoaded[query.key]) {
+                // Item dikirim tanpa store_stock; stock per lokasi ikut sebagai satu matrix typed array
+                const items = getStockQueryItems(query.key);
+                stockQueryWorker.postMessage({ type: 'load', key: query.key, items: items, matrix: stockMatrixOf(items) });
+                stockQueryLoaded[query.key] = true;
+            }
+            const id = ++stockQuerySeq;
+            stockQueryPending[channel] = { id: id, query: query, callback: callback };
+            stockQueryWorker.postMessage({ type: 'query', channel: channel, id: id, query: query });
+        }
+
+        function getRetailQuery() {
+            return {
+                key: currentEntity + '/retail',
+                search: document.getElementById('rtSearchInput').value.toLowerCase(),
+                gender: document.getElementById('rtFilterGender').value,
+                series: document.getElementById('rtFilterSeries').value,
+                tier: document.getElementById('tableFilterTier').value,
+                store: document.getElementById('tableFilterStore').value,
+                area: document.getElementById('tableFilterArea').value,
+                excludeWarehouse: true,
+                sortField: rtSortField,
+                sortDir: rtSortDir,
+                page: 1,
+                pageSize: getTablePageSize('rtPageSize'),
+                summary: false
+            };
+        }
+
+        function getWarehouseQuery() {
+            return {
+                key: currentEntity + '/warehouse',
+                search: document.getElementById('whSearchInput').value.toLowerCase(),
+                gender: document.getElementById('whFilterGender').value,
+                series: document.getElementById('whFilterSeries').value,
+                tier: document.getElementById('whFilterTier').value,
+                store: document.getElementById('whFilterWarehouse').value,
+                area: document.getElementById('whFilterArea').value,
+                excludeWarehouse: false,
+                sortField: whSortField,
+                sortDir: whSortDir,
+                page: 1,
+                pageSize: getTablePageSize('whPageSize'),
+                summary: false
+            };
+        }
+
+        // Semua baris hasil filter tabel (untuk detail minus), dihitung langsung di main thread
+        function getFilteredStockRows(dataType) {
+            const query = dataType === 'retail' ? getRetailQuery() : getWarehouseQuery();
+            query.pageSize = 0;
+            return runStockQuerySync(dataType, query).rows;
+        }
+
+        // Update Retail charts
+        function updateRetailCharts(summary) {
+            const catData = summary.cat, areaData = summary.area, seriesData = summary.series;
+            const [minusArticles, minusPairs, locCount] = summary.minus;
 
             // Update retail stats
-            document.getElementById('rtTotalSku').textContent = totalSku.toLocaleString('id-ID');
-            document.getElementById('rtTotalStock').textContent = totalStock.toLocaleString('id-ID');
-            const locCount = minusLocations.size;
+            document.getElementById('rtTotalSku').textContent = summary.sku.toLocaleString('id-ID');
+            document.getElementById('rtTotalStock').textContent = summary.stock.toLocaleString('id-ID');
             document.getElementById('rtNegativeStock').textContent = locCount.toLocaleString('id-ID') + ' lokasi';
             document.getElementById('rtNegativeSubValue').textContent = minusArticles.toLocaleString('id-ID') + ' artikel | -' + minusPairs.toLocaleString('id-ID') + ' pairs';
 
@@ -2744,88 +4378,13 @@ def generate_html(all_data, all_stores):
         }
 
         // Update Warehouse charts
-        function updateWarehouseCharts(data, locationFilter, areaFilter) {
-            const catData = {}, areaData = {}, seriesData = {};
-            // Total SKU = jumlah item dalam data (data sudah difilter sebelum masuk fungsi ini)
-            let totalSku = data.length;
-            let totalStock = 0;
-            let minusArticles = 0;
-            let minusPairs = 0;
-            let minusLocations = new Set();
-
-            data.forEach(item => {
-                const gender = item.gender || 'BABY';
-                const series = item.series || '-';
-                const seriesGender = (series && series !== '-' && series !== '') ? series + ' - ' + gender : '';
-
-                // Calculate stock value based on filter
-                let stockValue = 0;
-
-                if (locationFilter) {
-                    // Warehouse filter - get stock for this warehouse
-                    if (item.store_stock && item.store_stock[locationFilter] !== undefined) {
-                        stockValue = item.store_stock[locationFilter];
-                    }
-                } else if (areaFilter) {
-                    // Area filter - sum stock for all warehouses in this area
-                    if (item.store_stock) {
-                        Object.entries(item.store_stock).forEach(([loc, stock]) => {
-                            if (getAreaFromStore(loc) === areaFilter) {
-                                stockValue += stock;
-                            }
-                        });
-                    }
-                } else {
-                    // No filter - use total
-                    stockValue = item.total || 0;
-                }
-
-                catData[gender] = (catData[gender] || 0) + Math.max(0, stockValue);
-                if (seriesGender) {
-                    seriesData[seriesGender] = (seriesData[seriesGender] || 0) + Math.max(0, stockValue);
-                }
-
-                totalStock += stockValue;  // Include all stock
-
-                // Area calculation
-                if (locationFilter) {
-                    if (item.store_stock && item.store_stock[locationFilter] !== undefined) {
-                        const area = getAreaFromStore(locationFilter);
-                        areaData[area] = (areaData[area] || 0) + Math.max(0, item.store_stock[locationFilter]);
-                    }
-                } else if (areaFilter) {
-                    if (item.store_stock) {
-                        Object.entries(item.store_stock).forEach(([loc, stock]) => {
-                            if (getAreaFromStore(loc) === areaFilter) {
-                                areaData[areaFilter] = (areaData[areaFilter] || 0) + Math.max(0, stock);
-                            }
-                        });
-                    }
-                } else if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, stock]) => {
-                        const area = getAreaFromStore(store);
-                        areaData[area] = (areaData[area] || 0) + Math.max(0, stock);
-                    });
-                }
-
-                // Minus calculation
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([storeName, stock]) => {
-                        if (locationFilter && storeName !== locationFilter) return;
-                        if (areaFilter && getAreaFromStore(storeName) !== areaFilter) return;
-                        if (stock < 0) {
-                            minusArticles++;
-                            minusPairs += Math.abs(stock);
-                            minusLocations.add(storeName);
-                        }
-                    });
-                }
-            });
+        function updateWarehouseCharts(summary) {
+            const catData = summary.cat, areaData = summary.area, seriesData = summary.series;
+            const [minusArticles, minusPairs, whLocCount] = summary.minus;
 
             // Update warehouse stats
-            document.getElementById('whTotalSku').textContent = totalSku.toLocaleString('id-ID');
-            document.getElementById('whTotalStock').textContent = totalStock.toLocaleString('id-ID');
-            const whLocCount = minusLocations.size;
+            document.getElementById('whTotalSku').textContent = summary.sku.toLocaleString('id-ID');
+            document.getElementById('whTotalStock').textContent = summary.stock.toLocaleString('id-ID');
             document.getElementById('whNegativeStock').textContent = whLocCount.toLocaleString('id-ID') + ' lokasi';
             document.getElementById('whNegativeSubValue').textContent = minusArticles.toLocaleString('id-ID') + ' artikel | -' + minusPairs.toLocaleString('id-ID') + ' pairs';
 
@@ -2871,33 +4430,6 @@ def generate_html(all_data, all_stores):
             });
         }
 
-        function getAreaFromStore(storeName) {
-            const s = storeName.toLowerCase().trim();
-
-            // 1. Cek exact match di storeAreaMap (dari Master Store/Warehouse)
-            if (storeAreaMap[s]) return storeAreaMap[s];
-
-            // 2. Cek partial match di storeAreaMap
-            for (const [key, area] of Object.entries(storeAreaMap)) {
-                if (s.includes(key) || key.includes(s)) return area;
-            }
-
-            // 3. Fallback untuk warehouse - detect area from warehouse name
-            const upper = storeName.toUpperCase();
-            if (upper.includes('WAREHOUSE') || upper.includes('GUDANG')) {
-                // WHB - Warehouse Bali
-                if (upper.includes('BALI') || upper.includes('GATSU')) return 'Bali';
-                // WHJ - Warehouse Jakarta
-                if (upper.includes('JAKARTA') || upper.includes('PLUIT')) return 'Jakarta';
-                // WHS - Warehouse Pusat (Jawa Timur)
-                if (upper.includes('PUSAT')) return 'Jawa Timur';
-                return 'Jawa Timur'; // Default warehouse to Jawa Timur
-            }
-
-            // 4. Default ke Bali
-            return 'Bali';
-        }
-
         function renderAreaTags() {
             var storesData = allStores[currentEntity] || {};
             var stores = storesData[currentType] || [];
@@ -2925,14 +4457,10 @@ def generate_html(all_data, all_stores):
             const data = getData();
 
             // Calculate stock per store
+            const m = stockMatrixOf(data);
+            const totals = stockColumnTotals(m);
             const storeStock = {};
-            data.forEach(item => {
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, stock]) => {
-                        storeStock[store] = (storeStock[store] || 0) + stock;
-                    });
-                }
-            });
+            m.stores.forEach((store, j) => { storeStock[store] = totals[j]; });
 
             let filteredStores = stores;
             if (currentArea) {
@@ -2956,80 +4484,30 @@ def generate_html(all_data, all_stores):
         }
 
         // ==================== RETAIL TABLE FUNCTIONS ====================
-        function applyRetailFilters() {
-            var entityData = allData[currentEntity] || {};
-            let data = entityData.retail || [];
-
-            const search = document.getElementById('rtSearchInput').value.toLowerCase();
-            const gender = document.getElementById('rtFilterGender').value;
-            const series = document.getElementById('rtFilterSeries').value;
-            const tableArea = document.getElementById('tableFilterArea').value;
-            const tableStore = document.getElementById('tableFilterStore').value;
-            const tableTier = document.getElementById('tableFilterTier').value;
-
-            if (search) {
-                data = data.filter(item => item.sku.toLowerCase().includes(search) || (item.name || '').toLowerCase().includes(search) || (item.kode_kecil || '').toLowerCase().includes(search));
-            }
-            if (gender) {
-                data = data.filter(item => (item.gender || '').toUpperCase().includes(gender.toUpperCase()));
-            }
-            if (tableTier) {
-                data = data.filter(item => (item.tier || '') === tableTier);
-            }
-            if (series) {
-                data = data.filter(item => (item.series || '').includes(series) || (item.name || '').toUpperCase().includes(series));
-            }
-            if (tableStore) {
-                // Filter: hanya item yang punya stock di store ini (stock !== 0)
-                data = data.filter(item => item.store_stock && item.store_stock[tableStore] !== undefined && item.store_stock[tableStore] !== 0);
-            } else if (tableArea) {
-                // Filter: hanya item yang punya stock di area ini (stock !== 0)
-                data = data.filter(item => {
-                    if (!item.store_stock) return false;
-                    return Object.entries(item.store_stock).some(([store, stock]) => !isWarehouseLocation(store) && getAreaFromStore(store) === tableArea && stock !== 0);
-                });
-            }
-
-            // Group by kode_kecil
-            const groupedMap = {};
-            data.forEach(item => {
-                const kk = (item.kode_kecil || '').toUpperCase();
-                if (!kk) return;
-                if (!groupedMap[kk]) {
-                    groupedMap[kk] = { ...item, total: 0, store_stock: {} };
-                }
-                groupedMap[kk].total += item.total || 0;
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, qty]) => {
-                        groupedMap[kk].store_stock[store] = (groupedMap[kk].store_stock[store] || 0) + qty;
-                    });
-                }
-            });
-            data = Object.values(groupedMap);
-
-            // Sort
-            data.sort((a, b) => {
-                let aVal, bVal;
-                if (rtSortField === 'total' && tableStore) {
-                    aVal = (a.store_stock && a.store_stock[tableStore]) || 0;
-                    bVal = (b.store_stock && b.store_stock[tableStore]) || 0;
-                } else {
-                    aVal = a[rtSortField];
-                    bVal = b[rtSortField];
+        function applyRetailFilters(page) {
+            cancelScheduled('retail');
+            const query = getRetailQuery();
+            query.page = page || 1;
+            query.tableRows = true;
+
+            // Tanpa filter & sort default: chart pakai rollup, worker tidak perlu hitung ringkasan
+            const unfiltered = !query.search && !query.gender && !query.series && !query.tier && !query.store && !query.area;
+            const rollup = unfiltered && rtSortField === 'total' && rtSortDir === 'desc' ? getStockChartRollup('retail') : null;
+            query.summary = !rollup;
+
+            runStockQueryAsync('retail', query, result => {
+                rtPageData = result.rows;
+                rtFilteredCount = result.total;
+                rtCurrentPage = result.page;
+                rtRowsPerPage = query.pageSize;
+                renderRetailTable();
+
+                // Update retail charts with filtered data (ganti halaman saja tidak render ulang chart)
+                if (!page || result.signature !== rtChartSignature) {
+                    rtChartSignature = result.signature;
+                    updateRetailCharts(rollup || result.summary);
                 }
-                if (typeof aVal === 'string') aVal = (aVal || '').toLowerCase();
-                if (typeof bVal === 'string') bVal = (bVal || '').toLowerCase();
-                if (aVal < bVal) return rtSortDir === 'asc' ? -1 : 1;
-                if (aVal > bVal) return rtSortDir === 'asc' ? 1 : -1;
-                return 0;
             });
-
-            rtFilteredData = data;
-            rtCurrentPage = 1;
-            renderRetailTable();
-
-            // Update retail charts with filtered data
-            updateRetailCharts(data, tableStore, tableArea);
         }
 
         function sortRetailData(field) {
@@ -3051,135 +4529,86 @@ def generate_html(all_data, all_stores):
             applyRetailFilters();
         }
 
-        function renderRetailTable() {
-            const start = (rtCurrentPage - 1) * itemsPerPage;
-            const pageData = rtFilteredData.slice(start, start + itemsPerPage);
-            const tbody = document.getElementById('rtTableBody');
-            const tableStore = document.getElementById('tableFilterStore').value;
+        // Satu tabel virtual per tbody Retail/Warehouse (kolom sama: 7 kolom dari stock query)
+        const stockVirtualTables = {};
 
-            if (!pageData.length) {
-                tbody.innerHTML = '<tr><td colspan="7" style="text-align:center;padding:40px;color:#9ca3af;">Tidak ada data</td></tr>';
-            } else {
-                tbody.innerHTML = pageData.map(item => {
-                    let displayStock = item.total;
-                    if (tableStore && item.store_stock) {
-                        displayStock = item.store_stock[tableStore] || 0;
-                    }
+        function getStockVirtualTable(tbody, dataType) {
+            if (stockVirtualTables[tbody.id]) return stockVirtualTables[tbody.id];
+            return stockVirtualTables[tbody.id] = createVirtualTable({
+                scroller: tbody.closest('.table-wrapper'),
+                tbody: tbody,
+                rowHeight: 44,
+                columns: 7,
+                renderRow: (cells, item) => {
                     const kodeKecil = item.kode_kecil || '-';
-                    return `<tr>
-                        <td><a href="#" onclick="showSkuDetail('${kodeKecil}', 'retail'); return false;" style="color:#1f2937; text-decoration:underline; font-weight:600; cursor:pointer;">${kodeKecil}</a></td>
-                        <td>${item.gender || '-'}</td>
-                        <td>${item.series || '-'}</td>
-                        <td>${item.tipe || '-'}</td>
-                        <td>${item.name || '-'}</td>
-                        <td>${item.tier || '-'}</td>
-                        <td><strong>${displayStock.toLocaleString('id-ID')}</strong></td>
-                    </tr>`;
-                }).join('');
-            }
+                    cells[0].innerHTML = `<a href="#" onclick="showSkuDetail('${kodeKecil}', '${dataType}'); return false;" style="color:#1f2937; text-decoration:underline; font-weight:600; cursor:pointer;">${kodeKecil}</a>`;
+                    cells[1].textContent = item.gender || '-';
+                    cells[2].textContent = item.series || '-';
+                    cells[3].textContent = item.tipe || '-';
+                    cells[4].textContent = item.name || '-';
+                    cells[5].textContent = item.tier || '-';
+                    cells[6].innerHTML = '<strong>' + item.stock.toLocaleString('id-ID') + '</strong>';
+                }
+            });
+        }
+
+        function renderRetailTable() {
+            const tbody = document.getElementById('rtTableBody');
+            setVirtualTableRows(getStockVirtualTable(tbody, 'retail'), rtPageData,
+                '<tr><td colspan="7" style="text-align:center;padding:40px;color:#9ca3af;">Tidak ada data</td></tr>');
             renderRetailPagination();
         }
 
         function renderRetailPagination() {
-            const totalPages = Math.ceil(rtFilteredData.length / itemsPerPage);
+            const perPage = rtRowsPerPage || rtFilteredCount;
+            const totalPages = perPage ? Math.ceil(rtFilteredCount / perPage) : 0;
             const pageInfo = document.getElementById('rtPageInfo');
             const pageButtons = document.getElementById('rtPageButtons');
 
-            const start = (rtCurrentPage - 1) * itemsPerPage + 1;
-            const end = Math.min(rtCurrentPage * itemsPerPage, rtFilteredData.length);
-            pageInfo.textContent = rtFilteredData.length ? `Showing ${start}-${end} of ${rtFilteredData.length} items` : 'Showing 0 items';
+            const start = (rtCurrentPage - 1) * perPage + 1;
+            const end = Math.min(rtCurrentPage * perPage, rtFilteredCount);
+            pageInfo.textContent = rtFilteredCount ? `Showing ${start}-${end} of ${rtFilteredCount} items` : 'Showing 0 items';
 
             let btns = '';
             if (totalPages > 1) {
                 if (rtCurrentPage > 1) btns += `<button onclick="rtGoToPage(${rtCurrentPage - 1})">‹</button>`;
                 for (let i = Math.max(1, rtCurrentPage - 2); i <= Math.min(totalPages, rtCurrentPage + 2); i++) {
-                    btns += `<button class="${i === rtCurrentPage ? 'active' : ''}" onclick="rtGoToPage(${i})">${i}</button>`;
-                }
-                if (rtCurrentPage < totalPages) btns += `<button onclick="rtGoToPage(${rtCurrentPage + 1})">›</button>`;
-            }
-            pageButtons.innerHTML = btns;
-        }
-
-        function rtGoToPage(page) {
-            rtCurrentPage = page;
-            renderRetailTable();
-        }
-
-        // ==================== WAREHOUSE TABLE FUNCTIONS ====================
-        function applyWarehouseFilters() {
-            var entityData = allData[currentEntity] || {};
-            let data = entityData.warehouse || [];
-
-            const search = document.getElementById('whSearchInput').value.toLowerCase();
-            const gender = document.getElementById('whFilterGender').value;
-            const series = document.getElementById('whFilterSeries').value;
-            const whArea = document.getElementById('whFilterArea').value;
-            const whWarehouse = document.getElementById('whFilterWarehouse').value;
-            const whTier = document.getElementById('whFilterTier').value;
-
-            if (search) {
-                data = data.filter(item => item.sku.toLowerCase().includes(search) || (item.name || '').toLowerCase().includes(search) || (item.kode_kecil || '').toLowerCase().includes(search));
-            }
-            if (gender) {
-                data = data.filter(item => (item.gender || '').toUpperCase().includes(gender.toUpperCase()));
-            }
-            if (whTier) {
-                data = data.filter(item => (item.tier || '') === whTier);
-            }
-            if (series) {
-                data = data.filter(item => (item.series || '').includes(series) || (item.name || '').toUpperCase().includes(series));
-            }
-            if (whWarehouse) {
-                // Filter: hanya item yang punya stock di warehouse ini (stock !== 0)
-                data = data.filter(item => item.store_stock && item.store_stock[whWarehouse] !== undefined && item.store_stock[whWarehouse] !== 0);
-            } else if (whArea) {
-                // Filter: hanya item yang punya stock di area ini (stock !== 0)
-                data = data.filter(item => {
-                    if (!item.store_stock) return false;
-                    return Object.entries(item.store_stock).some(([wh, stock]) => getAreaFromStore(wh) === whArea && stock !== 0);
-                });
+                    btns += `<button class="${i === rtCurrentPage ? 'active' : ''}" onclick="rtGoToPage(${i})">${i}</button>`;
+                }
+                if (rtCurrentPage < totalPages) btns += `<button onclick="rtGoToPage(${rtCurrentPage + 1})">›</button>`;
             }
+            pageButtons.innerHTML = btns;
+        }
 
-            // Group by kode_kecil
-            const groupedMap = {};
-            data.forEach(item => {
-                const kk = (item.kode_kecil || '').toUpperCase();
-                if (!kk) return;
-                if (!groupedMap[kk]) {
-                    groupedMap[kk] = { ...item, total: 0, store_stock: {} };
-                }
-                groupedMap[kk].total += item.total || 0;
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([wh, qty]) => {
-                        groupedMap[kk].store_stock[wh] = (groupedMap[kk].store_stock[wh] || 0) + qty;
-                    });
-                }
-            });
-            data = Object.values(groupedMap);
-
-            // Sort
-            data.sort((a, b) => {
-                let aVal, bVal;
-                if (whSortField === 'total' && whWarehouse) {
-                    aVal = (a.store_stock && a.store_stock[whWarehouse]) || 0;
-                    bVal = (b.store_stock && b.store_stock[whWarehouse]) || 0;
-                } else {
-                    aVal = a[whSortField];
-                    bVal = b[whSortField];
+        function rtGoToPage(page) {
+            applyRetailFilters(page);
+        }
+
+        // ==================== WAREHOUSE TABLE FUNCTIONS ====================
+        function applyWarehouseFilters(page) {
+            cancelScheduled('warehouse');
+            const query = getWarehouseQuery();
+            query.page = page || 1;
+            query.tableRows = true;
+
+            // Tanpa filter & sort default: chart pakai rollup, worker tidak perlu hitung ringkasan
+            const unfiltered = !query.search && !query.gender && !query.series && !query.tier && !query.store && !query.area;
+            const rollup = unfiltered && whSortField === 'total' && whSortDir === 'desc' ? getStockChartRollup('warehouse') : null;
+            query.summary = !rollup;
+
+            runStockQueryAsync('warehouse', query, result => {
+                whPageData = result.rows;
+                whFilteredCount = result.total;
+                whCurrentPage = result.page;
+                whRowsPerPage = query.pageSize;
+                renderWarehouseTable();
+
+                // Update warehouse charts with filtered data (ganti halaman saja tidak render ulang chart)
+                if (!page || result.signature !== whChartSignature) {
+                    whChartSignature = result.signature;
+                    updateWarehouseCharts(rollup || result.summary);
                 }
-                if (typeof aVal === 'string') aVal = (aVal || '').toLowerCase();
-                if (typeof bVal === 'string') bVal = (bVal || '').toLowerCase();
-                if (aVal < bVal) return whSortDir === 'asc' ? -1 : 1;
-                if (aVal > bVal) return whSortDir === 'asc' ? 1 : -1;
-                return 0;
             });
-
-            whFilteredData = data;
-            whCurrentPage = 1;
-            renderWarehouseTable();
-
-            // Update warehouse charts with filtered data
-            updateWarehouseCharts(data, whWarehouse, whArea);
         }
 
         function sortWarehouseData(field) {
@@ -3202,42 +4631,21 @@ def generate_html(all_data, all_stores):
         }
 
         function renderWarehouseTable() {
-            const start = (whCurrentPage - 1) * itemsPerPage;
-            const pageData = whFilteredData.slice(start, start + itemsPerPage);
             const tbody = document.getElementById('whTableBody');
-            const whWarehouse = document.getElementById('whFilterWarehouse').value;
-
-            if (!pageData.length) {
-                tbody.innerHTML = '<tr><td colspan="7" style="text-align:center;padding:40px;color:#9ca3af;">Tidak ada data</td></tr>';
-            } else {
-                tbody.innerHTML = pageData.map(item => {
-                    let displayStock = item.total;
-                    if (whWarehouse && item.store_stock) {
-                        displayStock = item.store_stock[whWarehouse] || 0;
-                    }
-                    const kodeKecil = item.kode_kecil || '-';
-                    return `<tr>
-                        <td><a href="#" onclick="showSkuDetail('${kodeKecil}', 'warehouse'); return false;" style="color:#1f2937; text-decoration:underline; font-weight:600; cursor:pointer;">${kodeKecil}</a></td>
-                        <td>${item.gender || '-'}</td>
-                        <td>${item.series || '-'}</td>
-                        <td>${item.tipe || '-'}</td>
-                        <td>${item.name || '-'}</td>
-                        <td>${item.tier || '-'}</td>
-                        <td><strong>${displayStock.toLocaleString('id-ID')}</strong></td>
-                    </tr>`;
-                }).join('');
-            }
+            setVirtualTableRows(getStockVirtualTable(tbody, 'warehouse'), whPageData,
+                '<tr><td colspan="7" style="text-align:center;padding:40px;color:#9ca3af;">Tidak ada data</td></tr>');
             renderWarehousePagination();
         }
 
         function renderWarehousePagination() {
-            const totalPages = Math.ceil(whFilteredData.length / itemsPerPage);
+            const perPage = whRowsPerPage || whFilteredCount;
+            const totalPages = perPage ? Math.ceil(whFilteredCount / perPage) : 0;
             const pageInfo = document.getElementById('whPageInfo');
             const pageButtons = document.getElementById('whPageButtons');
 
-            const start = (whCurrentPage - 1) * itemsPerPage + 1;
-            const end = Math.min(whCurrentPage * itemsPerPage, whFilteredData.length);
-            pageInfo.textContent = whFilteredData.length ? `Showing ${start}-${end} of ${whFilteredData.length} items` : 'Showing 0 items';
+            const start = (whCurrentPage - 1) * perPage + 1;
+            const end = Math.min(whCurrentPage * perPage, whFilteredCount);
+            pageInfo.textContent = whFilteredCount ? `Showing ${start}-${end} of ${whFilteredCount} items` : 'Showing 0 items';
 
             let btns = '';
             if (totalPages > 1) {
@@ -3251,22 +4659,13 @@ def generate_html(all_data, all_stores):
         }
 
         function whGoToPage(page) {
-            whCurrentPage = page;
-            renderWarehouseTable();
+            applyWarehouseFilters(page);
         }
 
         function updateWhAreaDropdown() {
             var entityData = allData[currentEntity] || {};
             var whData = entityData.warehouse || [];
-            const areas = new Set();
-
-            whData.forEach(item => {
-                if (item.store_stock) {
-                    Object.keys(item.store_stock).forEach(wh => {
-                        areas.add(getAreaFromStore(wh));
-                    });
-                }
-            });
+            const areas = new Set(stockColumnAreas(stockMatrixOf(whData)));
 
             const areaSelect = document.getElementById('whFilterArea');
             areaSelect.innerHTML = '<option value="">Semua Area</option>';
@@ -3280,16 +4679,11 @@ def generate_html(all_data, all_stores):
             var whData = entityData.warehouse || [];
             const whArea = document.getElementById('whFilterArea').value;
 
+            const m = stockMatrixOf(whData);
+            const areas = stockColumnAreas(m), totals = stockColumnTotals(m);
             const whStock = {};
-            whData.forEach(item => {
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([wh, stock]) => {
-                        if (!whArea || getAreaFromStore(wh) === whArea) {
-                            if (!whStock[wh]) whStock[wh] = 0;
-                            whStock[wh] += stock || 0;
-                        }
-                    });
-                }
+            m.stores.forEach((wh, j) => {
+                if (!whArea || areas[j] === whArea) whStock[wh] = totals[j];
             });
 
             const whSelect = document.getElementById('whFilterWarehouse');
@@ -3350,14 +4744,12 @@ def generate_html(all_data, all_stores):
             const areas = new Set();
 
             // Collect unique areas from retail stores only
-            rtData.forEach(item => {
-                if (item.store_stock) {
-                    Object.keys(item.store_stock).forEach(store => {
-                        if (!isWarehouseLocation(store)) {
-                            const area = getAreaFromStore(store);
-                            if (area && area !== 'Warehouse') areas.add(area);
-                        }
-                    });
+            const m = stockMatrixOf(rtData);
+            const storeAreas = stockColumnAreas(m);
+            m.stores.forEach((store, j) => {
+                if (!isWarehouseLocation(store)) {
+                    const area = storeAreas[j];
+                    if (area && area !== 'Warehouse') areas.add(area);
                 }
             });
 
@@ -3384,16 +4776,11 @@ def generate_html(all_data, all_stores):
             const currentValue = storeSelect.value;
 
             // Collect retail stores only
+            const m = stockMatrixOf(rtData);
+            const totals = stockColumnTotals(m);
             const storeStock = {};
-            rtData.forEach(item => {
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, stock]) => {
-                        if (!isWarehouseLocation(store)) {
-                            if (!storeStock[store]) storeStock[store] = 0;
-                            storeStock[store] += stock || 0;
-                        }
-                    });
-                }
+            m.stores.forEach((store, j) => {
+                if (!isWarehouseLocation(store)) storeStock[store] = totals[j];
             });
 
             let stores = Object.entries(storeStock)
@@ -3432,17 +4819,22 @@ def generate_html(all_data, all_stores):
             return '<span class="stock-badge stock-medium">Normal</span>';
         }
 
-        function exportData() {
-            if (!filteredData.length) { alert('Tidak ada data'); return; }
+        function exportData(dataType) {
+            // Semua baris hasil filter (kolom sama dengan tabel) langsung dari stock query, tanpa render tabel
+            const query = dataType === 'retail' ? getRetailQuery() : getWarehouseQuery();
+            query.pageSize = 0;
+            query.tableRows = true;
+            const rows = runStockQuerySync(dataType, query).rows;
+            if (!rows.length) { alert('Tidak ada data'); return; }
             const headers = ['Kode Kecil', 'Gender', 'Series', 'Tipe', 'Nama Barang', 'Tier', 'Total Stock'];
-            const csv = [headers.join(','), ...filteredData.map(i => [
-                i.kode_kecil || '', i.gender || '', i.series || '', i.tipe || '', `"${(i.name || '').replace(/"/g, '""')}"`, i.tier || '', i.total
+            const csv = [headers.join(','), ...rows.map(i => [
+                i.kode_kecil || '', i.gender || '', i.series || '', i.tipe || '', `"${(i.name || '').replace(/"/g, '""')}"`, i.tier || '', i.stock
             ].join(','))].join('\\n');
 
             const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
             const link = document.createElement('a');
             link.href = URL.createObjectURL(blob);
-            link.download = `stock_${currentEntity}_${currentType}_${new Date().toISOString().split('T')[0]}.csv`;
+            link.download = `stock_${currentEntity}_${dataType}_${new Date().toISOString().split('T')[0]}.csv`;
             link.click();
         }
 
@@ -3451,9 +4843,9 @@ def generate_html(all_data, all_stores):
             // Get data based on dataType (retail or warehouse)
             let data;
             if (dataType === 'retail') {
-                data = rtFilteredData || [];
+                data = getFilteredStockRows('retail');
             } else if (dataType === 'warehouse') {
-                data = whFilteredData || [];
+                data = getFilteredStockRows('warehouse');
             } else {
                 data = getData();
             }
@@ -3463,31 +4855,38 @@ def generate_html(all_data, all_stores):
             let totalMinusItems = 0;
             let totalMinusPairs = 0;
 
-            data.forEach(item => {
+            const m = stockMatrixOf(data);
+            const width = m.width, values = m.values, present = m.present;
+            const areas = stockColumnAreas(m);
+            data.forEach((item, i) => {
                 // Check per-store stock minus (prioritas)
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([storeName, stock]) => {
-                        if (stock < 0) {
-                            if (!minusByLocation[storeName]) {
-                                minusByLocation[storeName] = {
-                                    area: getAreaFromStore(storeName),
-                                    articles: [],
-                                    totalPairs: 0
-                                };
-                            }
-                            const exists = minusByLocation[storeName].articles.some(a => a.sku === item.sku);
-                            if (!exists) {
-                                minusByLocation[storeName].articles.push({
-                                    sku: item.sku,
-                                    name: item.name || '-',
-                                    stock: stock
-                                });
-                                minusByLocation[storeName].totalPairs += Math.abs(stock);
-                                totalMinusItems++;
-                                totalMinusPairs += Math.abs(stock);
-                            }
+                if (width) {
+                    const base = i * width;
+                    for (let j = 0; j < width; j++) {
+                        const stock = values[base + j];
+                        if (stock >= 0 || !present[base + j]) continue;
+                        const storeName = m.stores[j];
+                        if (!minusByLocation[storeName]) {
+                            minusByLocation[storeName] = {
+                                area: areas[j],
+                                articles: [],
+                                skus: new Set(),
+                                totalPairs: 0
+                            };
                         }
-                    });
+                        const loc = minusByLocation[storeName];
+                        if (!loc.skus.has(item.sku)) {
+                            loc.skus.add(item.sku);
+                            loc.articles.push({
+                                sku: item.sku,
+                                name: item.name || '-',
+                                stock: stock
+                            });
+                            loc.totalPairs += Math.abs(stock);
+                            totalMinusItems++;
+                            totalMinusPairs += Math.abs(stock);
+                        }
+                    }
                 }
                 // Fallback: jika tidak ada store_stock, gunakan total
                 else if (item.total < 0) {
@@ -3696,23 +5095,20 @@ def generate_html(all_data, all_stores):
             msStoresByArea = {}; // Reset cache
             var retailData = entityData.retail;
 
-            for (var i = 0; i < retailData.length; i++) {
-                var item = retailData[i];
-                if (item.store_stock) {
-                    var storeNames = Object.keys(item.store_stock);
-                    for (var j = 0; j < storeNames.length; j++) {
-                        var store = storeNames[j];
-                        if (!store) continue;
-                        var storeLower = store.toLowerCase();
-                        if (storeLower.indexOf('warehouse') >= 0) continue;
-
-                        var area = getAreaFromStore(store);
-                        if (area) {
-                            areas[area] = true;
-                            if (!msStoresByArea[area]) msStoresByArea[area] = {};
-                            msStoresByArea[area][store] = true;
-                        }
-                    }
+            // Semua lokasi retail = kolom matrix store stock
+            var matrix = stockMatrixOf(retailData);
+            var storeAreas = stockColumnAreas(matrix);
+            for (var j = 0; j < matrix.width; j++) {
+                var store = matrix.stores[j];
+                if (!store) continue;
+                var storeLower = store.toLowerCase();
+                if (storeLower.indexOf('warehouse') >= 0) continue;
+
+                var area = storeAreas[j];
+                if (area) {
+                    areas[area] = true;
+                    if (!msStoresByArea[area]) msStoresByArea[area] = {};
+                    msStoresByArea[area][store] = true;
                 }
             }
 
@@ -3803,153 +5199,65 @@ def generate_html(all_data, all_stores):
         }
 
         function updateMaxStockAnalysis() {
+            cancelScheduled('maxStock');
             console.log('updateMaxStockAnalysis START');
             var isWarehouse = (currentMSType === 'warehouse');
 
             var locationData = {};
             var tierCounts = {};
+            var tierArticleCounts = {};  // {tier: jumlah artikel stock != 0}
             var totalActual = 0;
             var totalMax = 0;
-            filteredTierArticles = {};  // Reset articles
+            var scopeLocations = [];
+            var rollup = stockRollups.maxstock;
+            tierArticleScope = null;  // Reset articles
+
+            // Tambah tier satu lokasi ke tierCounts + jumlah artikelnya
+            function addLocationTiers(row) {
+                var tierKeys = Object.keys(row.tiers);
+                for (var t = 0; t < tierKeys.length; t++) {
+                    var tierKey = tierKeys[t];
+                    if (!tierCounts[tierKey]) tierCounts[tierKey] = 0;
+                    tierCounts[tierKey] = tierCounts[tierKey] + row.tiers[tierKey];
+                    tierArticleCounts[tierKey] = (tierArticleCounts[tierKey] || 0) + (row.articles[tierKey] || 0);
+                }
+                scopeLocations.push(row.name);
+            }
 
             if (isWarehouse) {
-                // WAREHOUSE: Track per individual warehouse AND per area
-                var whStock = {};      // {whName: stock}
-                var whTiers = {};      // {whName: {tier: stock}}
-                var whArticles = {};   // {whName: {tier: [articles]}}
-                var whEntityStock = {};  // {whName: {entity: stock}} - NEW: track per entity
-                var areaStock = { 'Bali': 0, 'Jakarta': 0, 'Jawa Timur': 0 };
-                var areaTiers = { 'Bali': {}, 'Jakarta': {}, 'Jawa Timur': {} };
-                var areaEntityStock = { 'Bali': {}, 'Jakarta': {}, 'Jawa Timur': {} };  // NEW: track per entity per area
+                // WAREHOUSE: per individual warehouse (rollup Python) AND per area
                 var maxStockArea = { 'Bali': 72000, 'Jakarta': 48000, 'Jawa Timur': 120000 };
                 var warehousesByArea = { 'Bali': [], 'Jakarta': [], 'Jawa Timur': [] };
 
                 // Get filter values
                 var filterArea = document.getElementById('msWHFilterArea').value;
-                var filterFillRate = document.getElementById('msWHFilterFillRate').value;
-
-                // Helper function to get area from warehouse name
-                function getWarehouseArea(whName) {
-                    if (!whName) return 'Jawa Timur';
-                    var whLower = whName.toLowerCase();
-                    if (storeAreaMap[whLower]) return storeAreaMap[whLower];
-                    if (whLower.indexOf('bali') >= 0 || whLower.indexOf('gatsu') >= 0) return 'Bali';
-                    if (whLower.indexOf('jakarta') >= 0 || whLower.indexOf('pluit') >= 0) return 'Jakarta';
-                    if (whLower.indexOf('pusat') >= 0) return 'Jawa Timur';
-                    return 'Jawa Timur';
-                }
-
-                var entities = ['DDD', 'LJBB', 'MBB', 'UBB'];
-                for (var i = 0; i < entities.length; i++) {
-                    var entity = entities[i];
-                    var entityData = allData[entity];
-                    if (!entityData || !entityData.warehouse) continue;
-
-                    var whData = entityData.warehouse;
-
-                    for (var j = 0; j < whData.length; j++) {
-                        var item = whData[j];
-                        var tier = item.tier || '';
-
-                        // Skip item tanpa tier valid (tier 0,1,2,3,4,5,8)
-                        if (!tier || tier === '-' || !['0','1','2','3','4','5','8'].includes(tier.toString())) continue;
-
-                        if (item.store_stock) {
-                            var whNames = Object.keys(item.store_stock);
-                            for (var w = 0; w < whNames.length; w++) {
-                                var whName = whNames[w];
-                                var stock = item.store_stock[whName];
-
-                                var area = getWarehouseArea(whName);
-
-                                // Skip if area filter active and doesn't match
-                                if (filterArea && area !== filterArea) continue;
-
-                                // Track per warehouse (include all values, positive and negative)
-                                if (!whStock[whName]) {
-                                    whStock[whName] = 0;
-                                    whTiers[whName] = {};
-                                    whArticles[whName] = {};
-                                    whEntityStock[whName] = {};
-                                }
-                                whStock[whName] = whStock[whName] + stock;
-
-                                // Track per entity per warehouse
-                                if (!whEntityStock[whName][entity]) whEntityStock[whName][entity] = 0;
-                                whEntityStock[whName][entity] = whEntityStock[whName][entity] + stock;
-
-                                if (!whTiers[whName][tier]) whTiers[whName][tier] = 0;
-                                whTiers[whName][tier] = whTiers[whName][tier] + stock;
-
-                                // Track per area
-                                areaStock[area] = areaStock[area] + stock;
-                                if (!areaTiers[area][tier]) areaTiers[area][tier] = 0;
-                                areaTiers[area][tier] = areaTiers[area][tier] + stock;
-
-                                // Track per entity per area
-                                if (!areaEntityStock[area][entity]) areaEntityStock[area][entity] = 0;
-                                areaEntityStock[area][entity] = areaEntityStock[area][entity] + stock;
-
-                                // Track articles (include negatif agar bisa di-investigate)
-                                if (stock !== 0) {
-                                    if (!whArticles[whName][tier]) whArticles[whName][tier] = [];
-                                    whArticles[whName][tier].push({
-                                        sku: item.sku,
-                                        nama: item.name || item.nama || item.sku,
-                                        size: item.size || '-',
-                                        stock: stock,
-                                        store: whName
-                                    });
-                                }
-                            }
-                        }
-                    }
-                }
 
-                // Build locationData per individual warehouse grouped by area
-                var whNamesList = Object.keys(whStock).sort();
-                for (var k = 0; k < whNamesList.length; k++) {
-                    var whName = whNamesList[k];
-                    var actual = whStock[whName] || 0;
+                var whRows = rollup.warehouse
+                    .filter(function(row) { return !filterArea || row.area === filterArea; })
+                    .sort(function(a, b) { return a.name < b.name ? -1 : (a.name > b.name ? 1 : 0); });
+                for (var k = 0; k < whRows.length; k++) {
+                    var row = whRows[k];
 
                     // SELALU kumpulkan tier counts dan articles (sebelum skip actual=0)
                     // Ini memastikan tier bisa diklik meski warehouse total 0
-                    var whTierData = whTiers[whName];
-                    var whArticleData = whArticles[whName];
-                    if (whTierData) {
-                        var tierKeys = Object.keys(whTierData);
-                        for (var t = 0; t < tierKeys.length; t++) {
-                            var tierKey = tierKeys[t];
-                            if (!tierCounts[tierKey]) tierCounts[tierKey] = 0;
-                            tierCounts[tierKey] = tierCounts[tierKey] + whTierData[tierKey];
-
-                            if (whArticleData && whArticleData[tierKey]) {
-                                if (!filteredTierArticles[tierKey]) filteredTierArticles[tierKey] = [];
-                                filteredTierArticles[tierKey] = filteredTierArticles[tierKey].concat(whArticleData[tierKey]);
-                            }
-                        }
-                    }
+                    addLocationTiers(row);
 
                     // Skip warehouse dengan total 0 dari locationData (tapi articles sudah dikumpulkan)
-                    if (actual === 0) continue;
+                    if (row.actual === 0) continue;
 
-                    var area = getWarehouseArea(whName);
-
-                    locationData[whName] = {
-                        name: whName,
-                        area: area,
-                        actual: actual,
+                    locationData[row.name] = {
+                        name: row.name,
+                        area: row.area,
+                        actual: row.actual,
                         max: 0,  // Individual WH doesn't have max
                         fillRate: 0,
-                        tiers: whTiers[whName],
-                        entityStock: whEntityStock[whName] || {},  // NEW: per entity breakdown
+                        tiers: row.tiers,
+                        entityStock: row.entities,  // per entity breakdown
                         isIndividual: true
                     };
 
                     // Track warehouses per area
-                    if (warehousesByArea[area].indexOf(whName) < 0) {
-                        warehousesByArea[area].push(whName);
-                    }
+                    warehousesByArea[row.area].push(row.name);
                 }
 
                 // Add area totals
@@ -3958,7 +5266,8 @@ def generate_html(all_data, all_stores):
                     var areaName = areaOrder[a];
                     if (filterArea && areaName !== filterArea) continue;
 
-                    var areaActual = areaStock[areaName] || 0;
+                    var areaRow = rollup.warehouse_area[areaName] || { actual: 0, tiers: {}, entities: {} };
+                    var areaActual = areaRow.actual;
                     var areaMax = maxStockArea[areaName] || 0;
                     var areaFillRate = areaMax > 0 ? (areaActual / areaMax * 100) : 0;
 
@@ -3969,8 +5278,8 @@ def generate_html(all_data, all_stores):
                             actual: areaActual,
                             max: areaMax,
                             fillRate: areaFillRate,
-                            tiers: areaTiers[areaName],
-                            entityStock: areaEntityStock[areaName] || {},  // NEW: per entity breakdown
+                            tiers: areaRow.tiers,
+                            entityStock: areaRow.entities,  // per entity breakdown
                             isAreaTotal: true,
                             warehouses: warehousesByArea[areaName]
                         };
@@ -3999,71 +5308,20 @@ def generate_html(all_data, all_stores):
                     return;
                 }
 
-                var retailData = entityData.retail;
-                var storeStock = {};
-                var storeTiers = {};
-                var storeArticles = {};  // {store: {tier: [{sku, nama, stock}]}}
-
                 // Get filter values first
                 var filterArea = document.getElementById('msFilterArea').value;
                 var filterStore = document.getElementById('msFilterStore').value;
                 var filterFillRate = document.getElementById('msFilterFillRate').value;
 
-                for (var m = 0; m < retailData.length; m++) {
-                    var item = retailData[m];
-                    var tier = item.tier || '';
-
-                    // Skip item tanpa tier valid (tier 0,1,2,3,4,5,8)
-                    if (!tier || tier === '-' || !['0','1','2','3','4','5','8'].includes(tier.toString())) continue;
-
-                    if (item.store_stock) {
-                        var storeNames = Object.keys(item.store_stock);
-                        for (var n = 0; n < storeNames.length; n++) {
-                            var store = storeNames[n];
-                            if (!store) continue;
-                            var storeLower = store.toLowerCase();
-                            if (storeLower.indexOf('warehouse') >= 0) continue;
-
-                            var stock = item.store_stock[store];
-
-                            if (!storeStock[store]) {
-                                storeStock[store] = 0;
-                                storeTiers[store] = {};
-                                storeArticles[store] = {};
-                            }
-                            storeStock[store] = storeStock[store] + stock;  // Include all stock (positive & negative)
-
-                            if (!storeTiers[store][tier]) {
-                                storeTiers[store][tier] = 0;
-                                storeArticles[store][tier] = [];
-                            }
-                            storeTiers[store][tier] = storeTiers[store][tier] + stock;  // Include semua untuk tier count
-
-                            // Track article detail (include negatif agar bisa di-investigate)
-                            if (stock !== 0) {
-                                storeArticles[store][tier].push({
-                                    sku: item.sku,
-                                    nama: item.name || item.nama || item.sku,
-                                    size: item.size || '-',
-                                    stock: stock,
-                                    store: store
-                                });
-                            }
-                        }
-                    }
-                }
-
-                // Build locationData with filters AND calculate tierCounts from filtered data
-                var allStoreNames = Object.keys(storeStock);
-                for (var p = 0; p < allStoreNames.length; p++) {
-                    var storeName = allStoreNames[p];
-                    var actual = storeStock[storeName];
-                    var max = getMaxStockForStore(storeName);
-                    var fillRate = (max > 0) ? (actual / max * 100) : 0;
-                    var area = getAreaFromStore(storeName);
+                // Stock, max dan fill rate per store sudah dihitung di Python (stockRollups.maxstock)
+                var storeRows = rollup.retail[currentEntity] || [];
+                for (var p = 0; p < storeRows.length; p++) {
+                    var row = storeRows[p];
+                    var storeName = row.name;
+                    var fillRate = row.fill;
 
                     // Apply filters
-                    if (filterArea && area !== filterArea) continue;
+                    if (filterArea && row.area !== filterArea) continue;
                     if (filterStore && storeName !== filterStore) continue;
                     if (filterFillRate) {
                         if (filterFillRate === 'over' && fillRate <= 100) continue;
@@ -4074,36 +5332,24 @@ def generate_html(all_data, all_stores):
 
                     locationData[storeName] = {
                         name: storeName,
-                        area: area,
-                        actual: actual,
-                        max: max,
+                        area: row.area,
+                        actual: row.actual,
+                        max: row.max,
                         fillRate: fillRate,
-                        tiers: storeTiers[storeName]
+                        tiers: row.tiers
                     };
 
                     // Add tier counts and articles from filtered stores only
-                    var storeTierData = storeTiers[storeName];
-                    var storeArticleData = storeArticles[storeName];
-                    if (storeTierData) {
-                        var tierKeys = Object.keys(storeTierData);
-                        for (var t = 0; t < tierKeys.length; t++) {
-                            var tierKey = tierKeys[t];
-                            if (!tierCounts[tierKey]) tierCounts[tierKey] = 0;
-                            tierCounts[tierKey] = tierCounts[tierKey] + storeTierData[tierKey];
-
-                            // Collect articles for this tier
-                            if (storeArticleData && storeArticleData[tierKey]) {
-                                if (!filteredTierArticles[tierKey]) filteredTierArticles[tierKey] = [];
-                                filteredTierArticles[tierKey] = filteredTierArticles[tierKey].concat(storeArticleData[tierKey]);
-                            }
-                        }
-                    }
+                    addLocationTiers(row);
 
-                    totalActual = totalActual + actual;
-                    totalMax = totalMax + max;
+                    totalActual = totalActual + row.actual;
+                    totalMax = totalMax + row.max;
                 }
             }
 
+            // Daftar artikel per tier baru dibangun saat tier diklik (collectTierArticles)
+            tierArticleScope = { isWarehouse: isWarehouse, entity: currentEntity, locations: scopeLocations };
+
             var overallFillRate = (totalMax > 0) ? (totalActual / totalMax * 100) : 0;
             var remaining = totalMax - totalActual;
 
@@ -4117,7 +5363,7 @@ def generate_html(all_data, all_stores):
             updateFillRateChart(locationData);
             updateTierDistChart(tierCounts);
             renderStoreAnalysisList(locationData);
-            renderTierBreakdown(tierCounts, filteredTierArticles);
+            renderTierBreakdown(tierCounts, tierArticleCounts);
 
             console.log('updateMaxStockAnalysis DONE - Actual:', totalActual, 'Max:', totalMax);
         }
@@ -4402,7 +5648,7 @@ def generate_html(all_data, all_stores):
             }
         }
 
-        function renderTierBreakdown(tierCounts, tierArticles) {
+        function renderTierBreakdown(tierCounts, tierArticles) {  // tierArticles: {tier: jumlah artikel}
             const total = Object.values(tierCounts).reduce((a, b) => a + b, 0);
             const tiers = Object.keys(tierCounts).sort();
 
@@ -4412,7 +5658,7 @@ def generate_html(all_data, all_stores):
                 // Skip tiers with stock = 0 only, tampilkan negatif agar bisa di-investigate
                 if (count === 0) return;
                 const percent = total > 0 ? (count / total * 100) : 0;
-                const hasArticles = tierArticles && tierArticles[tier] && tierArticles[tier].length > 0;
+                const hasArticles = tierArticles && tierArticles[tier] > 0;
                 html += `
                     <div class="tier-item ${hasArticles ? 'clickable' : ''}" ${hasArticles ? 'onclick="showTierArticles(\\'' + tier + '\\')"' : ''} style="${hasArticles ? 'cursor:pointer;' : ''}">
                         <div class="tier-label">TIER ${tier}</div>
@@ -4435,8 +5681,50 @@ def generate_html(all_data, all_stores):
             document.getElementById('tierBreakdown').innerHTML = html;
         }
 
+        // Artikel (stock != 0) satu tier di lokasi yang sedang tampil.
+        // Urutan dan reset per lokasi sama dengan build_max_stock_rollup di Python.
+        function collectTierArticles(tier) {
+            const scope = tierArticleScope;
+            if (!scope) return [];
+            const inScope = new Set(scope.locations);
+            const running = {}, runningTier = {}, byLocation = {};
+            const entities = scope.isWarehouse ? ['DDD', 'LJBB', 'MBB', 'UBB'] : [scope.entity];
+            const dataType = scope.isWarehouse ? 'warehouse' : 'retail';
+
+            entities.forEach(entity => {
+                const items = (allData[entity] || {})[dataType] || [];
+                items.forEach(item => {
+                    const itemTier = (item.tier || '').toString();
+                    if (!['0','1','2','3','4','5','8'].includes(itemTier) || !item.store_stock) return;
+                    Object.keys(item.store_stock).forEach(loc => {
+                        if (!inScope.has(loc)) return;
+                        const stock = item.store_stock[loc];
+                        if (!running[loc]) {
+                            running[loc] = 0;
+                            runningTier[loc] = {};
+                            byLocation[loc] = [];
+                        }
+                        running[loc] += stock;
+                        if (!scope.isWarehouse && !runningTier[loc][itemTier] && itemTier === tier) byLocation[loc] = [];
+                        runningTier[loc][itemTier] = (runningTier[loc][itemTier] || 0) + stock;
+                        if (itemTier === tier && stock !== 0) {
+                            byLocation[loc].push({
+                                sku: item.sku,
+                                nama: item.name || item.nama || item.sku,
+                                size: item.size || '-',
+                                stock: stock,
+                                store: loc
+                            });
+                        }
+                    });
+                });
+            });
+
+            return scope.locations.reduce((all, loc) => all.concat(byLocation[loc] || []), []);
+        }
+
         function showTierArticles(tier) {
-            const articles = filteredTierArticles[tier] || [];
+            const articles = collectTierArticles(tier);
             if (articles.length === 0) {
                 alert('Tidak ada artikel untuk Tier ' + tier);
                 return;
@@ -4621,9 +5909,10 @@ def generate_html(all_data, all_stores):
         // ==================== STOCK CONTROL FUNCTIONS ====================
         let scItems = [];
         let scKodeKecilItems = [];
+        let scItemsSource = null;  // List allData yang dipakai build scItems terakhir (cache invalid jika berubah)
         let scFilteredItems = [];
         let scCurrentPage = 1;
-        const scItemsPerPage = 50;
+        let scVirtualTable = null;
         let scViewMode = 'sku'; // 'sku' or 'kodeKecil'
 
         // Build aggregated items by Kode Kecil (sum all sizes)
@@ -4652,7 +5941,8 @@ def generate_html(all_data, all_stores):
                         stokTokoLombok: 0,
                         globalStock: 0,
                         whTotal: 0,
-                        skuList: []
+                        skuList: [],
+                        sales: salesMonths.map(() => 0)
                     };
                 }
 
@@ -4669,29 +5959,39 @@ def generate_html(all_data, all_stores):
                 kodeKecilMap[kk].stokTokoSumatera += item.stokTokoSumatera || 0;
                 kodeKecilMap[kk].stokTokoLombok += item.stokTokoLombok || 0;
                 kodeKecilMap[kk].skuList.push(item.sku);
+                // Sales Kode Kecil = jumlah sales semua SKU-nya
+                item.sales.forEach((qty, m) => { kodeKecilMap[kk].sales[m] += qty; });
             });
 
             // Calculate totals
             Object.values(kodeKecilMap).forEach(item => {
                 item.whTotal = item.WHS + item.WHB + item.WHJ;
                 item.globalStock = item.whTotal + item.stokToko;
+                attachStockControlSales(item, item.sales);
             });
 
             return Object.values(kodeKecilMap);
         }
 
-        // Get aggregated sales for Kode Kecil (sum all SKU sales)
-        function getKodeKecilSales(skuList) {
-            let nov = 0, des = 0, jan = 0;
-            skuList.forEach(sku => {
-                const skuUpper = (sku || '').toUpperCase();
-                const s = salesMap[skuUpper] || {nov: 0, des: 0, jan: 0};
-                nov += s.nov;
-                des += s.des;
-                jan += s.jan;
-            });
-            const avg = (nov + des + jan) / 3;
-            return { nov, des, jan, avg };
+        // Sales per bulan salesMonths + avg dan TW/TO/TW+TO (tanpa filter area, dipakai sort) menempel di item Control Stock
+        function attachStockControlSales(item, sales) {
+            item.sales = sales;
+            item.avg = salesMonths.length ? sales.reduce((sum, qty) => sum + qty, 0) / salesMonths.length : 0;
+            item.tw = item.avg > 0 ? item.whTotal / item.avg : 999;
+            item.to = item.avg > 0 ? item.stokToko / item.avg : 999;
+            item.twto = item.avg > 0 ? item.globalStock / item.avg : 999;
+        }
+
+        // Header kolom sales per bulan (label dari salesMonths 'YYYY-MM'), sort key m0, m1, ...
+        function stockControlMonthHeaders(headerStyle) {
+            return salesMonths.map((month, m) =>
+                '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'m' + m + '\\')">' +
+                SALES_MONTH_LABELS[parseInt(month.slice(5)) - 1] + '</th>').join('');
+        }
+
+        // Jumlah kolom tabel Control Stock view Kode Kecil (view SKU +1 kolom SIZE)
+        function scColumnCount() {
+            return 15 + salesMonths.length;
         }
 
         // Switch view mode
@@ -4733,10 +6033,8 @@ def generate_html(all_data, all_stores):
                     '<th style="' + headerStyle + 'text-align:center;">SERIES</th>' +
                     '<th style="' + headerStyle + 'text-align:center;">GENDER</th>' +
                     '<th style="' + headerStyle + 'text-align:center;">TIER</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'nov\\')">NOV</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'des\\')">DES</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'jan\\')">JAN</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;background:#92400e;" onclick="sortStockControl(\\'avg\\')">AVG 3M</th>' +
+                    stockControlMonthHeaders(headerStyle) +
+                    '<th style="' + headerStyle + 'text-align:right;background:#92400e;" onclick="sortStockControl(\\'avg\\')">AVG ' + salesMonths.length + 'M</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#fbbf24;color:#78350f;">WH PUSAT</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#34d399;color:#064e3b;">WH BALI</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#60a5fa;color:#1e3a8a;">WH JKT</th>' +
@@ -4754,10 +6052,8 @@ def generate_html(all_data, all_stores):
                     '<th style="' + headerStyle + 'text-align:center;">SERIES</th>' +
                     '<th style="' + headerStyle + 'text-align:center;">GENDER</th>' +
                     '<th style="' + headerStyle + 'text-align:center;">TIER</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'nov\\')">NOV</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'des\\')">DES</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;" onclick="sortStockControl(\\'jan\\')">JAN</th>' +
-                    '<th style="' + headerStyle + 'text-align:right;background:#92400e;" onclick="sortStockControl(\\'avg\\')">AVG 3M</th>' +
+                    stockControlMonthHeaders(headerStyle) +
+                    '<th style="' + headerStyle + 'text-align:right;background:#92400e;" onclick="sortStockControl(\\'avg\\')">AVG ' + salesMonths.length + 'M</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#fbbf24;color:#78350f;">WH PUSAT</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#34d399;color:#064e3b;">WH BALI</th>' +
                     '<th style="' + headerStyle + 'text-align:right;background:#60a5fa;color:#1e3a8a;">WH JKT</th>' +
@@ -4771,18 +6067,43 @@ def generate_html(all_data, all_stores):
             }
         }
 
+        // Kolom matrix retail -> field stok toko per area di item Control Stock ('' = hanya masuk stokToko)
+        function getRetailAreaFields(m) {
+            const areas = stockColumnAreas(m);
+            return m.stores.map((store, j) => {
+                const area = areas[j];
+                const s = store.toLowerCase();
+                if (area === 'Bali') return 'stokTokoBali';
+                if (area === 'Jakarta') return 'stokTokoJakarta';
+                if (area === 'Jawa Timur') return 'stokTokoJatim';
+                if (s.includes('batam')) return 'stokTokoBatam';
+                if (s.includes('manado')) return 'stokTokoSulawesi';
+                if (s.includes('ska') || s.includes('pekanbaru')) return 'stokTokoSumatera';
+                if (s.includes('lombok') || s.includes('mataram')) return 'stokTokoLombok';
+                return '';
+            });
+        }
+
+        // Kolom matrix warehouse -> WHS/WHB/WHJ ('' = tidak dihitung)
+        function getWarehouseFields(m) {
+            return m.stores.map(wh => {
+                const w = wh.toLowerCase();
+                if (w.includes('pusat')) return 'WHS';
+                if (w.includes('bali') || w.includes('gatsu')) return 'WHB';
+                if (w.includes('jakarta') || w.includes('pluit')) return 'WHJ';
+                return '';
+            });
+        }
+
         function buildSkuItems() {
             const skuMap = {};
             const retailData = allData.DDD?.retail || [];
             // Warehouse data dari DDD dan LJBB saja
             const whDataDDD = allData.DDD?.warehouse || [];
             const whDataLJBB = allData.LJBB?.warehouse || [];
-            const whData = [...whDataDDD, ...whDataLJBB];
 
-            // Process retail data
-            retailData.forEach(item => {
+            function getSkuEntry(item) {
                 const sku = item.sku;
-                if (!sku) return;
                 if (!skuMap[sku]) {
                     skuMap[sku] = {
                         sku: sku,
@@ -4805,89 +6126,79 @@ def generate_html(all_data, all_stores):
                         whTotal: 0
                     };
                 }
-                // Sum retail stock by area
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([store, stock]) => {
-                        const area = getAreaFromStore(store);
-                        const s = store.toLowerCase();
-                        skuMap[sku].stokToko += stock;
-                        if (area === 'Bali') skuMap[sku].stokTokoBali += stock;
-                        else if (area === 'Jakarta') skuMap[sku].stokTokoJakarta += stock;
-                        else if (area === 'Jawa Timur') skuMap[sku].stokTokoJatim += stock;
-                        else {
-                            if (s.includes('batam')) skuMap[sku].stokTokoBatam += stock;
-                            else if (s.includes('manado')) skuMap[sku].stokTokoSulawesi += stock;
-                            else if (s.includes('ska') || s.includes('pekanbaru')) skuMap[sku].stokTokoSumatera += stock;
-                            else if (s.includes('lombok') || s.includes('mataram')) skuMap[sku].stokTokoLombok += stock;
-                        }
-                    });
+                return skuMap[sku];
+            }
+
+            // Process retail data: stok toko total + per area, per kolom matrix
+            const rm = stockMatrixOf(retailData);
+            const retailFields = getRetailAreaFields(rm);
+            retailData.forEach((item, i) => {
+                if (!item.sku) return;
+                const entry = getSkuEntry(item);
+                const base = i * rm.width;
+                for (let j = 0; j < rm.width; j++) {
+                    const stock = rm.values[base + j];
+                    if (!stock) continue;
+                    entry.stokToko += stock;
+                    if (retailFields[j]) entry[retailFields[j]] += stock;
                 }
             });
 
-            // Process warehouse data
-            whData.forEach(item => {
-                const sku = item.sku;
-                if (!sku) return;
-                if (!skuMap[sku]) {
-                    skuMap[sku] = {
-                        sku: sku,
-                        kodeKecil: item.kode_kecil,
-                        name: item.name,
-                        size: item.size || '',
-                        series: item.series,
-                        gender: item.gender,
-                        tier: item.tier,
-                        WHS: 0, WHB: 0, WHJ: 0,
-                        stokToko: 0,
-                        stokTokoBali: 0,
-                        stokTokoJakarta: 0,
-                        stokTokoJatim: 0,
-                        stokTokoBatam: 0,
-                        stokTokoSulawesi: 0,
-                        stokTokoSumatera: 0,
-                        stokTokoLombok: 0,
-                        globalStock: 0,
-                        whTotal: 0
-                    };
-                }
-                // Sum warehouse stock
-                if (item.store_stock) {
-                    Object.entries(item.store_stock).forEach(([wh, stock]) => {
-                        const w = wh.toLowerCase();
-                        if (w.includes('pusat')) skuMap[sku].WHS += stock;
-                        else if (w.includes('bali') || w.includes('gatsu')) skuMap[sku].WHB += stock;
-                        else if (w.includes('jakarta') || w.includes('pluit')) skuMap[sku].WHJ += stock;
-                    });
-                }
+            // Process warehouse data (per list, masing-masing punya matrix sendiri)
+            [whDataDDD, whDataLJBB].forEach(whData => {
+                const wm = stockMatrixOf(whData);
+                const whFields = getWarehouseFields(wm);
+                whData.forEach((item, i) => {
+                    if (!item.sku) return;
+                    const entry = getSkuEntry(item);
+                    const base = i * wm.width;
+                    for (let j = 0; j < wm.width; j++) {
+                        const stock = wm.values[base + j];
+                        if (stock && whFields[j]) entry[whFields[j]] += stock;
+                    }
+                });
             });
 
             // Calculate totals
             Object.values(skuMap).forEach(item => {
                 item.whTotal = item.WHS + item.WHB + item.WHJ;
                 item.globalStock = item.whTotal + item.stokToko;
+                const sales = salesMap[(item.sku || '').toUpperCase()] || salesMonths.map(() => 0);
+                attachStockControlSales(item, sales);
             });
 
             return Object.values(skuMap);
         }
 
         function initStockControl() {
-            scItems = buildSkuItems();
-            scKodeKecilItems = buildKodeKecilItems();
-            // Populate series filter
-            const seriesSet = new Set();
-            scItems.forEach(item => { if (item.series) seriesSet.add(item.series); });
-            const seriesSelect = document.getElementById('scFilterSeries');
-            if (seriesSelect) {
-                seriesSelect.innerHTML = '<option value="">Semua</option>';
-                [...seriesSet].sort().forEach(s => {
-                    seriesSelect.innerHTML += '<option value="' + s + '">' + s + '</option>';
-                });
+            // Item SKU & Kode Kecil (sudah termasuk sales & TW/TO) dibangun sekali per data sumber
+            const source = [allData.DDD?.retail, allData.DDD?.warehouse, allData.LJBB?.warehouse];
+            if (!scItemsSource || source.some((list, k) => list !== scItemsSource[k])) {
+                scItems = buildSkuItems();
+                scKodeKecilItems = buildKodeKecilItems();
+                scItemsSource = source;
+                // Populate series filter
+                const seriesSet = new Set();
+                scItems.forEach(item => { if (item.series) seriesSet.add(item.series); });
+                const seriesSelect = document.getElementById('scFilterSeries');
+                if (seriesSelect) {
+                    seriesSelect.innerHTML = '<option value="">Semua</option>';
+                    [...seriesSet].sort().forEach(s => {
+                        seriesSelect.innerHTML += '<option value="' + s + '">' + s + '</option>';
+                    });
+                }
             }
             renderStockControlHeader();
             renderStockControlTable();
         }
 
+        function setScCell(cell, style, text) {
+            cell.style.cssText = style;
+            cell.textContent = text;
+        }
+
         function renderStockControlTable() {
+            cancelScheduled('stockControl');
             // Render header based on view mode
             renderStockControlHeader();
 
@@ -4899,26 +6210,6 @@ def generate_html(all_data, all_stores):
             const toFilter = document.getElementById('scFilterTO')?.value || '';
             const search = (document.getElementById('scSearch')?.value || '').toLowerCase();
 
-            // Use salesMap directly (loaded from salesss.csv)
-            // salesMap format: {SKU: {nov, des, jan}}
-
-            // Helper function to get sales for SKU
-            function getSales(sku) {
-                const skuUpper = (sku || '').toUpperCase();
-                const s = salesMap[skuUpper] || {nov: 0, des: 0, jan: 0};
-                const avg = (s.nov + s.des + s.jan) / 3;
-                return { nov: s.nov, des: s.des, jan: s.jan, avg: avg };
-            }
-
-            // Helper function to get sales for item (handles both modes)
-            function getItemSales(item) {
-                if (scViewMode === 'kodeKecil') {
-                    return getKodeKecilSales(item.skuList || []);
-                } else {
-                    return getSales(item.sku);
-                }
-            }
-
             // Choose source data based on view mode
             const sourceItems = scViewMode === 'kodeKecil' ? scKodeKecilItems : scItems;
 
@@ -4952,9 +6243,8 @@ def generate_html(all_data, all_stores):
 
                 // TW filter (warehouse turnover)
                 if (twFilter) {
-                    const sales = getItemSales(item);
                     const whStock = area === 'Bali' ? item.WHB : (area === 'Jakarta' ? item.WHJ : (area === 'Jawa Timur' ? item.WHS : item.whTotal));
-                    const tw = sales.avg > 0 ? (whStock / sales.avg) : 999;
+                    const tw = item.avg > 0 ? (whStock / item.avg) : 999;
                     if (twFilter === 'critical' && tw >= 2) return false;
                     if (twFilter === 'low' && (tw < 2 || tw >= 4)) return false;
                     if (twFilter === 'normal' && (tw < 4 || tw >= 8)) return false;
@@ -4970,12 +6260,15 @@ def generate_html(all_data, all_stores):
                 }
                 return true;
             });
+            // Urutan kolom yang dipilih tetap berlaku setelah filter/ganti view
+            if (scSortColumn) scFilteredItems.sort(compareStockControlItems);
 
-            // Pagination
-            const totalPages = Math.ceil(scFilteredItems.length / scItemsPerPage);
+            // Pagination (page size "Semua" = semua baris lewat tabel virtual)
+            const perPage = getTablePageSize('scPageSize') || scFilteredItems.length;
+            const totalPages = perPage ? Math.ceil(scFilteredItems.length / perPage) : 0;
             if (scCurrentPage > totalPages) scCurrentPage = 1;
-            const start = (scCurrentPage - 1) * scItemsPerPage;
-            const pageData = scFilteredItems.slice(start, start + scItemsPerPage);
+            const start = (scCurrentPage - 1) * perPage;
+            const pageData = perPage < scFilteredItems.length ? scFilteredItems.slice(start, start + perPage) : scFilteredItems;
 
             // Update summary cards
             let totalWHS = 0, totalWHB = 0, totalWHJ = 0, totalToko = 0;
@@ -5000,10 +6293,20 @@ def generate_html(all_data, all_stores):
             // Render table
             const tbody = document.getElementById('scTableBody');
             if (!tbody) return;
+            if (!scVirtualTable) {
+                scVirtualTable = createVirtualTable({
+                    scroller: document.getElementById('scTableWrapper'),
+                    tbody: tbody,
+                    rowHeight: 36,
+                    columns: scColumnCount(),
+                    renderRow: null
+                });
+            }
 
-            tbody.innerHTML = pageData.map(item => {
-                const sales = getItemSales(item);
-                let nov = sales.nov, des = sales.des, jan = sales.jan, avgSales = sales.avg;
+            // View SKU punya kolom SIZE setelah kode, kolom lain bergeser satu
+            const offset = scViewMode === 'sku' ? 1 : 0;
+            scVirtualTable.renderRow = (cells, item) => {
+                const sales = item.sales, avgSales = item.avg;
                 let whStock, tokoStock, globalStock;
 
                 if (!area) {
@@ -5080,57 +6383,39 @@ def generate_html(all_data, all_stores):
                     whPusat = item.WHS.toLocaleString();
                 }
 
-                // Different row structure based on view mode
-                if (scViewMode === 'kodeKecil') {
-                    return '<tr style="border-bottom:1px solid #f3f4f6;color:#1f2937;">' +
-                        '<td style="padding:8px;font-family:monospace;font-weight:600;color:#1f2937;">' + (item.kodeKecil||'-') + '</td>' +
-                        '<td style="padding:8px;font-size:0.75rem;max-width:180px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;color:#4b5563;" title="' + (item.name||'') + '">' + (item.name||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;">' + (item.series||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;">' + (item.gender||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;color:#6b7280;">' + (item.tier||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + nov.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + des.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + jan.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#fef3c7;font-weight:600;color:#92400e;">' + avgSales.toFixed(1) + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whPusat + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whBali + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whJkt + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#dbeafe;font-weight:600;color:#1e3a8a;">' + whStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#dcfce7;font-weight:600;color:#166534;">' + tokoStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#f3e8ff;font-weight:600;color:#7c3aed;">' + globalStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:600;background:' + twBg + ';color:' + twColor + ';">' + tw + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:600;background:' + toBg + ';color:' + toColor + ';">' + to + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:700;background:' + twtoBg + ';color:' + twtoColor + ';">' + twto + '</td>' +
-                    '</tr>';
+                if (offset) {
+                    setScCell(cells[0], 'padding:8px;font-family:monospace;font-weight:600;color:#1f2937;', item.sku);
+                    setScCell(cells[1], 'padding:8px;text-align:center;font-weight:500;color:#6366f1;', item.size || '-');
                 } else {
-                    return '<tr style="border-bottom:1px solid #f3f4f6;color:#1f2937;">' +
-                        '<td style="padding:8px;font-family:monospace;font-weight:600;color:#1f2937;">' + item.sku + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:500;color:#6366f1;">' + (item.size||'-') + '</td>' +
-                        '<td style="padding:8px;font-size:0.75rem;max-width:180px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;color:#4b5563;" title="' + (item.name||'') + '">' + (item.name||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;">' + (item.series||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;">' + (item.gender||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:center;color:#6b7280;">' + (item.tier||'-') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + nov.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + des.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + jan.toLocaleString('id-ID') + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#fef3c7;font-weight:600;color:#92400e;">' + avgSales.toFixed(1) + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whPusat + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whBali + '</td>' +
-                        '<td style="padding:8px;text-align:right;color:#374151;">' + whJkt + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#dbeafe;font-weight:600;color:#1e3a8a;">' + whStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#dcfce7;font-weight:600;color:#166534;">' + tokoStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:right;background:#f3e8ff;font-weight:600;color:#7c3aed;">' + globalStock.toLocaleString() + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:600;background:' + twBg + ';color:' + twColor + ';">' + tw + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:600;background:' + toBg + ';color:' + toColor + ';">' + to + '</td>' +
-                        '<td style="padding:8px;text-align:center;font-weight:700;background:' + twtoBg + ';color:' + twtoColor + ';">' + twto + '</td>' +
-                    '</tr>';
+                    setScCell(cells[0], 'padding:8px;font-family:monospace;font-weight:600;color:#1f2937;', item.kodeKecil || '-');
                 }
-            }).join('');
+                const nameCell = cells[1 + offset];
+                setScCell(nameCell, 'padding:8px;font-size:0.75rem;max-width:180px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;color:#4b5563;', item.name || '-');
+                nameCell.title = item.name || '';
+                setScCell(cells[2 + offset], 'padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;', item.series || '-');
+                setScCell(cells[3 + offset], 'padding:8px;text-align:center;font-size:0.75rem;color:#6b7280;', item.gender || '-');
+                setScCell(cells[4 + offset], 'padding:8px;text-align:center;color:#6b7280;', item.tier || '-');
+                sales.forEach((qty, m) => {
+                    setScCell(cells[5 + offset + m], 'padding:8px;text-align:right;color:#374151;', qty.toLocaleString('id-ID'));
+                });
+                const col = 5 + offset + salesMonths.length;  // kolom setelah sales per bulan
+                setScCell(cells[col], 'padding:8px;text-align:right;background:#fef3c7;font-weight:600;color:#92400e;', avgSales.toFixed(1));
+                setScCell(cells[col + 1], 'padding:8px;text-align:right;color:#374151;', whPusat);
+                setScCell(cells[col + 2], 'padding:8px;text-align:right;color:#374151;', whBali);
+                setScCell(cells[col + 3], 'padding:8px;text-align:right;color:#374151;', whJkt);
+                setScCell(cells[col + 4], 'padding:8px;text-align:right;background:#dbeafe;font-weight:600;color:#1e3a8a;', whStock.toLocaleString());
+                setScCell(cells[col + 5], 'padding:8px;text-align:right;background:#dcfce7;font-weight:600;color:#166534;', tokoStock.toLocaleString());
+                setScCell(cells[col + 6], 'padding:8px;text-align:right;background:#f3e8ff;font-weight:600;color:#7c3aed;', globalStock.toLocaleString());
+                setScCell(cells[col + 7], 'padding:8px;text-align:center;font-weight:600;background:' + twBg + ';color:' + twColor + ';', tw);
+                setScCell(cells[col + 8], 'padding:8px;text-align:center;font-weight:600;background:' + toBg + ';color:' + toColor + ';', to);
+                setScCell(cells[col + 9], 'padding:8px;text-align:center;font-weight:700;background:' + twtoBg + ';color:' + twtoColor + ';', twto);
+            };
+            setVirtualTableRows(scVirtualTable, pageData, '', scColumnCount() + offset);
 
             // Page info (different label based on view mode)
             const itemLabel = scViewMode === 'kodeKecil' ? 'Artikel' : 'SKUs';
             document.getElementById('scPageInfo').textContent =
-                'Showing ' + (start + 1) + '-' + Math.min(start + scItemsPerPage, scFilteredItems.length) +
+                'Showing ' + (start + 1) + '-' + Math.min(start + perPage, scFilteredItems.length) +
                 ' of ' + scFilteredItems.length + ' ' + itemLabel;
 
             // Pagination
@@ -5168,6 +6453,37 @@ def generate_html(all_data, all_stores):
         let scSortColumn = '';
         let scSortAsc = true;
 
+        // Comparator kolom Control Stock; sales & TW/TO sudah menempel di item (attachStockControlSales)
+        function compareStockControlItems(a, b) {
+            let valA, valB;
+            switch(scSortColumn) {
+                case 'sku': valA = a.sku || ''; valB = b.sku || ''; break;
+                case 'kodeKecil': valA = a.kodeKecil || ''; valB = b.kodeKecil || ''; break;
+                case 'size': valA = parseInt(a.size) || 0; valB = parseInt(b.size) || 0; break;
+                case 'avg': valA = a.avg; valB = b.avg; break;
+                case 'whTotal': valA = a.whTotal; valB = b.whTotal; break;
+                case 'stokToko': valA = a.stokToko; valB = b.stokToko; break;
+                case 'global': valA = a.globalStock; valB = b.globalStock; break;
+                case 'tw': valA = a.tw; valB = b.tw; break;
+                case 'to': valA = a.to; valB = b.to; break;
+                case 'twto': valA = a.twto; valB = b.twto; break;
+                default:
+                    if (/^m\\d+$/.test(scSortColumn)) {
+                        // Sales bulan ke-n dari salesMonths (m0 = terlama)
+                        const m = parseInt(scSortColumn.slice(1));
+                        valA = a.sales[m]; valB = b.sales[m];
+                    } else {
+                        valA = scViewMode === 'kodeKecil' ? (a.kodeKecil || '') : (a.sku || '');
+                        valB = scViewMode === 'kodeKecil' ? (b.kodeKecil || '') : (b.sku || '');
+                    }
+            }
+
+            if (typeof valA === 'string') {
+                return scSortAsc ? valA.localeCompare(valB) : valB.localeCompare(valA);
+            }
+            return scSortAsc ? valA - valB : valB - valA;
+        }
+
         function sortStockControl(column) {
             if (scSortColumn === column) {
                 scSortAsc = !scSortAsc;
@@ -5176,51 +6492,6 @@ def generate_html(all_data, all_stores):
                 scSortAsc = true;
             }
 
-            // Helper to get sales based on view mode
-            function getSortSales(item) {
-                if (scViewMode === 'kodeKecil') {
-                    return getKodeKecilSales(item.skuList || []);
-                } else {
-                    const skuUpper = (item.sku || '').toUpperCase();
-                    return salesMap[skuUpper] || {nov: 0, des: 0, jan: 0, avg: 0};
-                }
-            }
-
-            scFilteredItems.sort((a, b) => {
-                let valA, valB;
-                const salesA = getSortSales(a);
-                const salesB = getSortSales(b);
-                const avgA = salesA.avg !== undefined ? salesA.avg : (salesA.nov + salesA.des + salesA.jan) / 3;
-                const avgB = salesB.avg !== undefined ? salesB.avg : (salesB.nov + salesB.des + salesB.jan) / 3;
-
-                switch(column) {
-                    case 'sku': valA = a.sku || ''; valB = b.sku || ''; break;
-                    case 'kodeKecil': valA = a.kodeKecil || ''; valB = b.kodeKecil || ''; break;
-                    case 'size': valA = parseInt(a.size) || 0; valB = parseInt(b.size) || 0; break;
-                    case 'nov': valA = salesA.nov; valB = salesB.nov; break;
-                    case 'des': valA = salesA.des; valB = salesB.des; break;
-                    case 'jan': valA = salesA.jan; valB = salesB.jan; break;
-                    case 'avg': valA = avgA; valB = avgB; break;
-                    case 'whTotal': valA = a.whTotal; valB = b.whTotal; break;
-                    case 'stokToko': valA = a.stokToko; valB = b.stokToko; break;
-                    case 'global': valA = a.globalStock; valB = b.globalStock; break;
-                    case 'tw': valA = avgA > 0 ? a.whTotal / avgA : 999; valB = avgB > 0 ? b.whTotal / avgB : 999; break;
-                    case 'to': valA = avgA > 0 ? a.stokToko / avgA : 999; valB = avgB > 0 ? b.stokToko / avgB : 999; break;
-                    case 'twto':
-                        valA = avgA > 0 ? a.globalStock / avgA : 999;
-                        valB = avgB > 0 ? b.globalStock / avgB : 999;
-                        break;
-                    default:
-                        valA = scViewMode === 'kodeKecil' ? (a.kodeKecil || '') : (a.sku || '');
-                        valB = scViewMode === 'kodeKecil' ? (b.kodeKecil || '') : (b.sku || '');
-                }
-
-                if (typeof valA === 'string') {
-                    return scSortAsc ? valA.localeCompare(valB) : valB.localeCompare(valA);
-                }
-                return scSortAsc ? valA - valB : valB - valA;
-            });
-
             scCurrentPage = 1;
             renderStockControlTable();
         }
@@ -5234,9 +6505,20 @@ def generate_html(all_data, all_stores):
         let currentSalesTab = 'performance';
         let filteredSalesData = [];
 
-        // Helper: Get area from store name with smart matching
+        // Helper: Get area from store name - lookup hasil resolve Python, matching hanya untuk nama baru
+        const storeAreaMemo = {};
         function getAreaFromStore(storeName) {
             if (!storeName) return 'Unknown';
+            const known = storeAreaLookup[storeName];
+            if (known !== undefined) return known;
+            if (storeAreaMemo[storeName] === undefined) {
+                storeAreaMemo[storeName] = matchAreaFromStore(storeName);
+            }
+            return storeAreaMemo[storeName];
+        }
+
+        // Smart matching (fallback untuk nama store yang tidak ada di storeAreaLookup)
+        function matchAreaFromStore(storeName) {
             const s = storeName.toLowerCase().trim();
 
             // 1. Try exact match in storeAreaMap
@@ -5321,8 +6603,137 @@ def generate_html(all_data, all_stores):
             return Math.ceil((days + firstDay.getDay() + 1) / 7);
         }
 
+        // ---- Sales detail shards (lazy load per bulan) ----
+        const salesShardRows = {};     // {month: rows} shard yang sudah di-load
+        const salesShardPending = {};  // {month: Promise} shard yang sedang di-fetch
+        const salesShardScripts = {};  // {month: resolve} shard .js (fallback file://) yang ditunggu
+
+        // ---- Sales cube: panel Sales dihitung dari agregat, raw transaksi hanya untuk tab Transaksi ----
+        let salesCubeCells = null;
+        let salesTransactionStale = true;
+
+        function getSalesCubeCells() {
+            if (salesCubeCells) return salesCubeCells;
+            const dims = salesCube.dims, c = salesCube.cells;
+            salesCubeCells = new Array(salesCube.n);
+            for (let i = 0; i < salesCube.n; i++) {
+                salesCubeCells[i] = {
+                    date: dims.date[c.d[i]], store: dims.store[c.s[i]], sku: dims.sku[c.k[i]],
+                    spg: dims.spg[c.p[i]], category: dims.category[c.c[i]],
+                    qty: c.qty[i], total: c.total[i], gross: c.gross[i], hpp: c.hpp[i],
+                    retur_qty: c.retur[i], disc_amt: c.disc[i],
+                    orders: c.orders[i],  // id order unik dalam cell
+                    hours: c.hours[i]     // flat [jam, total, qty, ...]
+                };
+            }
+            return salesCubeCells;
+        }
+
+        function addOrders(orderSet, cell) {
+            const orders = cell.orders;
+            for (let i = 0; i < orders.length; i++) orderSet.add(orders[i]);
+        }
+
+        function hasSalesDetail() {
+            return salesCube.n > 0;
+        }
+
+        // Shard yang overlap dengan rentang tanggal (kosong = semua)
+        function getSalesShardsInRange(startDate, endDate) {
+            if (!salesDetailManifest) return [];
+            return salesDetailManifest.shards.filter(shard =>
+                (!endDate || shard.min_date <= endDate) && (!startDate || shard.max_date >= startDate));
+        }
+
+        function isSalesRangeLoaded(startDate, endDate) {
+            return getSalesShardsInRange(startDate, endDate).every(shard => salesShardRows[shard.month]);
+        }
+
+        // Dipanggil oleh sales_detail/YYYY-MM.js: isi shard gzip dalam base64
+        function salesShardLoaded(month, data) {
+            if (salesShardScripts[month]) salesShardScripts[month](data);
+        }
+
+        async function gunzipJson(bytes) {
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return JSON.parse(await new Response(stream).text());
+        }
+
+        // Fallback tanpa fetch (file:// memblokir fetch): load shard .js lewat <script>
+        async function loadSalesShardScript(shard) {
+            if (typeof DecompressionStream === 'undefined') throw new Error('browser tidak mendukung DecompressionStream');
+            const data = await new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                salesShardScripts[shard.month] = resolve;
+                script.src = shard.script + '?v=' + shard.hash;
+                script.onload = () => script.remove();
+                script.onerror = () => {
+                    script.remove();
+                    reject(new Error('gagal memuat ' + shard.script));
+                };
+                document.head.appendChild(script);
+            }).finally(() => { delete salesShardScripts[shard.month]; });
+            const binary = atob(data);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            return gunzipJson(bytes);
+        }
+
+        async function fetchSalesShard(shard) {
+            if (location.protocol === 'file:') return loadSalesShardScript(shard);
+            try {
+                return await fetchSalesShardFile(shard);
+            } catch (err) {
+                console.warn('Fetch shard gagal, pakai ' + shard.script + ':', err);
+                return loadSalesShardScript(shard);
+            }
+        }
+
+        async function fetchSalesShardFile(shard) {
+            const version = '?v=' + shard.hash;
+            if (typeof DecompressionStream !== 'undefined') {
+                const resp = await fetch(shard.file + version);
+                if (!resp.ok) throw new Error('HTTP ' + resp.status + ' ' + shard.file);
+                const stream = resp.body.pipeThrough(new DecompressionStream('gzip'));
+                return JSON.parse(await new Response(stream).text());
+            }
+            // Shard tanpa gzip hanya ada jika di-generate dengan SALES_SHARD_PLAIN=1
+            if (!shard.plain) throw new Error('browser tidak mendukung DecompressionStream');
+            const resp = await fetch(shard.plain + version);
+            if (!resp.ok) throw new Error('HTTP ' + resp.status + ' ' + shard.plain);
+            return resp.json();
+        }
+
+        function loadSalesDetailRange(startDate, endDate) {
+            const missing = getSalesShardsInRange(startDate, endDate).filter(shard => !salesShardRows[shard.month]);
+            return Promise.all(missing.map(shard => {
+                if (!salesShardPending[shard.month]) {
+                    salesShardPending[shard.month] = fetchSalesShard(shard).then(rows => {
+                        salesShardRows[shard.month] = rows;
+                    }).finally(() => { delete salesShardPending[shard.month]; });
+                }
+                return salesShardPending[shard.month];
+            })).then(() => {
+                if (!missing.length) return;
+                // Susun ulang sesuai urutan bulan di manifest
+                let rows = [];
+                salesDetailManifest.shards.forEach(shard => {
+                    if (salesShardRows[shard.month]) rows = rows.concat(salesShardRows[shard.month]);
+                });
+                salesDetailData = rows;
+                skuSalesCache = null;
+            });
+        }
+
+        // Jalankan callback setelah seluruh shard ter-load (untuk pencarian SKU lintas periode)
+        function withAllSalesDetail(callback) {
+            if (isSalesRangeLoaded('', '')) return true;
+            loadSalesDetailRange('', '').then(callback).catch(err => console.error('Load sales detail error:', err));
+            return false;
+        }
+
         function initSalesFilters() {
-            if (!salesDetailData || salesDetailData.length === 0) return;
+            if (!hasSalesDetail()) return;
 
             // Get unique values
             const stores = new Set();
@@ -5331,17 +6742,15 @@ def generate_html(all_data, all_stores):
             const series = new Set();
             const dates = new Set();
 
-            salesDetailData.forEach(item => {
-                // Skip non-sandal items
-                if (!isSandalSKU(item.sku)) return;
-
-                if (item.store) stores.add(item.store);
-                if (item.category) categories.add(item.category);
-                if (item.date) dates.add(item.date);
+            salesCube.dims.store.forEach(store => {
+                if (!store) return;
+                stores.add(store);
                 // Get area using helper function
-                const area = getAreaFromStore(item.store);
+                const area = getAreaFromStore(store);
                 if (area && area !== 'Unknown') areas.add(area);
             });
+            salesCube.dims.category.forEach(cat => { if (cat) categories.add(cat); });
+            salesCube.dims.date.forEach(date => { if (date) dates.add(date); });
 
             // Get series from skuSeriesMap (from Master Produk via stock data)
             Object.values(skuSeriesMap).forEach(ser => {
@@ -5403,7 +6812,8 @@ def generate_html(all_data, all_stores):
             }
         }
 
-        function getFilteredSalesData() {
+        // Predicate filter Sales (dipakai untuk cell cube maupun raw transaksi)
+        function getSalesFilter() {
             const startDate = document.getElementById('salesFilterStartDate').value;
             const endDate = document.getElementById('salesFilterEndDate').value;
             const area = document.getElementById('salesFilterArea').value;
@@ -5411,7 +6821,7 @@ def generate_html(all_data, all_stores):
             const gender = document.getElementById('salesFilterGender').value;
             const series = document.getElementById('salesFilterSeries').value;
 
-            return salesDetailData.filter(item => {
+            return item => {
                 // Include ALL items (sandal + non-sandal) for sales calculation
                 if (!item.sku) return false;
 
@@ -5429,11 +6839,22 @@ def generate_html(all_data, all_stores):
                     if (itemArea.toLowerCase() !== area.toLowerCase()) return false;
                 }
                 return true;
-            });
+            };
+        }
+
+        // Cell cube yang lolos filter (untuk semua panel kecuali Transaksi)
+        function getFilteredSalesData() {
+            return getSalesCubeCells().filter(getSalesFilter());
+        }
+
+        // Raw transaksi yang lolos filter (hanya tab Transaksi, butuh shard ter-load)
+        function getFilteredSalesRows() {
+            return salesDetailData.filter(getSalesFilter());
         }
 
         function renderSalesDashboard() {
-            if (!salesDetailData || salesDetailData.length === 0) {
+            cancelScheduled('sales');
+            if (!hasSalesDetail()) {
                 document.getElementById('salesSummaryCards').innerHTML = '<div style="grid-column:1/-1;text-align:center;padding:40px;color:#6b7280;">Tidak ada data sales. Pastikan file sales_2026.csv tersedia.</div>';
                 return;
             }
@@ -5466,7 +6887,8 @@ def generate_html(all_data, all_stores):
             const totalRetur = data.reduce((sum, item) => sum + (item.retur_qty || 0), 0);
             const totalDiscount = data.reduce((sum, item) => sum + (item.disc_amt || 0), 0);
 
-            const uniqueOrders = new Set(data.map(item => item.order_no));
+            const uniqueOrders = new Set();
+            data.forEach(item => addOrders(uniqueOrders, item));
             const totalTransactions = uniqueOrders.size;
 
             const atv = totalTransactions > 0 ? totalSales / totalTransactions : 0;
@@ -5521,7 +6943,7 @@ def generate_html(all_data, all_stores):
                 if (!byStore[store]) byStore[store] = { sales: 0, qty: 0, trx: new Set() };
                 byStore[store].sales += item.total || 0;
                 byStore[store].qty += item.qty || 0;
-                byStore[store].trx.add(item.order_no);
+                addOrders(byStore[store].trx, item);
             });
 
             // Build target lookup map using simple string replace
@@ -5628,6 +7050,7 @@ def generate_html(all_data, all_stores):
         }
 
         function renderSalesAreaTrend() {
+            cancelScheduled('salesAreaTrend');
             var data = filteredSalesData;
             var weekFilterEl = document.getElementById('salesAreaWeekFilter');
             var weekFilter = weekFilterEl ? weekFilterEl.value : 'all';
@@ -5722,6 +7145,7 @@ def generate_html(all_data, all_stores):
         }
 
         function renderSalesTrend() {
+            cancelScheduled('salesTrend');
             const data = filteredSalesData;
 
             // Daily trend
@@ -5731,7 +7155,7 @@ def generate_html(all_data, all_stores):
                 if (!byDate[date]) byDate[date] = { sales: 0, qty: 0, trx: new Set() };
                 byDate[date].sales += item.total || 0;
                 byDate[date].qty += item.qty || 0;
-                byDate[date].trx.add(item.order_no);
+                addOrders(byDate[date].trx, item);
             });
 
             const dateArr = Object.entries(byDate).map(([date, val]) => ({
@@ -5754,10 +7178,13 @@ def generate_html(all_data, all_stores):
             const byHour = {};
             for (let h = 9; h <= 21; h++) byHour[h] = { sales: 0, qty: 0 };
             data.forEach(item => {
-                const hour = item.hour || 0;
-                if (byHour[hour] !== undefined) {
-                    byHour[hour].sales += item.total || 0;
-                    byHour[hour].qty += item.qty || 0;
+                const hours = item.hours;
+                for (let i = 0; i < hours.length; i += 3) {
+                    const hour = hours[i] || 0;
+                    if (byHour[hour] !== undefined) {
+                        byHour[hour].sales += hours[i + 1] || 0;
+                        byHour[hour].qty += hours[i + 2] || 0;
+                    }
                 }
             });
 
@@ -6161,7 +7588,7 @@ def generate_html(all_data, all_stores):
                 if (!byTier[tier]) byTier[tier] = { sales: 0, qty: 0, trx: new Set() };
                 byTier[tier].sales += item.total || 0;
                 byTier[tier].qty += item.qty || 0;
-                byTier[tier].trx.add(item.order_no);
+                addOrders(byTier[tier].trx, item);
             });
 
             // Ensure all tiers are shown even if no sales (including Tier 8)
@@ -6292,7 +7719,7 @@ def generate_html(all_data, all_stores):
                 if (!bySPG[spg]) bySPG[spg] = { sales: 0, qty: 0, trx: new Set(), stores: new Set() };
                 bySPG[spg].sales += item.total || 0;
                 bySPG[spg].qty += item.qty || 0;
-                bySPG[spg].trx.add(item.order_no);
+                addOrders(bySPG[spg].trx, item);
                 bySPG[spg].stores.add(store);
             });
 
@@ -6456,50 +7883,108 @@ def generate_html(all_data, all_stores):
             document.getElementById('salesGapAnalysis').innerHTML = gapHtml;
         }
 
+        let salesTransactionTable = null;
+        const SALES_TRANSACTION_CELL_STYLES = [
+            'padding:6px;',
+            'padding:6px;max-width:100px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;',
+            'padding:6px;max-width:100px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;',
+            'padding:6px;',
+            'padding:6px;',
+            'text-align:right;padding:6px;',
+            'text-align:right;padding:6px;',
+            'text-align:right;padding:6px;',
+            'text-align:right;padding:6px;',
+            'text-align:right;padding:6px;font-weight:600;color:#047857;'
+        ];
+
+        function fillSalesTransactionRow(cells, item) {
+            const values = [
+                item.date || '-',
+                item.store || '-',
+                item.spg || '-',
+                item.order_no || '-',
+                item.sku || '-',
+                item.qty || 0,
+                'Rp ' + (item.price || 0).toLocaleString('id-ID'),
+                'Rp ' + (item.total_before_tax || 0).toLocaleString('id-ID'),
+                'Rp ' + (item.tax_amount || 0).toLocaleString('id-ID'),
+                'Rp ' + (item.total || 0).toLocaleString('id-ID')
+            ];
+            for (let c = 0; c < values.length; c++) {
+                cells[c].style.cssText = SALES_TRANSACTION_CELL_STYLES[c];
+                cells[c].textContent = values[c];
+            }
+        }
+
         function renderSalesTransaction() {
-            const data = filteredSalesData;
+            // Raw transaksi hanya di-load saat tab Transaksi dibuka
+            if (currentSalesTab !== 'transaction') {
+                salesTransactionStale = true;
+                return;
+            }
+            salesTransactionStale = false;
+
+            const container = document.getElementById('salesRecentTransactions');
+            const rangeStart = document.getElementById('salesFilterStartDate').value;
+            const rangeEnd = document.getElementById('salesFilterEndDate').value;
+            if (!isSalesRangeLoaded(rangeStart, rangeEnd)) {
+                container.innerHTML = '<div style="text-align:center;padding:40px;color:#6b7280;">Memuat transaksi...</div>';
+                loadSalesDetailRange(rangeStart, rangeEnd).then(renderSalesTransaction).catch(err => {
+                    console.error('Load sales detail error:', err);
+                    container.innerHTML = '<div style="text-align:center;padding:40px;color:#ef4444;">Gagal memuat transaksi (' + err.message + '). Pastikan folder sales_detail/ ada di samping file HTML.</div>';
+                });
+                return;
+            }
+
+            const data = getFilteredSalesRows();
 
-            // Recent Transactions
+            // Recent Transactions: semua baris hasil filter, urut terbaru, di-scroll lewat tabel virtual
             const recentData = [...data].sort((a, b) => {
                 const dateA = a.date || '';
                 const dateB = b.date || '';
                 const dateCompare = dateB.localeCompare(dateA);
                 if (dateCompare !== 0) return dateCompare;
                 return (b.hour || 0) - (a.hour || 0);
-            }).slice(0, 500);
-
-            let recentHtml = '<table style="width:100%;border-collapse:collapse;font-size:0.75rem;">';
-            recentHtml += '<thead style="position:sticky;top:0;z-index:1;"><tr style="background:#f8fafc;">';
-            recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Tanggal</th>';
-            recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Toko</th>';
-            recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">SPG</th>';
-            recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Order</th>';
-            recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">SKU</th>';
-            recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Qty</th>';
-            recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Price</th>';
-            recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Total</th>';
-            recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Tax</th>';
-            recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;font-weight:700;">Sales</th>';
-            recentHtml += '</tr></thead><tbody>';
-            recentData.forEach(item => {
-                recentHtml += '<tr style="border-bottom:1px solid #e2e8f0;">';
-                recentHtml += '<td style="padding:6px;">' + (item.date || '-') + '</td>';
-                recentHtml += '<td style="padding:6px;max-width:100px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;">' + (item.store || '-') + '</td>';
-                recentHtml += '<td style="padding:6px;max-width:100px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;">' + (item.spg || '-') + '</td>';
-                recentHtml += '<td style="padding:6px;">' + (item.order_no || '-') + '</td>';
-                recentHtml += '<td style="padding:6px;">' + (item.sku || '-') + '</td>';
-                recentHtml += '<td style="text-align:right;padding:6px;">' + (item.qty || 0) + '</td>';
-                recentHtml += '<td style="text-align:right;padding:6px;">Rp ' + (item.price || 0).toLocaleString('id-ID') + '</td>';
-                recentHtml += '<td style="text-align:right;padding:6px;">Rp ' + (item.total_before_tax || 0).toLocaleString('id-ID') + '</td>';
-                recentHtml += '<td style="text-align:right;padding:6px;">Rp ' + (item.tax_amount || 0).toLocaleString('id-ID') + '</td>';
-                recentHtml += '<td style="text-align:right;padding:6px;font-weight:600;color:#047857;">Rp ' + (item.total || 0).toLocaleString('id-ID') + '</td>';
-                recentHtml += '</tr>';
             });
-            recentHtml += '</tbody></table>';
-            document.getElementById('salesRecentTransactions').innerHTML = recentHtml;
+
+            if (!salesTransactionTable || !salesTransactionTable.tbody.isConnected) {
+                let recentHtml = '<table style="width:100%;border-collapse:collapse;font-size:0.75rem;">';
+                recentHtml += '<thead style="position:sticky;top:0;z-index:1;"><tr style="background:#f8fafc;">';
+                recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Tanggal</th>';
+                recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Toko</th>';
+                recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">SPG</th>';
+                recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">Order</th>';
+                recentHtml += '<th style="text-align:left;padding:6px;color:#374151;background:#f8fafc;">SKU</th>';
+                recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Qty</th>';
+                recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Price</th>';
+                recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Total</th>';
+                recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;">Tax</th>';
+                recentHtml += '<th style="text-align:right;padding:6px;color:#374151;background:#f8fafc;font-weight:700;">Sales</th>';
+                recentHtml += '</tr></thead><tbody id="salesRecentBody"></tbody></table>';
+                container.innerHTML = recentHtml;
+                const tbody = document.getElementById('salesRecentBody');
+                if (salesTransactionTable) {
+                    // Container (dan listener scroll-nya) tetap, hanya tbody yang baru
+                    salesTransactionTable.tbody = tbody;
+                    salesTransactionTable.pool = [];
+                    salesTransactionTable.mounted = false;
+                } else {
+                    salesTransactionTable = createVirtualTable({
+                        scroller: container,
+                        tbody: tbody,
+                        rowHeight: 31,
+                        columns: 10,
+                        renderRow: fillSalesTransactionRow
+                    });
+                }
+            }
+            setVirtualTableRows(salesTransactionTable, recentData,
+                '<tr><td colspan="10" style="text-align:center;padding:40px;color:#9ca3af;">Tidak ada transaksi</td></tr>');
+            document.getElementById('salesRecentCount').textContent = '(' + recentData.length.toLocaleString('id-ID') + ' transaksi)';
         }
 
         function renderSalesGenderTrend() {
+            cancelScheduled('salesGenderTrend');
             var data = filteredSalesData;
             var weekFilterEl = document.getElementById('salesGenderWeekFilter');
             var weekFilter = weekFilterEl ? weekFilterEl.value : 'all';
@@ -6603,7 +8088,7 @@ def generate_html(all_data, all_stores):
                 if (!byGender[gender]) byGender[gender] = { sales: 0, qty: 0, trx: new Set() };
                 byGender[gender].sales += item.total || 0;
                 byGender[gender].qty += item.qty || 0;
-                byGender[gender].trx.add(item.order_no);
+                addOrders(byGender[gender].trx, item);
             });
 
             const genderColors = { Men: '#3b82f6', Ladies: '#ec4899', Kids: '#f59e0b', Girls: '#a855f7', Baby: '#10b981', Junior: '#06b6d4', Boys: '#8b5cf6', Unknown: '#6b7280' };
@@ -6759,10 +8244,11 @@ def generate_html(all_data, all_stores):
             });
             const tabContent = document.getElementById('salesTab' + tab.charAt(0).toUpperCase() + tab.slice(1));
             if (tabContent) tabContent.style.display = 'block';
+            if (tab === 'transaction' && salesTransactionStale) renderSalesTransaction();
         }
 
         function resetSalesFilters() {
-            const dates = salesDetailData.map(item => item.date).filter(d => d);
+            const dates = salesCube.dims.date.filter(d => d);
             const sortedDates = [...new Set(dates)].sort();
             document.getElementById('salesFilterStartDate').value = sortedDates[0] || '';
             document.getElementById('salesFilterEndDate').value = sortedDates[sortedDates.length - 1] || '';
@@ -6786,7 +8272,7 @@ def generate_html(all_data, all_stores):
                 const sku = item.sku;
                 if (!sku) return;
                 if (!skuSalesCache[sku]) {
-                    skuSalesCache[sku] = { qty: 0, total: 0, count: 0 };
+                    skuSalesCache[sku] = { qty: 0, total: 0, count: 0, name: item.product_name || '' };
                 }
                 skuSalesCache[sku].qty += item.qty || 0;
                 skuSalesCache[sku].total += item.total || 0;
@@ -6798,12 +8284,13 @@ def generate_html(all_data, all_stores):
         function handleSKUSearchKeyup(event) {
             // Handle Enter key - do full search
             if (event.key === 'Enter') {
+                cancelScheduled('skuSuggest');
                 searchSKUSales();
                 return;
             }
 
-            // Show live suggestions as user types
-            showLiveSuggestions();
+            // Show live suggestions setelah user berhenti mengetik
+            debounceInput('skuSuggest', showLiveSuggestions);
         }
 
         function showLiveSuggestions() {
@@ -6815,22 +8302,21 @@ def generate_html(all_data, all_stores):
                 return;
             }
 
+            if (!withAllSalesDetail(showLiveSuggestions)) return;
+
             // Build cache if not exists
             const cache = buildSKUSalesCache();
+            const query = searchTerm.toLowerCase();
 
-            // Find matching SKUs
+            // Find matching SKUs (via searchEngine)
             const matches = [];
             Object.keys(cache).forEach(sku => {
                 const article = sku.replace(/Z\\d{2,3}$/, '');
-                // Get name from articleNameMap or directly from salesDetailData
-                let name = articleNameMap[article] || '';
-                if (!name) {
-                    const saleItem = salesDetailData.find(d => d.sku === sku);
-                    if (saleItem && saleItem.product_name) name = saleItem.product_name;
-                }
-                if (sku.toUpperCase().includes(searchTerm) ||
-                    name.toUpperCase().includes(searchTerm) ||
-                    article.toUpperCase().includes(searchTerm)) {
+                // Get name from articleNameMap or product_name transaksi pertama SKU ini
+                const name = articleNameMap[article] || cache[sku].name;
+                if (searchEngine.contains(sku, query) ||
+                    searchEngine.contains(name, query) ||
+                    searchEngine.contains(article, query)) {
                     matches.push({
                         sku: sku,
                         name: name,
@@ -6909,12 +8395,22 @@ def generate_html(all_data, all_stores):
                 return;
             }
 
-            // Filter sales data by SKU or article name
+            if (!withAllSalesDetail(searchSKUSales)) return;
+
+            // Filter sales data by SKU or article name (hasil per SKU + nama di-memo, cek via searchEngine)
+            const query = searchTerm.toLowerCase();
+            const matchMemo = new Map();
             const results = salesDetailData.filter(item => {
                 const sku = (item.sku || '').toUpperCase();
-                const article = sku.replace(/Z\\d{2,3}$/, '');
-                const name = (item.product_name || articleNameMap[article] || '').toUpperCase();
-                return sku.includes(searchTerm) || name.includes(searchTerm) || article.includes(searchTerm);
+                const memoKey = sku + '\\u0001' + (item.product_name || '');
+                let matched = matchMemo.get(memoKey);
+                if (matched === undefined) {
+                    const article = sku.replace(/Z\\d{2,3}$/, '');
+                    const name = item.product_name || articleNameMap[article] || '';
+                    matched = searchEngine.contains(sku, query) || searchEngine.contains(name, query) || searchEngine.contains(article, query);
+                    matchMemo.set(memoKey, matched);
+                }
+                return matched;
             });
 
             // Group by SKU
@@ -7015,6 +8511,7 @@ def generate_html(all_data, all_stores):
         }
 
         function showSKUTransactionDetail(sku) {
+            if (!withAllSalesDetail(() => showSKUTransactionDetail(sku))) return;
             const transactions = salesDetailData.filter(item => item.sku === sku);
             const totalQty = transactions.reduce((sum, t) => sum + (t.qty || 0), 0);
             const totalSales = transactions.reduce((sum, t) => sum + (t.total || 0), 0);
@@ -7471,18 +8968,21 @@ def main():
 
     script_dir = Path(__file__).parent
 
-    # Load Master Data dari Google Sheets
+    # Load Master Data dari Google Sheets (semua sheet di-fetch paralel dulu)
     print("📋 Loading Master dari Google Sheets...")
+    prefetch_google_sheets(SHEET_GID.values())
     load_master_data()      # Master Data (gid=0) - mapping SKU ke info
     load_master_produk()    # Master Produk (gid=813944059) - Tier
     load_master_store()     # Master Store/Warehouse (gid=1803569317) - Area mapping
     load_max_stock()        # Max Stock (gid=382740121) - Max stock per store/WH
     load_master_assortment()  # Master Assortment (gid=1063661008) - Assortment per kode kecil
-    load_sales_data()         # Sales data dari salesss.csv - per SKU per bulan
-    load_sales_detail()       # Sales detail dari sales_2026.csv - untuk Sales Dashboard
+    load_sales_exports_cached()  # salesss.csv (per SKU per bulan) & sales_2026.csv (Sales Dashboard)
     load_target_data()        # Target data dari Google Sheets - untuk Sales Dashboard
     print()
 
+    # Master yang mempengaruhi hasil parse stock CSV
+    BUILD_FINGERPRINTS['master'] = data_fingerprint(MASTER_DATA.fingerprint, MASTER_PRODUK, STORE_AREA_MAP, DOUBLED_STORES)
+
     all_data = {}
     all_stores = {}
 
@@ -7494,7 +8994,7 @@ def main():
         for data_type, filename in files.items():
             if filename:
                 filepath = script_dir / filename
-                items, stores = read_csv_detailed(str(filepath), entity, data_type)
+                items, stores = read_csv_detailed_cached(str(filepath), entity, data_type)
                 all_data[entity][data_type] = items
                 all_stores[entity][data_type] = stores
             else:
@@ -7505,7 +9005,8 @@ def main():
     print("  Generating Dashboard...")
     print("=" * 60)
 
-    html_content = generate_html(all_data, all_stores)
+    sales_manifest = write_sales_detail_shards(script_dir) if SALES_DETAIL_SHARDS else None
+    html_content = generate_html(all_data, all_stores, sales_manifest)
 
     output_path = script_dir / 'dashboard_inventory.html'
     with open(output_path, 'w', encoding='utf-8') as f:
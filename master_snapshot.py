@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Snapshot master (Master Data, Master Produk, Master Store, Max Stock, Master Assortment)
+dalam satu file SQLite
+
+- compile_snapshot_table() menulis satu master sebagai tabel (key unik + kolom tetap) bersama
+  fingerprint sumbernya (hash isi sheet / ukuran+mtime file) dan source code parser-nya
+- open_snapshot_table() membuka tabel hanya jika fingerprint sama; lookup per key lewat index
+  SQLite (B-tree) di atas halaman file yang di-mmap, jadi startup tidak perlu parse CSV
+- Urutan baris sumber dipertahankan (rowid) karena beberapa master bergantung urutan key
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+
+MASTER_SNAPSHOT_FILE = os.environ.get(
+    'MASTER_SNAPSHOT_FILE',
+    str(Path(os.environ.get('CATALOG_CACHE_DIR', str(Path(__file__).parent / '.catalog_cache'))) / 'master_snapshot.sqlite'))
+MASTER_SNAPSHOT_ENABLED = os.environ.get('MASTER_SNAPSHOT', '1') != '0'
+MASTER_SNAPSHOT_VERSION = 1
+SNAPSHOT_MMAP_SIZE = 64 * 1024 * 1024
+SNAPSHOT_LOOKUP_CACHE = int(os.environ.get('SNAPSHOT_LOOKUP_CACHE', '65536'))
+
+_CONNECTION = None
+_CONNECTION_LOCK = threading.Lock()
+_SOURCE_FINGERPRINTS = {}  # {path modul: sha256 source}
+
+def text_fingerprint(text):
+    """Fingerprint isi sumber master (mis. teks CSV hasil fetch Google Sheets)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def source_fingerprint(path):
+    """Fingerprint source code modul parser; snapshot lama tidak dipakai lagi jika aturan parse berubah"""
+    path = os.path.abspath(path)
+    fingerprint = _SOURCE_FINGERPRINTS.get(path)
+    if fingerprint is None:
+        try:
+            with open(path, 'rb') as f:
+                fingerprint = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            fingerprint = 'unknown'
+        _SOURCE_FINGERPRINTS[path] = fingerprint
+    return fingerprint
+
+def _connection():
+    """Koneksi SQLite bersama untuk proses ini (None jika snapshot dimatikan / gagal dibuka)"""
+    global _CONNECTION
+    if not MASTER_SNAPSHOT_ENABLED:
+        return None
+    with _CONNECTION_LOCK:
+        if _CONNECTION is None:
+            try:
+                path = Path(MASTER_SNAPSHOT_FILE)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(path), check_same_thread=False)
+                conn.execute(f"PRAGMA mmap_size = {SNAPSHOT_MMAP_SIZE}")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS snapshot_meta "
+                    "(name TEXT PRIMARY KEY, fingerprint TEXT, version INTEGER, columns TEXT, source_rows INTEGER)")
+                # File snapshot lama belum punya kolom source_rows
+                meta_columns = {row[1] for row in conn.execute("PRAGMA table_info(snapshot_meta)")}
+                if 'source_rows' not in meta_columns:
+                    conn.execute("ALTER TABLE snapshot_meta ADD COLUMN source_rows INTEGER")
+                conn.commit()
+                _CONNECTION = conn
+            except sqlite3.Error as e:
+                print(f"    ⚠ Snapshot master tidak bisa dibuka ({MASTER_SNAPSHOT_FILE}): {e}")
+                return None
+        return _CONNECTION
+
+def _table(name):
+    return f'"master_{name}"'
+
+class SnapshotTable(Mapping):
+    """Mapping read-only {key: value} di atas satu tabel snapshot.
+
+    `make_value(row)` mengubah tuple kolom jadi value (mis. ProductRecord atau dict).
+    Lookup per key di-cache LRU; to_dict() mengambil semua baris sekaligus (urutan sumber).
+    `source_rows` = jumlah baris sumber saat di-compile (None jika tidak dicatat).
+    """
+
+    def __init__(self, conn, name, columns, fingerprint, make_value, source_rows=None):
+        self.conn = conn
+        self.name = name
+        self.columns = columns
+        self.fingerprint = fingerprint
+        self.make_value = make_value
+        self.source_rows = source_rows
+        self._select = f"SELECT {', '.join(columns)} FROM {_table(name)}"
+        self._size = None
+        self._lookup = lru_cache(maxsize=SNAPSHOT_LOOKUP_CACHE)(self._fetch)
+
+    def _fetch(self, key):
+        row = self.conn.execute(self._select + " WHERE key = ?", (key,)).fetchone()
+        return None if row is None else self.make_value(row)
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    def __iter__(self):
+        for (key,) in self.conn.execute(f"SELECT key FROM {_table(self.name)} ORDER BY rowid"):
+            yield key
+
+    def __len__(self):
+        if self._size is None:
+            self._size = self.conn.execute(f"SELECT COUNT(*) FROM {_table(self.name)}").fetchone()[0]
+        return self._size
+
+    def to_dict(self):
+        make_value = self.make_value
+        rows = self.conn.execute(f"SELECT key, {', '.join(self.columns)} FROM {_table(self.name)} ORDER BY rowid")
+        return {row[0]: make_value(row[1:]) for row in rows}
+
+def open_snapshot_table(name, fingerprint, columns, make_value=tuple):
+    """SnapshotTable untuk master `name` jika snapshot-nya dibuat dari sumber yang sama, selain itu None"""
+    conn = _connection()
+    if conn is None:
+        return None
+    try:
+        meta = conn.execute(
+            "SELECT fingerprint, version, columns, source_rows FROM snapshot_meta WHERE name = ?",
+            (name,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if meta is None or meta[:3] != (fingerprint, MASTER_SNAPSHOT_VERSION, ','.join(columns)):
+        return None
+    return SnapshotTable(conn, name, tuple(columns), fingerprint, make_value, meta[3])
+
+def compile_snapshot_table(name, fingerprint, columns, rows, source_rows=None):
+    """Tulis ulang tabel snapshot `name` dari iterable (key, value_tuple) sesuai urutan sumber.
+
+    `source_rows` (opsional) = jumlah baris sumber, disimpan untuk log saat snapshot dipakai lagi.
+    """
+    conn = _connection()
+    if conn is None:
+        return False
+    table = _table(name)
+    try:
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} (key TEXT NOT NULL UNIQUE, {', '.join(columns)})")
+            conn.executemany(
+                f"INSERT INTO {table} (key, {', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+                ((key, *values) for key, values in rows))
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot_meta (name, fingerprint, version, columns, source_rows) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, fingerprint, MASTER_SNAPSHOT_VERSION, ','.join(columns), source_rows))
+        return True
+    except sqlite3.Error as e:
+        print(f"    ⚠ Gagal menulis snapshot master '{name}': {e}")
+        return False
+
+def load_snapshot_dict(name, fingerprint, columns, parse):
+    """Master sebagai dict: dari snapshot jika fingerprint sama, selain itu `parse()` lalu compile.
+
+    `parse()` return (dict, jumlah baris sumber); value dict berupa scalar (1 kolom) atau dict
+    {kolom: nilai}. Jumlah baris ikut disimpan supaya log "N loaded" tetap menghitung baris sheet.
+    Source modul tempat `parse` didefinisikan ikut masuk fingerprint, jadi perubahan aturan parse
+    juga membuat snapshot di-compile ulang.
+
+    Yang dilewati snapshot hanya langkah parse: master kecil ini tetap di-materialisasi jadi dict
+    (to_dict, satu query) karena tiap run memakai semuanya (embed JSON ke HTML, index resolver area,
+    fingerprint build). Master Data yang besar memakai SnapshotTable langsung (lookup per key).
+    Return (dict, jumlah baris sumber).
+    """
+    fingerprint = f"{source_fingerprint(parse.__code__.co_filename)}:{fingerprint}"
+    single = len(columns) == 1
+    if single:
+        make_value = lambda row: row[0]
+    else:
+        make_value = lambda row: dict(zip(columns, row))
+
+    table = open_snapshot_table(name, fingerprint, columns, make_value)
+    if table is not None and table.source_rows is not None:
+        return table.to_dict(), table.source_rows
+
+    data, source_rows = parse()
+    if data:
+        compile_snapshot_table(name, fingerprint, columns, (
+            (key, (value,) if single else tuple(value[c] for c in columns))
+            for key, value in data.items()), source_rows)
+    return data, source_rows
@@ -0,0 +1,36 @@
+-- ========================================
+-- Migrasi sales_detail lama (heap tunggal) ke tabel partisi bulanan
+-- ========================================
+-- Jalankan SEKALI di Supabase SQL Editor, urutannya:
+--   1. script ini bagian A (rename tabel lama)
+--   2. dari supabase_setup.sql: bagian 3 (sales_detail + index), baris ENABLE RLS / policy
+--      sales_detail di bagian 6, dan bagian 7 (fungsi partisi)
+--   3. script ini bagian B (buat partisi & copy data)
+
+-- A. Simpan tabel lama
+ALTER TABLE sales_detail RENAME TO sales_detail_legacy;
+ALTER INDEX IF EXISTS sales_detail_pkey RENAME TO sales_detail_legacy_pkey;
+DROP INDEX IF EXISTS idx_sales_detail_tanggal;
+DROP INDEX IF EXISTS idx_sales_detail_toko;
+DROP INDEX IF EXISTS idx_sales_detail_sku;
+DROP INDEX IF EXISTS idx_sales_detail_kasir;
+
+-- (jalankan bagian supabase_setup.sql di atas, lalu lanjut bagian B)
+
+-- B. Buat partisi untuk seluruh rentang data lama, lalu copy berurutan tanggal
+SELECT ensure_sales_detail_partitions(
+    (SELECT MIN(tanggal)::DATE FROM sales_detail_legacy),
+    GREATEST((SELECT MAX(tanggal)::DATE FROM sales_detail_legacy), (CURRENT_DATE + INTERVAL '1 month')::DATE)
+);
+
+INSERT INTO sales_detail
+SELECT * FROM sales_detail_legacy
+ORDER BY tanggal;
+
+-- id baru lanjut dari nilai terakhir tabel lama
+SELECT setval(pg_get_serial_sequence('sales_detail', 'id'),
+              (SELECT COALESCE(MAX(id), 1) FROM sales_detail_legacy));
+
+-- Cek jumlah baris sama, lalu hapus tabel lama:
+-- SELECT (SELECT COUNT(*) FROM sales_detail) AS baru, (SELECT COUNT(*) FROM sales_detail_legacy) AS lama;
+-- DROP TABLE sales_detail_legacy;
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Katalog produk bersama (Master Data per SKU) untuk generate_dashboard.py,
+upload_to_supabase.py, generate_dashboard_from_supabase.py dan generate_dashboard_supabase.py
+
+- Master di-parse sekali ke record __slots__ (ProductRecord)
+- Hasil parse di-compile ke snapshot SQLite (master_snapshot.py); run berikutnya dengan sumber
+  dan source modul ini yang sama membuka snapshot dan lookup SKU langsung dari index, tanpa parse CSV
+- Info per SKU (termasuk fallback kode kecil dari SKU) di-memo dengan LRU
+"""
+
+import csv
+import io
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from master_snapshot import compile_snapshot_table, open_snapshot_table, source_fingerprint, text_fingerprint
+
+MASTER_DATA_FILE = Path(__file__).parent / 'master_data_full.csv'
+CATALOG_LRU_SIZE = int(os.environ.get('CATALOG_LRU_SIZE', '65536'))
+
+# Akhiran size di SKU: Z + 2-3 digit (contoh: Z24, Z26, Z100); kode kecil = SKU tanpa akhiran ini
+SKU_SIZE_SUFFIX = re.compile(r'Z(\d{2,3})$', re.IGNORECASE)
+
+def extract_kode_kecil(sku):
+    """Extract kode kecil dari SKU dengan menghilangkan Z+size di akhir"""
+    if not sku:
+        return ''
+    return SKU_SIZE_SUFFIX.sub('', sku.strip())
+
+class ProductRecord:
+    """Satu baris Master Data. Field juga bisa diakses seperti dict: record['kode_kecil']"""
+
+    __slots__ = ('sku', 'kode_kecil', 'name', 'variant_name', 'size', 'tier', 'gender', 'series')
+
+    def __init__(self, sku, kode_kecil='', name='', variant_name='', size='', tier='', gender='', series=''):
+        self.sku = sku
+        self.kode_kecil = kode_kecil
+        self.name = name
+        self.variant_name = variant_name
+        self.size = size
+        self.tier = tier
+        self.gender = gender
+        self.series = series
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def as_tuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+def parse_master_rows(rows):
+    """Baris CSV Master Data -> {SKU: ProductRecord}
+
+    Struktur kolom: 0 Kode Variant (SKU), 1 Kode (Kode Kecil), 3 Nama Barang,
+    4 Nama Variant, 5 Ukuran, 6 Tier, 7 Gender, 9 Series
+    """
+    # Header = baris dengan "Kode Variant" atau "Kode(*)" di 10 baris pertama
+    header_row = 0
+    for i, row in enumerate(rows[:10]):
+        row_str = ''.join(str(x).lower() for x in row)
+        if 'kode variant' in row_str or 'kode(*)' in row_str:
+            header_row = i
+            break
+
+    records = {}
+    for row in rows[header_row + 1:]:
+        if len(row) < 10:
+            continue
+
+        sku = row[0].strip().upper()
+        if not sku or sku in ('KODE VARIANT(*)', 'KODE VARIANT'):
+            continue
+
+        records[sku] = ProductRecord(
+            sku,
+            row[1].strip().upper(),
+            row[3].strip(),
+            row[4].strip(),
+            row[5].strip(),
+            row[6].strip(),
+            row[7].strip(),
+            row[9].strip(),
+        )
+    return records
+
+class ProductCatalog:
+    """Record Master Data per SKU + lookup ber-LRU.
+
+    `records` berupa dict (hasil parse) atau SnapshotTable (lookup ke snapshot SQLite).
+    Bisa dipakai seperti dict read-only: `sku in catalog`, `catalog.get(sku)`, `len(catalog)`, iterasi SKU.
+    """
+
+    def __init__(self, records, fingerprint=''):
+        self.records = records
+        self.fingerprint = fingerprint
+        self.info = lru_cache(maxsize=CATALOG_LRU_SIZE)(self._lookup_info)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, sku):
+        return sku in self.records
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, sku, default=None):
+        return self.records.get(sku, default)
+
+    def _lookup_info(self, sku):
+        """Record master untuk SKU; jika tidak ada, record kosong dengan kode kecil dari SKU"""
+        record = self.records.get(sku.upper().strip())
+        if record is not None:
+            return record
+        return ProductRecord(sku.upper().strip(), extract_kode_kecil(sku))
+
+EMPTY_CATALOG = ProductCatalog({})
+
+def _load_catalog(name, fingerprint, read_rows):
+    # Perubahan parse_master_rows / field ProductRecord juga meng-invalidate snapshot
+    fingerprint = f"{source_fingerprint(__file__)}:{fingerprint}"
+    records = open_snapshot_table(name, fingerprint, ProductRecord.__slots__, lambda row: ProductRecord(*row))
+    if records is None:
+        records = parse_master_rows(read_rows())
+        compile_snapshot_table(name, fingerprint, ProductRecord.__slots__,
+                               ((sku, record.as_tuple()) for sku, record in records.items()))
+    return ProductCatalog(records, fingerprint)
+
+def load_catalog_text(csv_text, name='master_data'):
+    """Katalog dari teks CSV Master Data (mis. hasil fetch Google Sheets)"""
+    fingerprint = text_fingerprint(csv_text)
+    return _load_catalog(name, fingerprint, lambda: list(csv.reader(io.StringIO(csv_text))))
+
+def load_catalog_file(path=MASTER_DATA_FILE, name='master_data_full'):
+    """Katalog dari file CSV Master Data; snapshot dipakai selama ukuran & mtime file sama"""
+    path = Path(path)
+    if not path.exists():
+        return EMPTY_CATALOG
+    stat = path.stat()
+    fingerprint = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def read_rows():
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return list(csv.reader(f))
+
+    return _load_catalog(name, fingerprint, read_rows)
@@ -239,6 +239,526 @@ WHERE s.sku_code IS NOT NULL AND s.sku_code != ''
   AND s.order_date::date >= '2026-01-01'
 GROUP BY s.sku_code;
 
+-- =============================================
+-- 10. AGREGASI SALES PARAMETERIZED (Sales Dashboard)
+-- =============================================
+-- Semua panel Sales dibaca dari materialized view yang dibangun dari sales_detail
+-- (tabel yang diisi upload_to_supabase.py --sales), bukan dari baris transaksi mentah:
+--   sales_agg_mv     qty/nilai per tanggal x toko x SPG x SKU (tanpa jam)
+--   sales_hourly_mv  qty/nilai per tanggal x jam x toko x gender x series (Peak Hours)
+--   sales_orders_mv  satu baris per order (per gender/series di order tsb) untuk
+--                    jumlah transaksi COUNT(DISTINCT) yang exact tanpa unnest array
+-- Di-refresh oleh upload_to_supabase.py --sales (service-role key);
+-- refresh manual: SELECT refresh_sales_aggregates();
+
+-- Gender dari SKU (port dari getGenderFromSKU di dashboard)
+CREATE OR REPLACE FUNCTION sales_gender_from_sku(p_sku TEXT, p_series TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE UPPER(LEFT(COALESCE(p_sku, ''), 1))
+        WHEN 'M' THEN 'Men'
+        WHEN 'L' THEN 'Ladies'
+        WHEN 'K' THEN 'Kids'
+        WHEN 'J' THEN 'Junior'
+        WHEN 'G' THEN 'Girls'
+        WHEN 'B' THEN 'Boys'
+        WHEN 'Z' THEN 'Baby'
+        ELSE CASE
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(ELSA|LADIES|FREYA|IRIS|KIM|PUFFY|WEDGES)' THEN 'Ladies'
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(MEN|DALLAS|ONYX)' THEN 'Men'
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(KIDS|DISNEY)' THEN 'Kids'
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(BABY|VELCRO|WBB|MILTON)' THEN 'Baby'
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(GIRLS|DOVER)' THEN 'Girls'
+            WHEN UPPER(COALESCE(p_series, '')) ~ '(BOYS|SLIDE)' THEN 'Boys'
+            WHEN UPPER(COALESCE(p_series, '')) LIKE '%JUNIOR%' THEN 'Junior'
+            ELSE 'Unknown'
+        END
+    END;
+$$;
+
+-- Dibuat ulang tiap kali file ini dijalankan supaya database dengan definisi lama ikut
+-- pindah. CASCADE ikut membuang sales_agg_filtered / sales_hourly_filtered /
+-- sales_orders_filtered (RETURNS SETOF ...), yang dibuat ulang di bawah.
+DROP MATERIALIZED VIEW IF EXISTS sales_agg_mv CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS sales_hourly_mv CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS sales_orders_mv CASCADE;
+
+CREATE MATERIALIZED VIEW sales_agg_mv AS
+SELECT
+    s.tanggal::date as sale_date,
+    COALESCE(s.toko, '') as store_name,
+    COALESCE(MAX(ms.area), 'Other') as area,
+    COALESCE(s.kasir, '') as spg_name,
+    UPPER(s.sku) as sku_code,
+    sales_gender_from_sku(UPPER(s.sku), MAX(p.series)) as gender,
+    COALESCE(MAX(p.series), '') as series,
+    COALESCE(SUM(s.jumlah), 0)::BIGINT as qty,
+    COALESCE(SUM(s.total), 0) as total_sales,
+    COALESCE(SUM(s.penjualan_kotor), 0) as total_gross,
+    COALESCE(SUM(s.hpp), 0) as total_hpp,
+    COALESCE(SUM(s.jumlah_diskon), 0) as total_discount
+FROM sales_detail s
+LEFT JOIN products p ON p.sku_code = UPPER(s.sku)
+LEFT JOIN master_store ms ON ms.store_name = s.toko
+WHERE s.sku IS NOT NULL AND s.sku != ''
+GROUP BY 1, 2, 4, 5;
+
+CREATE MATERIALIZED VIEW sales_hourly_mv AS
+SELECT
+    s.tanggal::date as sale_date,
+    EXTRACT(HOUR FROM s.tanggal)::INT as sale_hour,
+    COALESCE(s.toko, '') as store_name,
+    COALESCE(MAX(ms.area), 'Other') as area,
+    sales_gender_from_sku(UPPER(s.sku), p.series) as gender,
+    COALESCE(p.series, '') as series,
+    COALESCE(SUM(s.jumlah), 0)::BIGINT as qty,
+    COALESCE(SUM(s.total), 0) as total_sales
+FROM sales_detail s
+LEFT JOIN products p ON p.sku_code = UPPER(s.sku)
+LEFT JOIN master_store ms ON ms.store_name = s.toko
+WHERE s.sku IS NOT NULL AND s.sku != ''
+GROUP BY 1, 2, 3, 5, 6;
+
+-- Satu order biasanya satu gender/series, jadi ukurannya ~ jumlah order, bukan jumlah baris
+CREATE MATERIALIZED VIEW sales_orders_mv AS
+SELECT
+    s.tanggal::date as sale_date,
+    COALESCE(s.toko, '') as store_name,
+    COALESCE(MAX(ms.area), 'Other') as area,
+    COALESCE(s.kasir, '') as spg_name,
+    s.nomor_pesanan as order_no,
+    sales_gender_from_sku(UPPER(s.sku), p.series) as gender,
+    COALESCE(p.series, '') as series,
+    MIN(EXTRACT(HOUR FROM s.tanggal))::INT as sale_hour
+FROM sales_detail s
+LEFT JOIN products p ON p.sku_code = UPPER(s.sku)
+LEFT JOIN master_store ms ON ms.store_name = s.toko
+WHERE s.sku IS NOT NULL AND s.sku != ''
+  AND s.nomor_pesanan IS NOT NULL AND s.nomor_pesanan != ''
+GROUP BY 1, 2, 4, 5, 6, 7;
+
+-- Unique index wajib untuk REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_agg_mv_key
+    ON sales_agg_mv (sale_date, store_name, spg_name, sku_code);
+CREATE INDEX IF NOT EXISTS idx_sales_agg_mv_store_date ON sales_agg_mv (store_name, sale_date);
+CREATE INDEX IF NOT EXISTS idx_sales_agg_mv_area_date ON sales_agg_mv (area, sale_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_hourly_mv_key
+    ON sales_hourly_mv (sale_date, sale_hour, store_name, gender, series);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_orders_mv_key
+    ON sales_orders_mv (sale_date, store_name, spg_name, order_no, gender, series);
+CREATE INDEX IF NOT EXISTS idx_sales_orders_mv_store_date ON sales_orders_mv (store_name, sale_date);
+
+-- Refresh materialized view (dipanggil upload_to_supabase.py --sales dengan service-role key)
+CREATE OR REPLACE FUNCTION refresh_sales_aggregates()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY sales_agg_mv;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY sales_hourly_mv;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY sales_orders_mv;
+END;
+$$;
+
+-- Cell sales_agg_mv yang lolos filter Sales Dashboard (NULL / '' = semua)
+CREATE OR REPLACE FUNCTION sales_agg_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS SETOF sales_agg_mv
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.*
+    FROM sales_agg_mv m
+    WHERE
+        (start_date IS NULL OR m.sale_date >= start_date)
+        AND (end_date IS NULL OR m.sale_date <= end_date)
+        AND (filter_area IS NULL OR filter_area = '' OR LOWER(m.area) = LOWER(filter_area))
+        AND (filter_store IS NULL OR filter_store = '' OR m.store_name = filter_store)
+        AND (filter_gender IS NULL OR filter_gender = '' OR m.gender = filter_gender)
+        AND (filter_series IS NULL OR filter_series = '' OR m.series = filter_series);
+$$;
+
+-- Cell sales_hourly_mv yang lolos filter Sales Dashboard
+CREATE OR REPLACE FUNCTION sales_hourly_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS SETOF sales_hourly_mv
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.*
+    FROM sales_hourly_mv m
+    WHERE
+        (start_date IS NULL OR m.sale_date >= start_date)
+        AND (end_date IS NULL OR m.sale_date <= end_date)
+        AND (filter_area IS NULL OR filter_area = '' OR LOWER(m.area) = LOWER(filter_area))
+        AND (filter_store IS NULL OR filter_store = '' OR m.store_name = filter_store)
+        AND (filter_gender IS NULL OR filter_gender = '' OR m.gender = filter_gender)
+        AND (filter_series IS NULL OR filter_series = '' OR m.series = filter_series);
+$$;
+
+-- Order (sales_orders_mv) yang punya baris lolos filter Sales Dashboard;
+-- jumlah transaksi = COUNT(DISTINCT order_no) dari hasilnya
+CREATE OR REPLACE FUNCTION sales_orders_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS SETOF sales_orders_mv
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.*
+    FROM sales_orders_mv m
+    WHERE
+        (start_date IS NULL OR m.sale_date >= start_date)
+        AND (end_date IS NULL OR m.sale_date <= end_date)
+        AND (filter_area IS NULL OR filter_area = '' OR LOWER(m.area) = LOWER(filter_area))
+        AND (filter_store IS NULL OR filter_store = '' OR m.store_name = filter_store)
+        AND (filter_gender IS NULL OR filter_gender = '' OR m.gender = filter_gender)
+        AND (filter_series IS NULL OR filter_series = '' OR m.series = filter_series);
+$$;
+
+-- 10a. Summary cards: Total Sales, Transaksi, Qty, Gross, HPP, Diskon (ATV/ATU dihitung client)
+CREATE OR REPLACE FUNCTION get_sales_overview(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    total_gross NUMERIC,
+    total_hpp NUMERIC,
+    total_discount NUMERIC,
+    transaction_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COALESCE(SUM(f.total_gross), 0),
+        COALESCE(SUM(f.total_hpp), 0),
+        COALESCE(SUM(f.total_discount), 0),
+        (SELECT COUNT(DISTINCT o.order_no)
+         FROM sales_orders_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) o)::BIGINT
+    FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) f;
+END;
+$$;
+
+-- 10b. Sales by Store (tabel Performance; target/achv digabung di client)
+CREATE OR REPLACE FUNCTION get_sales_by_store_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    store_name TEXT,
+    area TEXT,
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    transaction_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH f AS (
+        SELECT * FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series)
+    ),
+    trx AS (
+        SELECT o.store_name as store, COUNT(DISTINCT o.order_no) as n
+        FROM sales_orders_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) o
+        GROUP BY o.store_name
+    )
+    SELECT
+        f.store_name,
+        MAX(f.area),
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COALESCE(MAX(trx.n), 0)::BIGINT
+    FROM f
+    LEFT JOIN trx ON trx.store = f.store_name
+    GROUP BY f.store_name
+    ORDER BY 3 DESC;
+END;
+$$;
+
+-- 10c. Sales by Area (kartu area di tab Performance)
+CREATE OR REPLACE FUNCTION get_sales_by_area_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    area TEXT,
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    store_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        f.area,
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COUNT(DISTINCT f.store_name)::BIGINT
+    FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) f
+    GROUP BY f.area
+    ORDER BY 2 DESC;
+END;
+$$;
+
+-- 10d. SPG Leaderboard
+CREATE OR REPLACE FUNCTION get_sales_by_spg_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    spg_name TEXT,
+    stores TEXT,
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    transaction_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH f AS (
+        SELECT * FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series)
+    ),
+    trx AS (
+        SELECT o.spg_name as spg, COUNT(DISTINCT o.order_no) as n
+        FROM sales_orders_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) o
+        GROUP BY o.spg_name
+    )
+    SELECT
+        COALESCE(NULLIF(f.spg_name, ''), 'Unknown'),
+        STRING_AGG(DISTINCT f.store_name, ', '),
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COALESCE(MAX(trx.n), 0)::BIGINT
+    FROM f
+    LEFT JOIN trx ON trx.spg = f.spg_name
+    GROUP BY f.spg_name
+    ORDER BY 3 DESC;
+END;
+$$;
+
+-- 10e. Top / Slow moving per artikel (SKU tanpa size, hanya sandal)
+CREATE OR REPLACE FUNCTION get_sales_by_article_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    article TEXT,
+    gender TEXT,
+    series TEXT,
+    total_sales NUMERIC,
+    total_qty BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        REGEXP_REPLACE(f.sku_code, 'Z\d{2,3}$', '') as article,
+        MAX(f.gender),
+        MAX(f.series),
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT
+    FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) f
+    WHERE f.sku_code !~ '^(SHOPBAG|PAPERBAG|INBOX|GWP|BOX|BAG|INNER|PAPER)'
+    GROUP BY 1
+    ORDER BY 5 DESC;
+END;
+$$;
+
+-- 10f. Trend harian (tab Trend)
+CREATE OR REPLACE FUNCTION get_sales_daily_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    sale_date DATE,
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    transaction_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH f AS (
+        SELECT * FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series)
+    ),
+    trx AS (
+        SELECT o.sale_date as d, COUNT(DISTINCT o.order_no) as n
+        FROM sales_orders_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) o
+        GROUP BY o.sale_date
+    )
+    SELECT
+        f.sale_date,
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COALESCE(MAX(trx.n), 0)::BIGINT
+    FROM f
+    LEFT JOIN trx ON trx.d = f.sale_date
+    GROUP BY f.sale_date
+    ORDER BY f.sale_date;
+END;
+$$;
+
+-- 10g. Sales per jam (Peak Hours)
+CREATE OR REPLACE FUNCTION get_sales_hourly_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    sale_hour INT,
+    total_sales NUMERIC,
+    total_qty BIGINT,
+    transaction_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH f AS (
+        SELECT * FROM sales_hourly_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series)
+    ),
+    trx AS (
+        SELECT o.sale_hour as h, COUNT(DISTINCT o.order_no) as n
+        FROM sales_orders_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) o
+        GROUP BY o.sale_hour
+    )
+    SELECT
+        f.sale_hour,
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT,
+        COALESCE(MAX(trx.n), 0)::BIGINT
+    FROM f
+    LEFT JOIN trx ON trx.h = f.sale_hour
+    GROUP BY f.sale_hour
+    ORDER BY f.sale_hour;
+END;
+$$;
+
+-- 10h. Sales per Gender > Series (tab Gender & Category Performance)
+CREATE OR REPLACE FUNCTION get_sales_by_gender_series_filtered(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL,
+    filter_area TEXT DEFAULT NULL,
+    filter_store TEXT DEFAULT NULL,
+    filter_gender TEXT DEFAULT NULL,
+    filter_series TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    gender TEXT,
+    series TEXT,
+    total_sales NUMERIC,
+    total_qty BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        f.gender,
+        f.series,
+        COALESCE(SUM(f.total_sales), 0),
+        COALESCE(SUM(f.qty), 0)::BIGINT
+    FROM sales_agg_filtered(start_date, end_date, filter_area, filter_store, filter_gender, filter_series) f
+    GROUP BY f.gender, f.series
+    ORDER BY 3 DESC;
+END;
+$$;
+
+-- 10i. Sales per SKU per bulan (pengganti nov/dec/jan hard-coded untuk salesMap)
+CREATE OR REPLACE FUNCTION get_sales_monthly_by_sku(
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL
+)
+RETURNS TABLE (
+    sku_code TEXT,
+    sale_month TEXT,
+    total_qty BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        m.sku_code,
+        TO_CHAR(m.sale_date, 'YYYY-MM'),
+        COALESCE(SUM(m.qty), 0)::BIGINT
+    FROM sales_agg_mv m
+    WHERE
+        (start_date IS NULL OR m.sale_date >= start_date)
+        AND (end_date IS NULL OR m.sale_date <= end_date)
+    GROUP BY 1, 2
+    ORDER BY 1, 2;
+END;
+$$;
+
 -- Grant execute permissions to anon and authenticated roles
 GRANT EXECUTE ON FUNCTION get_sales_summary_by_sku() TO anon, authenticated;
 GRANT EXECUTE ON FUNCTION get_sales_by_store_summary() TO anon, authenticated;
@@ -249,3 +769,22 @@ GRANT EXECUTE ON FUNCTION get_sales_filtered(TEXT, TEXT, TEXT, INT) TO anon, aut
 GRANT EXECUTE ON FUNCTION get_sales_daily_trend() TO anon, authenticated;
 GRANT SELECT ON inventory_full TO anon, authenticated;
 GRANT SELECT ON sales_summary_by_sku TO anon, authenticated;
+GRANT SELECT ON sales_agg_mv TO anon, authenticated;
+GRANT SELECT ON sales_hourly_mv TO anon, authenticated;
+GRANT SELECT ON sales_orders_mv TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION sales_gender_from_sku(TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION sales_agg_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION sales_hourly_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION sales_orders_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_overview(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_by_store_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_by_area_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_by_spg_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_by_article_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_daily_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_hourly_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_by_gender_series_filtered(DATE, DATE, TEXT, TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_sales_monthly_by_sku(DATE, DATE) TO anon, authenticated;
+-- Refresh hanya untuk role upload
+REVOKE EXECUTE ON FUNCTION refresh_sales_aggregates() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION refresh_sales_aggregates() TO authenticated, service_role;
@@ -25,11 +25,18 @@ CREATE TABLE IF NOT EXISTS inventory (
 );
 
 -- Index untuk performa query
+-- Semua query dashboard filter entity + type sekaligus -> satu composite index
+-- (juga melayani filter entity saja). Hasil benchmark: python benchmark_indexes.py
+DROP INDEX IF EXISTS idx_inventory_entity;
+DROP INDEX IF EXISTS idx_inventory_type;
 CREATE INDEX IF NOT EXISTS idx_inventory_sku ON inventory(sku);
-CREATE INDEX IF NOT EXISTS idx_inventory_entity ON inventory(entity);
-CREATE INDEX IF NOT EXISTS idx_inventory_type ON inventory(type);
+CREATE INDEX IF NOT EXISTS idx_inventory_entity_type_sku ON inventory(entity, type, sku);
+-- Partial: hanya SKU yang masih ada stoknya (view stock default menyembunyikan total 0)
+CREATE INDEX IF NOT EXISTS idx_inventory_in_stock ON inventory(entity, type, total) WHERE total > 0;
 CREATE INDEX IF NOT EXISTS idx_inventory_tier ON inventory(tier);
 CREATE INDEX IF NOT EXISTS idx_inventory_gender ON inventory(gender);
+-- GIN untuk query per toko di store_stock, mis. store_stock ? 'Zuma Bintaro Xchange'
+CREATE INDEX IF NOT EXISTS idx_inventory_store_stock ON inventory USING GIN (store_stock);
 
 
 -- 2. TABLE: sales_summary (untuk Control Stock - Turnover Analysis)
@@ -47,8 +54,11 @@ CREATE INDEX IF NOT EXISTS idx_sales_summary_sku ON sales_summary(sku);
 
 
 -- 3. TABLE: sales_detail (untuk Sales Dashboard)
+-- Dipartisi per bulan (RANGE tanggal): query per periode hanya membaca partisi bulan terkait,
+-- dan arsip bulan lama cukup DETACH PARTITION. Partisi dibuat oleh ensure_sales_detail_partitions()
+-- (lihat bagian 7). Migrasi dari tabel lama: migrate_sales_detail_partitioned.sql
 CREATE TABLE IF NOT EXISTS sales_detail (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL,
     tanggal TIMESTAMP NOT NULL,
     toko TEXT,
     tipe_produk TEXT,
@@ -76,13 +86,22 @@ CREATE TABLE IF NOT EXISTS sales_detail (
     status_pemenuhan TEXT,
     tanggal_pemenuhan TIMESTAMP,
     nama_server TEXT,
-    created_at TIMESTAMP DEFAULT NOW()
-);
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (id, tanggal)
+) PARTITION BY RANGE (tanggal);
+
+-- Penampung baris di luar partisi bulanan yang ada (dipindah otomatis saat partisinya dibuat)
+CREATE TABLE IF NOT EXISTS sales_detail_default PARTITION OF sales_detail DEFAULT;
 
 -- Index untuk performa query
-CREATE INDEX IF NOT EXISTS idx_sales_detail_tanggal ON sales_detail(tanggal);
-CREATE INDEX IF NOT EXISTS idx_sales_detail_toko ON sales_detail(toko);
-CREATE INDEX IF NOT EXISTS idx_sales_detail_sku ON sales_detail(sku);
+-- Query sales selalu pakai rentang tanggal + toko / SKU -> composite dengan tanggal di belakang.
+-- tanggal sendiri pakai BRIN: data di-insert berurutan waktu, index jauh lebih kecil dari btree.
+DROP INDEX IF EXISTS idx_sales_detail_tanggal;
+DROP INDEX IF EXISTS idx_sales_detail_toko;
+DROP INDEX IF EXISTS idx_sales_detail_sku;
+CREATE INDEX IF NOT EXISTS idx_sales_detail_tanggal_brin ON sales_detail USING BRIN (tanggal);
+CREATE INDEX IF NOT EXISTS idx_sales_detail_toko_tanggal ON sales_detail(toko, tanggal);
+CREATE INDEX IF NOT EXISTS idx_sales_detail_sku_tanggal ON sales_detail(sku, tanggal);
 CREATE INDEX IF NOT EXISTS idx_sales_detail_kasir ON sales_detail(kasir);
 
 
@@ -144,4 +163,158 @@ CREATE POLICY "Allow authenticated update on max_stock" ON max_stock FOR UPDATE
 CREATE POLICY "Allow authenticated insert on master_store" ON master_store FOR INSERT WITH CHECK (auth.role() = 'authenticated' OR auth.role() = 'service_role');
 CREATE POLICY "Allow authenticated update on master_store" ON master_store FOR UPDATE USING (auth.role() = 'authenticated' OR auth.role() = 'service_role');
 
+
+
+-- 7. PARTISI BULANAN sales_detail
+-- Buat partisi sales_detail_YYYY_MM untuk bulan dari p_month (baris yang sudah masuk
+-- sales_detail_default untuk bulan tsb dipindah). Partisi ikut RLS + policy parent supaya
+-- bisa dibaca langsung lewat REST API.
+CREATE OR REPLACE FUNCTION create_sales_detail_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    part_name TEXT := 'sales_detail_' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE sales_detail INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM sales_detail_default WHERE tanggal >= %L AND tanggal < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', month_start, month_end, part_name);
+    EXECUTE format('ALTER TABLE sales_detail ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   part_name, month_start, month_end);
+
+    EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', part_name);
+    EXECUTE format('CREATE POLICY "Allow public read on %s" ON %I FOR SELECT USING (true)', part_name, part_name);
+    EXECUTE format('CREATE POLICY "Allow authenticated insert on %s" ON %I FOR INSERT '
+                   'WITH CHECK (auth.role() = ''authenticated'' OR auth.role() = ''service_role'')', part_name, part_name);
+    EXECUTE format('CREATE POLICY "Allow authenticated delete on %s" ON %I FOR DELETE '
+                   'USING (auth.role() = ''authenticated'' OR auth.role() = ''service_role'')', part_name, part_name);
+    EXECUTE format('GRANT SELECT ON %I TO anon, authenticated', part_name);
+    EXECUTE format('GRANT INSERT, DELETE ON %I TO authenticated, service_role', part_name);
+    RETURN part_name;
+END;
+$$;
+
+-- Pastikan partisi ada untuk semua bulan di rentang [start_date, end_date]
+-- Default: bulan ini + bulan depan (dipanggil loader sebelum upload & oleh cron)
+CREATE OR REPLACE FUNCTION ensure_sales_detail_partitions(
+    start_date DATE DEFAULT CURRENT_DATE,
+    end_date DATE DEFAULT (CURRENT_DATE + INTERVAL '1 month')::DATE
+)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_cursor DATE := date_trunc('month', start_date)::DATE;
+BEGIN
+    WHILE month_cursor <= end_date LOOP
+        RETURN NEXT create_sales_detail_partition(month_cursor);
+        month_cursor := (month_cursor + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$;
+
+-- Arsip: lepas partisi satu bulan dari sales_detail (tabelnya tetap ada untuk di-dump / DROP)
+CREATE OR REPLACE FUNCTION detach_sales_detail_partition(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    part_name TEXT := 'sales_detail_' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    EXECUTE format('ALTER TABLE sales_detail DETACH PARTITION %I', part_name);
+    RETURN part_name;
+END;
+$$;
+
+-- Staging upload: loader (upload_to_supabase.py --sales, service-role key) mengisi staging per
+-- bulan, lalu replace_sales_detail_month() mengganti isi partisi bulan tsb dalam satu transaksi.
+-- Upload yang gagal di tengah hanya meninggalkan sisa di staging; data bulan lama tetap utuh.
+-- RLS tanpa policy + tanpa grant anon/authenticated: hanya service_role yang bisa akses.
+CREATE TABLE IF NOT EXISTS sales_detail_staging (LIKE sales_detail INCLUDING DEFAULTS);
+ALTER TABLE sales_detail_staging ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON sales_detail_staging FROM PUBLIC, anon, authenticated;
+GRANT SELECT, INSERT, DELETE ON sales_detail_staging TO service_role;
+
+-- Mulai upload satu bulan: pastikan partisinya ada dan buang sisa staging bulan tsb
+CREATE OR REPLACE FUNCTION begin_sales_detail_month(p_month DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+BEGIN
+    DELETE FROM sales_detail_staging WHERE tanggal >= month_start AND tanggal < month_end;
+    RETURN create_sales_detail_partition(month_start);
+END;
+$$;
+
+-- Ganti isi bulan p_month di sales_detail dengan baris staging bulan tsb (satu transaksi:
+-- pembaca melihat data lama sampai commit). Ditolak jika staging tidak berisi tepat
+-- p_expected_rows baris, jadi upload yang belum lengkap tidak pernah menggantikan data lama.
+CREATE OR REPLACE FUNCTION replace_sales_detail_month(p_month DATE, p_expected_rows BIGINT)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    staged BIGINT;
+BEGIN
+    -- Dua upload untuk bulan yang sama tidak boleh saling timpa
+    PERFORM pg_advisory_xact_lock(hashtext('sales_detail_' || to_char(month_start, 'YYYY_MM')));
+
+    SELECT COUNT(*) INTO staged FROM sales_detail_staging WHERE tanggal >= month_start AND tanggal < month_end;
+    IF staged <> p_expected_rows THEN
+        RAISE EXCEPTION 'Staging % berisi % baris, diharapkan %', to_char(month_start, 'YYYY-MM'), staged, p_expected_rows;
+    END IF;
+
+    PERFORM create_sales_detail_partition(month_start);
+    DELETE FROM sales_detail WHERE tanggal >= month_start AND tanggal < month_end;
+    INSERT INTO sales_detail
+    SELECT * FROM sales_detail_staging WHERE tanggal >= month_start AND tanggal < month_end;
+    DELETE FROM sales_detail_staging WHERE tanggal >= month_start AND tanggal < month_end;
+    RETURN staged;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION create_sales_detail_partition(DATE) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION ensure_sales_detail_partitions(DATE, DATE) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION detach_sales_detail_partition(DATE) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION begin_sales_detail_month(DATE) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION replace_sales_detail_month(DATE, BIGINT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ensure_sales_detail_partitions(DATE, DATE) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION detach_sales_detail_partition(DATE) TO service_role;
+GRANT EXECUTE ON FUNCTION begin_sales_detail_month(DATE) TO service_role;
+GRANT EXECUTE ON FUNCTION replace_sales_detail_month(DATE, BIGINT) TO service_role;
+
+SELECT ensure_sales_detail_partitions();
+
+-- Partisi bulan depan dibuat otomatis tiap tanggal 25 (jika extension pg_cron aktif)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('sales-detail-next-partition', '0 0 25 * *',
+                              'SELECT ensure_sales_detail_partitions()');
+    END IF;
+END;
+$$;
+
 -- Selesai! Tables sudah siap digunakan.